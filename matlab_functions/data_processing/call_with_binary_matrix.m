@@ -0,0 +1,10 @@
+function varargout = call_with_binary_matrix(func_name, file_path, n_rows, n_cols, class_name, varargin)
+% 从临时二进制文件读取矩阵（读取后删除文件），以它为第一个参数调用函数
+% 输入参数：
+%   func_name - 要调用的函数名称，如'plot_freq_domain'
+%   file_path, n_rows, n_cols, class_name - 见load_binary_matrix
+%   varargin - 传给函数的其余参数
+
+    data = load_binary_matrix(file_path, n_rows, n_cols, class_name, true);
+    [varargout{1:nargout}] = feval(func_name, data, varargin{:});
+end
@@ -0,0 +1,21 @@
+function varargout = call_with_dataset(func_name, dataset_name, rows, columns, varargin)
+% 以工作区中已注册的数据集为第一个参数调用函数，数据不需要重新从Python传输
+% 输入参数：
+%   func_name - 要调用的函数名称，如'plot_freq_domain'
+%   dataset_name - 数据集在基础工作区中的变量名
+%   rows - 可选，行区间[起始, 结束]（从1开始，包含结束行），为空时使用全部行
+%   columns - 可选，列号（从1开始），为空时使用全部列
+%   varargin - 传给函数的其余参数
+
+    % 基础工作区中的变量按需复制，只截取的部分会产生新数组
+    data = evalin('base', dataset_name);
+    
+    if ~isempty(rows)
+        data = data(rows(1):rows(2), :);
+    end
+    if ~isempty(columns)
+        data = data(:, columns);
+    end
+    
+    [varargout{1:nargout}] = feval(func_name, data, varargin{:});
+end
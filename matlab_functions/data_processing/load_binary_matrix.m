@@ -0,0 +1,29 @@
+function data = load_binary_matrix(file_path, n_rows, n_cols, class_name, delete_file)
+% 读取Python端写入的临时二进制矩阵文件（列优先、本机字节序、无文件头）
+% 输入参数：
+%   file_path - 二进制文件路径
+%   n_rows, n_cols - 矩阵的行数和列数
+%   class_name - 数据类型，如'double'、'single'、'int16'
+%   delete_file - 可选，为true时读取后删除文件（默认false）
+
+    if nargin < 5
+        delete_file = false;
+    end
+    
+    fid = fopen(file_path, 'r', 'n');
+    if fid < 0
+        error('load_binary_matrix:open', '无法打开文件: %s', file_path);
+    end
+    closer = onCleanup(@() fclose(fid));
+    
+    % 按原始类型读取，不转换为double
+    data = fread(fid, [double(n_rows), double(n_cols)], ['*' class_name]);
+    if numel(data) ~= double(n_rows) * double(n_cols)
+        error('load_binary_matrix:size', '文件中的数据不完整: %s', file_path);
+    end
+    
+    clear closer;
+    if delete_file
+        delete(file_path);
+    end
+end
@@ -1,9 +1,11 @@
-function plot_freq_domain(data, sample_rate, title_str)
+function plot_freq_domain(data, sample_rate, title_str, freq_range, channel_names)
 % 绘制频域功率谱图（使用pwelch函数）
 % 输入参数：
 %   data - 输入数据矩阵，每列代表一个通道
 %   sample_rate - 采样率（Hz）
 %   title_str - 图表标题
+%   freq_range - 可选，显示的频率范围[起始, 结束]（Hz）
+%   channel_names - 可选，各通道名称（元胞数组）
 
     % 设置默认参数
     if nargin < 2
@@ -20,6 +22,9 @@ function plot_freq_domain(data, sample_rate, title_str)
     
     % 获取通道数和数据点数
     [n_points, n_channels] = size(data);
+    if nargin < 5 || isempty(channel_names)
+        channel_names = arrayfun(@(i) ['通道 ', num2str(i)], 1:n_channels, 'UniformOutput', false);
+    end
     
     % 创建新的图形窗口
     figure('Name', title_str, 'NumberTitle', 'off');
@@ -31,10 +36,17 @@ function plot_freq_domain(data, sample_rate, title_str)
         % 使用pwelch函数计算功率谱密度
         [Pxx, f] = pwelch(data(:, i), [], [], [], sample_rate);
         
+        % 只保留指定的频率范围
+        if nargin >= 4 && isnumeric(freq_range) && numel(freq_range) == 2
+            in_range = f >= freq_range(1) & f <= freq_range(2);
+            f = f(in_range);
+            Pxx = Pxx(in_range);
+        end
+        
         % 绘制功率谱（使用对数坐标）
         plot(f, 10*log10(Pxx));
         xlabel('频率 (Hz)');
-        ylabel(['功率谱密度 (dB/Hz)']);
+        ylabel({channel_names{i}, '功率谱密度 (dB/Hz)'});
         grid on;
         if i == 1
             title(title_str);
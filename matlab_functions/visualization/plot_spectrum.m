@@ -0,0 +1,47 @@
+function plot_spectrum(f, pxx, title_str, channel_names)
+% 绘制已计算好的功率谱密度（由Python端的Welch算法计算）
+% 输入参数：
+%   f - 频率向量（Hz）
+%   pxx - 功率谱密度矩阵，每列代表一个通道
+%   title_str - 图表标题
+%   channel_names - 各通道名称（元胞数组）
+
+    % 设置默认参数
+    if nargin < 3
+        title_str = '频域功率谱图';
+    end
+    
+    % 确保数据是矩阵形式
+    f = f(:);
+    if isvector(pxx)
+        pxx = pxx(:);
+    end
+    
+    % 获取通道数
+    n_channels = size(pxx, 2);
+    if nargin < 4 || isempty(channel_names)
+        channel_names = arrayfun(@(i) ['通道 ', num2str(i)], 1:n_channels, 'UniformOutput', false);
+    end
+    
+    % 创建新的图形窗口
+    figure('Name', title_str, 'NumberTitle', 'off');
+    
+    % 绘制每个通道的功率谱
+    for i = 1:n_channels
+        subplot(n_channels, 1, i);
+        
+        % 绘制功率谱（使用对数坐标）
+        plot(f, 10*log10(pxx(:, i)));
+        xlabel('频率 (Hz)');
+        ylabel({channel_names{i}, '功率谱密度 (dB/Hz)'});
+        grid on;
+        if i == 1
+            title(title_str);
+        end
+    end
+    
+    % 启用交互式工具
+    datacursormode on;
+    zoom on;
+    pan on;
+end
@@ -1,9 +1,11 @@
-function plot_time_domain(data, sample_rate, title_str)
+function plot_time_domain(data, sample_rate, title_str, time, channel_names)
 % 绘制时域波形图
 % 输入参数：
 %   data - 输入数据矩阵，每列代表一个通道
 %   sample_rate - 采样率（Hz）
 %   title_str - 图表标题
+%   time - 可选，每行数据对应的时间（s），用于只传输部分时间段或抽样后的数据
+%   channel_names - 可选，各通道名称（元胞数组）
 
     % 设置默认参数
     if nargin < 2
@@ -21,8 +23,14 @@ function plot_time_domain(data, sample_rate, title_str)
     % 获取通道数和数据点数
     [n_points, n_channels] = size(data);
     
-    % 计算时间轴
-    time = (0:n_points-1) / sample_rate;
+    % 计算时间轴（未给出时从0开始按采样率计算）
+    if nargin < 4 || isempty(time)
+        time = (0:n_points-1) / sample_rate;
+    end
+    time = time(:);
+    if nargin < 5 || isempty(channel_names)
+        channel_names = arrayfun(@(i) ['通道 ', num2str(i)], 1:n_channels, 'UniformOutput', false);
+    end
     
     % 创建新的图形窗口
     figure('Name', title_str, 'NumberTitle', 'off');
@@ -31,8 +39,9 @@ function plot_time_domain(data, sample_rate, title_str)
     for i = 1:n_channels
         subplot(n_channels, 1, i);
         plot(time, data(:, i));
+        xlim([time(1), time(end)]);
         xlabel('时间 (s)');
-        ylabel(['通道 ', num2str(i)]);
+        ylabel(channel_names{i});
         grid on;
         if i == 1
             title(title_str);
@@ -0,0 +1,84 @@
+from PyQt5.QtWidgets import QHeaderView, QAbstractItemView
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+import numpy as np
+
+# 表格默认行高和列宽（像素），行高固定时视图不需要逐行计算高度
+ROW_HEIGHT = 22
+COLUMN_WIDTH = 100
+
+# 按内容调整列宽时最多参考的行数（Qt默认1000行，列数多时很慢）
+RESIZE_SAMPLE_ROWS = 50
+
+class NumpyTableModel(QAbstractTableModel):
+    """二维数组的只读表格模型：不复制数据，只在单元格绘制时格式化对应的值，任意行数下内存占用不变"""
+    
+    def __init__(self, data=None, column_names=None, parent=None, row_labels=None):
+        super().__init__(parent)
+        self._data = None
+        self._column_names = []
+        self._row_labels = None
+        self._numeric = False
+        self.set_data(data, column_names, row_labels)
+    
+    def set_data(self, data, column_names=None, row_labels=None):
+        """设置要显示的数组（支持ndarray、np.memmap等提供shape和二维索引的对象，一维数组按单列显示）；column_names为None时列名为“列 n”，row_labels为None时行号从1开始"""
+        self.beginResetModel()
+        if data is not None and len(data.shape) == 1:
+            data = np.asarray(data).reshape(-1, 1)
+        self._data = data
+        self._column_names = list(column_names) if column_names is not None else []
+        self._row_labels = list(row_labels) if row_labels is not None else None
+        self._numeric = data is not None and np.issubdtype(np.dtype(getattr(data, 'dtype', object)), np.number)
+        self.endResetModel()
+    
+    def get_data(self):
+        """获取当前显示的数组"""
+        return self._data
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self._data is None:
+            return 0
+        return self._data.shape[0]
+    
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid() or self._data is None:
+            return 0
+        return self._data.shape[1]
+    
+    def data(self, index, role=Qt.DisplayRole):
+        """只在视图请求时读取并格式化单元格的值"""
+        if not index.isValid() or self._data is None:
+            return QVariant()
+        
+        if role == Qt.DisplayRole:
+            return str(self._data[index.row(), index.column()])
+        if role == Qt.TextAlignmentRole and self._numeric:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return QVariant()
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return QVariant()
+        
+        if orientation == Qt.Horizontal:
+            if section < len(self._column_names):
+                return self._column_names[section]
+            return f"列 {section+1}"
+        if self._row_labels is not None and section < len(self._row_labels):
+            return str(self._row_labels[section])
+        return str(section + 1)
+
+def configure_table_view(view):
+    """设置表格视图以便浏览大数组：固定行高，按内容调整列宽时只参考少量行"""
+    view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    view.setWordWrap(False)
+    
+    vertical_header = view.verticalHeader()
+    vertical_header.setSectionResizeMode(QHeaderView.Fixed)
+    vertical_header.setDefaultSectionSize(ROW_HEIGHT)
+    vertical_header.setResizeContentsPrecision(RESIZE_SAMPLE_ROWS)
+    
+    horizontal_header = view.horizontalHeader()
+    horizontal_header.setSectionResizeMode(QHeaderView.Interactive)
+    horizontal_header.setDefaultSectionSize(COLUMN_WIDTH)
+    horizontal_header.setResizeContentsPrecision(RESIZE_SAMPLE_ROWS)
@@ -0,0 +1,75 @@
+import sys
+import os
+import time
+import numpy as np
+
+# 添加python_gui目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+try:
+    import matlab
+    from utils.matlab_interface import MatlabInterface
+    MATLAB_AVAILABLE = True
+except ImportError as e:
+    print(f"警告：无法导入Matlab相关模块：{e}")
+    MATLAB_AVAILABLE = False
+
+def legacy_numpy_to_matlab(np_array):
+    """旧版转换方式：astype + tolist"""
+    np_array = np_array.astype(float)
+    if len(np_array.shape) == 1:
+        return matlab.double(np_array.tolist())
+    return matlab.double(np_array.T.tolist())
+
+def legacy_matlab_to_numpy(mat_array):
+    """旧版转换方式：逐元素重建数组"""
+    return np.array(mat_array._data).reshape(mat_array.size, order='F')
+
+def measure(func, arg, repeat=3):
+    """返回多次运行中的最短耗时（秒）"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(arg)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def run_case(matlab_interface, rows, cols, dtype):
+    """测试一种数组规格的双向传输吞吐量"""
+    shape = (rows,) if cols == 1 else (rows, cols)
+    data = (np.random.rand(*shape) * 100).astype(dtype)
+    size_mb = data.nbytes / (1024 * 1024)
+    
+    legacy_to, legacy_mat = measure(legacy_numpy_to_matlab, data)
+    new_to, new_mat = measure(matlab_interface.numpy_to_matlab, data)
+    legacy_back, _ = measure(legacy_matlab_to_numpy, legacy_mat)
+    new_back, _ = measure(matlab_interface.matlab_to_numpy, new_mat)
+    
+    print(f"{str(shape):>16} {np.dtype(dtype).name:>8} {size_mb:>9.1f} "
+          f"{size_mb / legacy_to:>12.1f} {size_mb / new_to:>12.1f} "
+          f"{size_mb / legacy_back:>12.1f} {size_mb / new_back:>12.1f}")
+
+def main():
+    """NumPy与Matlab数组转换吞吐量测试（MB/s）"""
+    if not MATLAB_AVAILABLE:
+        print("✗ 未安装MATLAB Engine for Python，跳过测试")
+        return
+    
+    matlab_interface = MatlabInterface()
+    
+    print(f"{'形状':>16} {'类型':>8} {'大小(MB)':>9} "
+          f"{'旧 Py→M':>12} {'新 Py→M':>12} {'旧 M→Py':>12} {'新 M→Py':>12}")
+    
+    cases = [
+        (1_000_000, 1, np.float64),
+        (1_000_000, 7, np.float64),
+        (1_000_000, 7, np.float32),
+        (1_000_000, 7, np.int16),
+        (10_000_000, 7, np.float64),
+    ]
+    for rows, cols, dtype in cases:
+        run_case(matlab_interface, rows, cols, dtype)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import sys
+import os
+import argparse
+import shutil
+import tempfile
+import time
+import numpy as np
+
+# 添加python_gui目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.channel_store import ChannelStoreWriter, ChannelStore
+
+# 测试记录的通道数和采样率（Hz），每个采样点为双精度
+N_CHANNELS = 8
+SAMPLE_RATE = 10000.0
+
+# 随机读取的时间窗口长度（秒）和次数
+WINDOW_SECONDS = 10.0
+N_READS = 200
+
+# 写入时每块的采样点数
+WRITE_BLOCK_SAMPLES = 1 << 20
+
+def write_store(store_path, size_gb):
+    """写入指定总大小的测试通道存储，返回采样点数"""
+    n_samples = int(size_gb * 1024 ** 3) // (8 * N_CHANNELS)
+    block = np.random.rand(WRITE_BLOCK_SAMPLES, N_CHANNELS)
+    writer = ChannelStoreWriter(store_path, sample_rate=SAMPLE_RATE)
+    written = 0
+    while written < n_samples:
+        rows = min(WRITE_BLOCK_SAMPLES, n_samples - written)
+        writer.append('acceleration', block[:rows] + written)
+        written += rows
+    writer.close()
+    return n_samples
+
+def drop_page_cache(store_path):
+    """请求操作系统丢弃通道文件的页缓存（不支持posix_fadvise的系统上无效）"""
+    if not hasattr(os, 'posix_fadvise'):
+        return False
+    for name in os.listdir(store_path):
+        fd = os.open(os.path.join(store_path, name), os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return True
+
+def read_windows(store, windows):
+    """读取各时间窗口并求和（确保数据确实从文件读出），返回每次读取的耗时（毫秒）"""
+    times = []
+    for channel, start_time in windows:
+        start = time.perf_counter()
+        window = store.read_time('acceleration', channel, start_time, start_time + WINDOW_SECONDS)
+        float(window.sum())
+        times.append((time.perf_counter() - start) * 1000)
+    return np.array(times)
+
+def main():
+    """通道存储中随机读取10秒时间窗口的耗时（冷读取：丢弃页缓存后；热读取：重复同样的窗口）"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--size-gb', type=float, default=8.0, help="测试记录的总大小（GB）")
+    parser.add_argument('--dir', default=tempfile.gettempdir(), help="写入测试通道存储的目录")
+    parser.add_argument('--keep', action='store_true', help="测试结束后保留通道存储")
+    args = parser.parse_args()
+    
+    store_path = os.path.join(args.dir, 'dms_bench.channels')
+    start = time.perf_counter()
+    n_samples = write_store(store_path, args.size_gb)
+    print(f"写入 {args.size_gb:g} GB（{N_CHANNELS} 通道 × {n_samples} 采样点）: "
+          f"{time.perf_counter() - start:.1f} s")
+    
+    try:
+        duration = n_samples / SAMPLE_RATE
+        rng = np.random.default_rng(0)
+        windows = [(int(rng.integers(N_CHANNELS)), float(rng.uniform(0, duration - WINDOW_SECONDS)))
+                   for _ in range(N_READS)]
+        
+        with ChannelStore(os.path.join(args.dir, 'dms_bench.mat'), store_path) as store:
+            cold_label = "冷读取" if drop_page_cache(store_path) else "首次读取（未能丢弃页缓存）"
+            cold = read_windows(store, windows)
+            warm = read_windows(store, windows)
+        
+        print(f"随机读取 {N_READS} 个 {WINDOW_SECONDS:g} 秒窗口（每个 {int(WINDOW_SECONDS * SAMPLE_RATE)} 采样点）:")
+        for label, times in ((cold_label, cold), ("热读取", warm)):
+            print(f"  {label}: 中位数 {np.median(times):.2f} ms，p95 {np.percentile(times, 95):.2f} ms，"
+                  f"最大 {times.max():.2f} ms")
+    finally:
+        if not args.keep:
+            shutil.rmtree(store_path, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
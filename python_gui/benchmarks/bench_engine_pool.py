@@ -0,0 +1,90 @@
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加python_gui目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.engine_pool import MatlabEnginePool
+
+class FakeEngine:
+    """模拟Matlab引擎：每次调用占用固定时间（引擎在独立进程中运行，不占用Python的GIL）"""
+    
+    def __init__(self, call_seconds, start_seconds):
+        self.call_seconds = call_seconds
+        self.alive = True
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        time.sleep(start_seconds)
+    
+    def __getattr__(self, name):
+        def call(*args, background=False, nargout=1, **kwargs):
+            if background:
+                return self._executor.submit(self._run, args)
+            return self._run(args)
+        return call
+    
+    def _run(self, args):
+        if not self.alive:
+            raise RuntimeError("引擎已退出")
+        time.sleep(self.call_seconds)
+        return len(args)
+    
+    def eval(self, code, nargout=0):
+        if not self.alive:
+            raise RuntimeError("引擎已退出")
+    
+    def quit(self):
+        self.alive = False
+        self._executor.shutdown(wait=False)
+
+def run_sequential(n_calls, call_seconds):
+    """单个引擎依次执行所有调用（当前MatlabInterface的方式）"""
+    eng = FakeEngine(call_seconds, 0.0)
+    start = time.perf_counter()
+    for i in range(n_calls):
+        eng.pwelch(i)
+    elapsed = time.perf_counter() - start
+    eng.quit()
+    return elapsed
+
+def run_pool(n_calls, call_seconds, size):
+    """引擎池中的多个引擎并行执行调用"""
+    pool = MatlabEnginePool(size, engine_factory=lambda: FakeEngine(call_seconds, 0.0))
+    start = time.perf_counter()
+    pool.map('pwelch', [(i,) for i in range(n_calls)], timeout=10.0)
+    elapsed = time.perf_counter() - start
+    pool.shutdown()
+    return elapsed
+
+def test_restart_dead_engine():
+    """验证健康检查能够替换已退出的引擎"""
+    pool = MatlabEnginePool(1, engine_factory=lambda: FakeEngine(0.0, 0.0), health_check_interval=0.0)
+    engine = pool.checkout()
+    pool.checkin(engine)
+    engine.eng.quit()
+    result = pool.call('plot_freq_domain', 1, 2, 3)
+    pool.shutdown()
+    return result == 3
+
+def main():
+    """Matlab引擎池吞吐量测试（使用本地模拟引擎）"""
+    n_calls = 64
+    call_seconds = 0.05
+    
+    print(f"{n_calls} 次独立调用，每次 {call_seconds * 1000:.0f} ms")
+    sequential = run_sequential(n_calls, call_seconds)
+    print(f"{'单引擎顺序执行':<16} {sequential:>8.2f} s {n_calls / sequential:>10.1f} 次/s")
+    
+    for size in (1, 2, 4, 8):
+        elapsed = run_pool(n_calls, call_seconds, size)
+        print(f"{f'引擎池 × {size}':<16} {elapsed:>8.2f} s {n_calls / elapsed:>10.1f} 次/s "
+              f"(加速 {sequential / elapsed:.1f}x)")
+    
+    if test_restart_dead_engine():
+        print("✓ 失效引擎自动重启")
+    else:
+        print("✗ 失效引擎未能重启")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import sys
+import os
+import argparse
+import tempfile
+import time
+import numpy as np
+import h5py
+
+# 添加python_gui目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from utils import mat_io
+
+# 测试记录的通道数和采样率（Hz），每个采样点为双精度
+N_CHANNELS = 8
+SAMPLE_RATE = 10000.0
+
+# 随机读取的时间窗口长度（秒）和次数
+WINDOW_SECONDS = 10.0
+N_READS = 50
+
+# 比较的布局：(名称, write_mat的分块和压缩参数)；None表示所有通道共用一个块（对照组，与按行连续的布局类似）
+LAYOUTS = [
+    ("连续存放", {}),
+    ("分块4096", {'chunk_rows': 4096}),
+    ("分块16384", {'chunk_rows': 16384}),
+    ("分块65536", {'chunk_rows': 65536}),
+    ("分块262144", {'chunk_rows': 262144}),
+    ("分块16384+gzip1", {'chunk_rows': 16384, 'compression': 'gzip', 'compression_level': 1}),
+    ("分块16384+gzip4", {'chunk_rows': 16384, 'compression': 'gzip', 'compression_level': 4}),
+    ("分块65536+gzip4", {'chunk_rows': 65536, 'compression': 'gzip', 'compression_level': 4}),
+    ("分块16384+gzip9", {'chunk_rows': 16384, 'compression': 'gzip', 'compression_level': 9}),
+    ("全通道分块16384+gzip4", None),
+]
+
+def make_signal(n_samples):
+    """生成类似传感器输出的测试数据：正弦波加噪声，按16位ADC的分辨率量化"""
+    rng = np.random.default_rng(0)
+    t = np.arange(n_samples) / SAMPLE_RATE
+    data = np.empty((n_samples, N_CHANNELS))
+    for channel in range(N_CHANNELS):
+        signal = np.sin(2 * np.pi * (5 + channel) * t) + rng.normal(0, 0.1, n_samples)
+        data[:, channel] = np.round(signal * 8192) / 8192
+    return data
+
+def write_all_channel_chunks(file_path, data):
+    """对照组：每块包含所有通道的一段时间，读取一个通道时也要读取并解压其他通道"""
+    with h5py.File(file_path, 'w', userblock_size=mat_io.MAT73_USERBLOCK_SIZE) as f:
+        dataset = f.create_dataset('acceleration', shape=data.shape[::-1], dtype=data.dtype,
+                                   chunks=(N_CHANNELS, 16384), compression='gzip', compression_opts=4, shuffle=True)
+        # 整体写入：逐通道写入时每块都要反复解压和重新压缩
+        dataset[...] = data.T
+        dataset.attrs['MATLAB_class'] = np.bytes_('double')
+    mat_io.write_mat73_header(file_path)
+
+def drop_page_cache(file_path):
+    """请求操作系统丢弃文件的页缓存（不支持posix_fadvise的系统上无效）"""
+    if not hasattr(os, 'posix_fadvise'):
+        return False
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+    return True
+
+def read_windows(file_path, windows):
+    """通过MatFile逐个读取时间窗口，返回每次读取的耗时（毫秒）"""
+    window_samples = int(WINDOW_SECONDS * SAMPLE_RATE)
+    times = []
+    with mat_io.MatFile(file_path) as mat_file:
+        variable = mat_file['acceleration']
+        for channel, start in windows:
+            begin = time.perf_counter()
+            variable[start:start + window_samples, channel]
+            times.append((time.perf_counter() - begin) * 1000)
+    return np.array(times)
+
+def read_channel(file_path):
+    """读取一个完整通道的耗时（秒）"""
+    begin = time.perf_counter()
+    with mat_io.MatFile(file_path) as mat_file:
+        mat_file['acceleration'][:, 0]
+    return time.perf_counter() - begin
+
+def main():
+    """比较v7.3文件不同分块和压缩设置下的文件大小、写入速度、随机读取10秒窗口和读取单个通道的耗时"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--size-mb', type=float, default=512, help="测试数据的大小（MB）")
+    parser.add_argument('--dir', default=tempfile.gettempdir(), help="写入测试文件的目录")
+    args = parser.parse_args()
+    
+    n_samples = int(args.size_mb * 1024 * 1024) // (8 * N_CHANNELS)
+    data = make_signal(n_samples)
+    rng = np.random.default_rng(1)
+    window_samples = int(WINDOW_SECONDS * SAMPLE_RATE)
+    windows = [(int(rng.integers(N_CHANNELS)), int(rng.integers(0, n_samples - window_samples)))
+               for _ in range(N_READS)]
+    file_path = os.path.join(args.dir, 'dms_bench_layout.mat')
+    
+    print(f"{N_CHANNELS} 通道 × {n_samples} 采样点（{data.nbytes / 1024 ** 2:.0f} MB），"
+          f"随机读取 {N_READS} 个 {WINDOW_SECONDS:g} 秒的单通道窗口")
+    print(f"{'布局':<22} {'大小(MB)':>9} {'写入(MB/s)':>11} {'冷读取(ms)':>11} {'热读取(ms)':>11} {'单通道(s)':>10}")
+    for name, layout in LAYOUTS:
+        begin = time.perf_counter()
+        if layout is None:
+            write_all_channel_chunks(file_path, data)
+        else:
+            mat_io.write_mat(file_path, {'acceleration': data}, **layout)
+        write_seconds = time.perf_counter() - begin
+        size_mb = os.path.getsize(file_path) / 1024 ** 2
+        
+        drop_page_cache(file_path)
+        cold = read_windows(file_path, windows)
+        warm = read_windows(file_path, windows)
+        drop_page_cache(file_path)
+        channel_seconds = read_channel(file_path)
+        
+        print(f"{name:<22} {size_mb:>9.1f} {data.nbytes / 1024 ** 2 / write_seconds:>11.0f} "
+              f"{np.median(cold):>11.2f} {np.median(warm):>11.2f} {channel_seconds:>10.2f}")
+        os.remove(file_path)
+    
+    print("冷读取在读取前丢弃文件的页缓存，耗时均为中位数")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import sys
+import os
+import time
+import numpy as np
+
+# 添加python_gui目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.matlab_interface import MatlabInterface, MATLAB_ENGINE_AVAILABLE, FILE_HANDOFF_THRESHOLD_BYTES
+
+# 测试的数组大小（MB），每个数组8列双精度数据
+SIZES_MB = [1, 4, 16, 64, 256, 1024]
+N_COLS = 8
+
+def measure(func, repeat=3):
+    """返回多次运行中的最短耗时（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def direct_transfer(matlab_interface, data):
+    """经过引擎的数组转换放入工作区"""
+    matlab_interface.eng.workspace['dms_bench'] = matlab_interface.numpy_to_matlab(data)
+
+def file_transfer(matlab_interface, data):
+    """写入临时二进制文件后由Matlab读取（任何大小的数组都通过文件）"""
+    threshold = matlab_interface.handoff_threshold_bytes
+    matlab_interface.handoff_threshold_bytes = 0
+    try:
+        matlab_interface._put_array('dms_bench', data)
+    finally:
+        matlab_interface.handoff_threshold_bytes = threshold
+
+def python_side_file_write(matlab_interface, data):
+    """只测量写入临时文件的耗时（没有Matlab引擎时使用）"""
+    path = matlab_interface._write_handoff_file(data)[0]
+    matlab_interface._remove_handoff_files(path)
+
+def main():
+    """大数组交给Matlab的耗时：经过引擎转换与通过临时二进制文件，给出两者的交接点"""
+    matlab_interface = MatlabInterface()
+    engine_ready = False
+    if MATLAB_ENGINE_AVAILABLE and matlab_interface.start_engine():
+        matlab_interface.set_functions_path(os.path.join(os.path.dirname(__file__), "..", "..", "matlab_functions"))
+        engine_ready = True
+    else:
+        print("未能启动Matlab引擎，只测量Python端写入临时文件的耗时")
+    
+    print(f"{'大小(MB)':>10} {'直接转换 (s)':>14} {'临时文件 (s)':>14} {'加速':>8}")
+    crossover = None
+    for size_mb in SIZES_MB:
+        rows = size_mb * 1024 * 1024 // (8 * N_COLS)
+        data = np.random.rand(rows, N_COLS)
+        
+        if engine_ready:
+            direct = measure(lambda: matlab_interface.executor.call(direct_transfer, matlab_interface, data))
+            by_file = measure(lambda: matlab_interface.executor.call(file_transfer, matlab_interface, data))
+            matlab_interface.call_function('eval', 'clear dms_bench', nargout=0)
+            if by_file < direct and crossover is None:
+                crossover = size_mb
+            elif by_file >= direct:
+                crossover = None
+            print(f"{size_mb:>10} {direct:>14.3f} {by_file:>14.3f} {direct / by_file:>7.1f}x")
+        else:
+            by_file = measure(lambda: python_side_file_write(matlab_interface, data))
+            print(f"{size_mb:>10} {'-':>14} {by_file:>14.3f} {'-':>8}")
+        del data
+    
+    if engine_ready:
+        if crossover is None:
+            print("所有测试大小下直接转换都不慢于临时文件")
+        else:
+            print(f"不小于 {crossover} MB 的数组通过临时文件更快，可据此设置FILE_HANDOFF_THRESHOLD_BYTES"
+                  f"（当前为 {FILE_HANDOFF_THRESHOLD_BYTES // (1024 * 1024)} MB）")
+    matlab_interface.stop_engine()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import sys
+import os
+import time
+import numpy as np
+from concurrent.futures import Future
+
+# 添加python_gui目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.matlab_interface import MatlabInterface, MATLAB_ENGINE_AVAILABLE
+from utils.minmax_pyramid import decimate_minmax
+
+# 模拟引擎的耗时参数（秒）：每次引擎调用的往返开销、新建图形窗口、每个子图
+FAKE_CALL_SECONDS = 0.005
+FAKE_FIGURE_SECONDS = 0.15
+FAKE_AXES_SECONDS = 0.03
+
+# 6通道IMU：加速度X/Y/Z和陀螺仪X/Y/Z
+CHANNEL_NAMES = ["加速度 1", "加速度 2", "加速度 3", "陀螺仪 1", "陀螺仪 2", "陀螺仪 3"]
+
+class FakeEngine:
+    """模拟Matlab引擎：每次绘图调用新建一个图形窗口，每列数据一个子图；大数组与真实引擎一样通过临时二进制文件交接"""
+    
+    def _plot(self, data, *args, nargout=0, background=False):
+        time.sleep(FAKE_CALL_SECONDS + FAKE_FIGURE_SECONDS + FAKE_AXES_SECONDS * data.shape[1])
+        if background:
+            # 后台调用返回已完成的结果，执行线程等待它的方式与真实引擎相同
+            future = Future()
+            future.set_result(None)
+            return future
+    
+    plot_time_domain = _plot
+    plot_freq_domain = _plot
+    
+    def load_binary_matrix(self, file_path, n_rows, n_cols, class_name, delete_file=False, nargout=1):
+        """与load_binary_matrix.m相同：按列优先顺序读取临时二进制文件，可选读取后删除"""
+        data = np.fromfile(file_path, dtype=np.dtype(class_name)).reshape((n_rows, n_cols), order='F')
+        if data.size != n_rows * n_cols:
+            raise RuntimeError(f"文件中的数据不完整: {file_path}")
+        if delete_file:
+            os.remove(file_path)
+        return data
+    
+    def call_with_binary_matrix(self, func_name, file_path, n_rows, n_cols, class_name, *args, nargout=0,
+                                background=False):
+        """与call_with_binary_matrix.m相同：读取临时文件（读取后删除）后调用绘图函数"""
+        data = self.load_binary_matrix(file_path, n_rows, n_cols, class_name, True)
+        return getattr(self, func_name)(data, *args, nargout=nargout, background=background)
+    
+    def quit(self):
+        pass
+
+class FakeMatlabInterface(MatlabInterface):
+    """使用模拟引擎的Matlab接口：数据转换以一次列优先复制代替"""
+    
+    def numpy_to_matlab(self, np_array):
+        np_array = np.asarray(np_array, dtype=np.float64)
+        if np_array.ndim == 1:
+            np_array = np_array.reshape(-1, 1)
+        return np.asfortranarray(np_array)
+
+def check_plot(success, action):
+    """绘图失败时中止测量，失败的调用不计入耗时"""
+    if not success:
+        raise RuntimeError(f"{action}失败，测量中止")
+
+def plot_per_channel(matlab_interface, data, sample_rate, point_budget):
+    """当前方式：每个通道单独抽样、传输并绘制一个图形窗口"""
+    for i in range(data.shape[1]):
+        rows, values = decimate_minmax(data[:, i], point_budget)
+        check_plot(matlab_interface.plot_time_domain(values, sample_rate, title=CHANNEL_NAMES[i],
+                                                     times=rows / sample_rate), "绘制时域图")
+        check_plot(matlab_interface.plot_freq_domain(data[:, i], sample_rate, title=CHANNEL_NAMES[i]),
+                   "绘制频域图")
+
+def plot_multichannel(matlab_interface, data, sample_rate, point_budget):
+    """多通道方式：所有通道组成一个连续矩阵，一次调用绘制在同一个图形窗口中"""
+    rows, values = decimate_minmax(data, point_budget)
+    check_plot(matlab_interface.plot_time_domain(np.ascontiguousarray(values), sample_rate, title="IMU",
+                                                 times=rows / sample_rate, channel_names=CHANNEL_NAMES),
+               "绘制时域图")
+    check_plot(matlab_interface.plot_freq_domain(data, sample_rate, title="IMU", channel_names=CHANNEL_NAMES),
+               "绘制频域图")
+
+def create_interface():
+    """有Matlab引擎时使用真实引擎，否则使用模拟引擎"""
+    if MATLAB_ENGINE_AVAILABLE:
+        matlab_interface = MatlabInterface()
+        if matlab_interface.start_engine():
+            matlab_interface.set_functions_path(
+                os.path.join(os.path.dirname(__file__), "..", "..", "matlab_functions")
+            )
+            return matlab_interface, "Matlab引擎"
+    
+    matlab_interface = FakeMatlabInterface()
+    matlab_interface.eng = FakeEngine()
+    return matlab_interface, "模拟引擎"
+
+def measure(func, matlab_interface, data, sample_rate, point_budget):
+    """返回一次绘制的总耗时（秒）"""
+    start = time.perf_counter()
+    func(matlab_interface, data, sample_rate, point_budget)
+    elapsed = time.perf_counter() - start
+    if not isinstance(matlab_interface, FakeMatlabInterface):
+        matlab_interface.call_function('close', 'all')
+    return elapsed
+
+def main():
+    """6通道IMU数据的时域图和频域图绘制总耗时：逐通道绘制与多通道一次绘制"""
+    matlab_interface, engine_name = create_interface()
+    print(f"使用{engine_name}")
+    print(f"{'采样点数':>12} {'逐通道 (s)':>12} {'多通道 (s)':>12} {'加速':>8}")
+    
+    sample_rate = 1000.0
+    point_budget = 20000
+    try:
+        for rows in (60_000, 600_000, 3_600_000):
+            data = np.random.randn(rows, len(CHANNEL_NAMES))
+            per_channel = measure(plot_per_channel, matlab_interface, data, sample_rate, point_budget)
+            multichannel = measure(plot_multichannel, matlab_interface, data, sample_rate, point_budget)
+            print(f"{rows:>12} {per_channel:>12.2f} {multichannel:>12.2f} {per_channel / multichannel:>7.1f}x")
+    except RuntimeError as e:
+        print(e)
+        sys.exit(1)
+    finally:
+        matlab_interface.stop_engine()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.batch_converter import BatchConverter, collect_input_files, BATCH_OUTPUT_FORMATS
+from utils.mat_io import MAT73_COMPRESSIONS
+
+def load_mapping(mapping_file):
+    """读取映射说明文件，例如 {"acceleration": [0, 1, 2], "gyroscope": [3, 4, 5], "noise": [6]}（列号从0开始）"""
+    if not mapping_file:
+        return None
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        mapping = json.load(f)
+    return {key: [int(col) for col in mapping.get(key, [])] for key in ('acceleration', 'gyroscope', 'noise')}
+
+def cmd_convert(args):
+    """批量转换命令"""
+    input_files = collect_input_files(args.paths, recursive=args.recursive)
+    if not input_files:
+        print("没有找到需要转换的文件")
+        return 1
+    
+    converter = BatchConverter(
+        output_dir=args.output_dir,
+        data_mapping=load_mapping(args.mapping),
+        workers=args.workers,
+        streaming=not args.no_streaming,
+        dtype=args.dtype,
+        memory_budget_mb=args.memory_budget,
+        csv_engine=args.csv_engine,
+        mat_version=args.mat_version,
+        chunk_rows=args.chunk_rows,
+        compression=args.compression,
+        compression_level=args.compression_level,
+        resume=not args.no_resume,
+        build_overview=args.overview,
+        build_channel_store=args.channel_store,
+        output_format=args.format
+    )
+    
+    if args.mat_version != '7.3' and args.format == 'mat' and not args.no_streaming:
+        print(f"提示：v{args.mat_version}格式的.mat文件不能流式写入，每个文件将整体读取后转换")
+    print(f"开始转换 {len(input_files)} 个文件（{converter.workers} 个进程）...")
+    start = time.perf_counter()
+    
+    def print_result(result):
+        name = os.path.basename(result['input_file'])
+        if result.get('skipped'):
+            print(f"- {name}  已转换，跳过")
+        elif result['success']:
+            print(f"✓ {name}  {result['seconds']:.2f} s")
+        else:
+            print(f"✗ {name}  {result['seconds']:.2f} s  {result['error']}")
+    
+    results = converter.run(input_files, result_callback=print_result)
+    
+    converted = sum(1 for r in results if r['success'] and not r.get('skipped'))
+    skipped = sum(1 for r in results if r.get('skipped'))
+    failed = [r for r in results if not r['success']]
+    print("=" * 50)
+    print(f"完成：转换 {converted} 个，跳过 {skipped} 个，失败 {len(failed)} 个，"
+          f"总耗时 {time.perf_counter() - start:.2f} s")
+    
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    
+    return 1 if failed else 0
+
+def build_parser():
+    """创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(description="全周期数据管理系统命令行工具")
+    subparsers = parser.add_subparsers(dest='command')
+    
+    convert_parser = subparsers.add_parser('convert', help="批量将数据文件转换为.mat格式")
+    convert_parser.add_argument('paths', nargs='+', help="输入文件或目录")
+    convert_parser.add_argument('--mapping', help="数据列映射说明文件（JSON）")
+    convert_parser.add_argument('--output-dir', help="输出目录（默认与输入文件相同）")
+    convert_parser.add_argument('--workers', type=int, default=None, help="并行进程数（默认为CPU核数）")
+    convert_parser.add_argument('--recursive', action='store_true', help="递归查找子目录中的文件")
+    convert_parser.add_argument('--dtype', default=None, help="输出数据类型，例如float32")
+    convert_parser.add_argument('--memory-budget', type=float, default=256, help="CSV流式转换的内存预算（MB）")
+    convert_parser.add_argument('--csv-engine', choices=['c', 'pyarrow'], default=None, help="CSV解析引擎")
+    convert_parser.add_argument('--format', choices=BATCH_OUTPUT_FORMATS, default='mat',
+                                help="输出格式（Parquet/Feather文件的表结构元数据中保存数据列映射）")
+    convert_parser.add_argument('--mat-version', choices=['7.3', '5'], default='7.3',
+                                help=".mat文件版本（流式转换只能写入7.3格式，指定5时每个文件整体读取后写入）")
+    convert_parser.add_argument('--chunk-rows', type=int, default=None,
+                                help="v7.3文件中每个通道按时间方向分块的采样点数（默认不分块，流式转换时为16384）")
+    convert_parser.add_argument('--compression', choices=list(MAT73_COMPRESSIONS), default=None,
+                                help="v7.3文件的压缩方式（同时启用字节重排）")
+    convert_parser.add_argument('--compression-level', type=int, choices=range(10), default=None,
+                                metavar='0-9', help="压缩级别（默认4）")
+    convert_parser.add_argument('--no-streaming', action='store_true',
+                                help="整体读取CSV和Parquet/Feather文件而不是分块流式转换（--mat-version 5时总是整体读取）")
+    convert_parser.add_argument('--no-resume', action='store_true', help="忽略上次的转换记录，重新转换所有文件")
+    convert_parser.add_argument('--overview', action='store_true', help="同时生成波形概览文件（*.overview.h5）")
+    convert_parser.add_argument('--channel-store', action='store_true',
+                                help="同时生成按通道内存映射的通道存储（*.channels），用于大文件的随机读取")
+    convert_parser.add_argument('--report', help="将每个文件的耗时和失败原因写入JSON报告")
+    convert_parser.set_defaults(func=cmd_convert)
+    
+    return parser
+
+def main(argv=None):
+    """命令行入口"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not getattr(args, 'func', None):
+        parser.print_help()
+        return 1
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
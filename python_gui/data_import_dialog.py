@@ -1,10 +1,86 @@
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, 
-                            QFileDialog, QTableWidget, QTableWidgetItem, QComboBox, 
-                            QGroupBox, QGridLayout, QMessageBox, QProgressBar)
+                            QFileDialog, QTableView, QComboBox, 
+                            QGroupBox, QGridLayout, QMessageBox, QProgressBar, QApplication,
+                            QCheckBox)
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 import numpy as np
 import os
-from utils.file_handler import FileHandler
+import threading
+from utils.file_handler import FileHandler, make_progress_reporter
+from array_table_model import NumpyTableModel, configure_table_view
+
+# 预览中各列统计的行名和对应的键
+STATS_ROWS = [("最小值", 'min'), ("最大值", 'max'), ("均值", 'mean'), ("标准差", 'std'), ("缺失值", 'missing')]
+# 转换本身占进度条的比例，其余部分平分给转换后的概览、通道存储和加入记录目录等步骤
+CONVERT_PROGRESS_SHARE = 0.7
+
+class ImportWorker(QThread):
+    """在后台线程中转换数据文件"""
+    
+    # 信号：转换进度（0~100）
+    progress = pyqtSignal(int)
+    # 信号：转换完成（是否成功）
+    import_finished = pyqtSignal(bool)
+    
+    def __init__(self, file_handler, input_file, output_file, data_mapping,
+                 build_channel_store=False, catalog=None, sample_rate=None):
+        super().__init__()
+        self.file_handler = file_handler
+        self.input_file = input_file
+        self.output_file = output_file
+        self.data_mapping = data_mapping
+        self.build_channel_store = build_channel_store
+        self.catalog = catalog
+        self.sample_rate = sample_rate
+        self.cancel_event = threading.Event()
+    
+    def run(self):
+        # CSV和Parquet/Feather文件分块流式转换（Parquet/Feather只读取映射的列），内存占用不随文件大小增长，
+        # 其他格式才完整读取源文件；取消时只删除本次写入的临时文件，成功后再生成概览文件，重新打开时可以立即显示波形概览
+        success = self.file_handler.convert_to_mat(
+            self.input_file, self.output_file, self.data_mapping,
+            streaming=True,
+            progress_callback=make_progress_reporter(self._report_progress, end=CONVERT_PROGRESS_SHARE),
+            cancel_event=self.cancel_event
+        )
+        
+        # 转换后的步骤各占一段进度，每一步开始前检查是否已取消；取消时保留已转换的文件，不再执行后续步骤
+        steps = self._finish_steps()
+        share = (1.0 - CONVERT_PROGRESS_SHARE) / len(steps)
+        for i, step in enumerate(steps):
+            if not success:
+                break
+            if self.cancel_event.is_set():
+                print(f"已取消导入，保留已转换的文件: {self.output_file}")
+                success = False
+                break
+            start = CONVERT_PROGRESS_SHARE + i * share
+            step(make_progress_reporter(self._report_progress, self.cancel_event, start, start + share))
+            self._report_progress(start + share)
+        self.import_finished.emit(success and not self.cancel_event.is_set())
+    
+    def _finish_steps(self):
+        """转换成功后依次执行的步骤，每个步骤接收报告阶段内进度(0~1)的函数"""
+        steps = [lambda progress: self.file_handler.build_overview(self.output_file, progress_callback=progress)]
+        if self.build_channel_store:
+            steps.append(lambda progress: self.file_handler.build_channel_store(
+                self.output_file, self.sample_rate, progress_callback=progress))
+        if self.catalog is not None:
+            # 转换后的文件按块统计各通道后加入记录目录（统计过程不能中途取消）
+            steps.append(lambda progress: self.catalog.add_mat_file(
+                self.output_file, sample_rate=self.sample_rate,
+                data_mapping=self.data_mapping, original_file=self.input_file))
+        return steps
+    
+    def cancel(self):
+        """请求取消转换"""
+        self.cancel_event.set()
+    
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+    
+    def _report_progress(self, fraction):
+        self.progress.emit(int(fraction * 100))
 
 class DataImportDialog(QDialog):
     """数据导入对话框"""
@@ -12,11 +88,16 @@ class DataImportDialog(QDialog):
     # 信号：数据导入完成
     data_imported = pyqtSignal(dict)
     
-    def __init__(self, file_handler, parent=None):
+    def __init__(self, file_handler, parent=None, catalog=None, sample_rate=None):
         super().__init__(parent)
         self.file_handler = file_handler
+        # 导入成功后在后台线程中把转换后的文件加入记录目录
+        self.catalog = catalog
+        self.sample_rate = sample_rate
         self.current_file = None
-        self.current_data = None
+        self.preview = None
+        self.import_worker = None
+        self.output_file = None
         self.data_mapping = {
             'acceleration': [],
             'gyroscope': [],
@@ -47,9 +128,24 @@ class DataImportDialog(QDialog):
         preview_group = QGroupBox("数据预览")
         preview_layout = QVBoxLayout()
         
-        self.preview_table = QTableWidget()
-        self.preview_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        # 预览信息：总行数和预览包含的行
+        self.preview_info_label = QLabel("")
+        preview_layout.addWidget(self.preview_info_label)
+        
+        # 预览表格按需格式化可见单元格
+        self.preview_model = NumpyTableModel()
+        self.preview_table = QTableView()
+        self.preview_table.setModel(self.preview_model)
+        configure_table_view(self.preview_table)
         preview_layout.addWidget(self.preview_table)
+        
+        # 各列统计（根据预览的行计算）
+        self.stats_model = NumpyTableModel()
+        self.stats_table = QTableView()
+        self.stats_table.setModel(self.stats_model)
+        configure_table_view(self.stats_table)
+        self.stats_table.setFixedHeight(self.stats_table.verticalHeader().defaultSectionSize() * (len(STATS_ROWS) + 1) + 4)
+        preview_layout.addWidget(self.stats_table)
         preview_group.setLayout(preview_layout)
         main_layout.addWidget(preview_group)
         
@@ -83,6 +179,10 @@ class DataImportDialog(QDialog):
         mapping_group.setLayout(mapping_layout)
         main_layout.addWidget(mapping_group)
         
+        # 通道存储：每个通道一个连续的二进制文件，大文件可按时间段随机读取而不加载整个文件
+        self.channel_store_check = QCheckBox("同时生成通道存储（*.channels，用于大文件的按通道和时间段读取）")
+        main_layout.addWidget(self.channel_store_check)
+        
         # 进度条
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
@@ -95,7 +195,7 @@ class DataImportDialog(QDialog):
         self.import_btn.setEnabled(False)
         
         self.cancel_btn = QPushButton("取消")
-        self.cancel_btn.clicked.connect(self.reject)
+        self.cancel_btn.clicked.connect(self._on_cancel_clicked)
         
         btn_layout.addStretch()
         btn_layout.addWidget(self.import_btn)
@@ -125,80 +225,96 @@ class DataImportDialog(QDialog):
     def browse_file(self):
         """浏览文件"""
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "选择数据文件", "", "支持的文件 (*.xlsx *.xls *.csv *.mat)"
+            self, "选择数据文件", "", "支持的文件 (*.xlsx *.xls *.csv *.mat *.parquet *.feather *.arrow)"
         )
         
         if file_path:
             self.current_file = file_path
             self.file_label.setText(os.path.basename(file_path))
             
-            # 读取文件并显示预览
-            self._load_file_data()
+            # 快速预览文件，完整解析在点击导入后进行
+            self._load_preview()
     
-    def _load_file_data(self):
-        """加载文件数据"""
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(20)
-        
-        # 读取文件
-        self.current_data = self.file_handler.read_file(self.current_file)
-        
-        # 如果是列表，只取第一个数据集
-        if isinstance(self.current_data, list):
-            self.current_data = self.current_data[0]
-        
-        self.progress_bar.setValue(50)
+    def _load_preview(self):
+        """只读取文件开头若干行和均匀抽样的行，显示预览、各列统计并更新列选项"""
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            self.preview = self.file_handler.read_preview(self.current_file)
+        finally:
+            QApplication.restoreOverrideCursor()
+        
+        if self.preview is None:
+            self.import_btn.setEnabled(False)
+            self.preview_info_label.setText("")
+            self.preview_model.set_data(None)
+            self.stats_model.set_data(None)
+            QMessageBox.critical(self, "错误", "读取数据文件失败！")
+            return
         
         # 显示数据预览
         self._show_data_preview()
         
-        self.progress_bar.setValue(80)
-        
         # 更新组合框选项
         self._update_combo_options()
         
-        self.progress_bar.setValue(100)
-        self.progress_bar.setVisible(False)
+        # Parquet/Feather文件中保存了数据列映射时直接选中
+        self._apply_stored_mapping()
         
         # 启用导入按钮
         self.import_btn.setEnabled(True)
     
     def _show_data_preview(self):
-        """显示数据预览"""
-        if self.current_data is None:
+        """显示数据预览和各列统计"""
+        if self.preview is None:
             return
         
-        # 获取数据维度
-        rows, cols = self.current_data.shape
-        
-        # 限制预览行数
-        preview_rows = min(20, rows)
+        data = self.preview['data']
+        row_numbers = self.preview['row_numbers']
+        head_rows = self.preview['head_rows']
+        estimated = self.preview['rows_estimated']
         
-        # 设置表格维度
-        self.preview_table.setRowCount(preview_rows)
-        self.preview_table.setColumnCount(cols)
+        # 抽样行的行号是估计值时加“≈”标注
+        row_labels = [str(row) if i < head_rows or not estimated else f"≈{row}" for i, row in enumerate(row_numbers)]
+        column_names = self._get_column_labels()
+        self.preview_model.set_data(data, column_names, row_labels)
         
-        # 设置列名
-        self.preview_table.setHorizontalHeaderLabels([f"列 {i+1}" for i in range(cols)])
+        # 各列统计
+        stats = np.array([[self._format_stat(column[key]) for column in self.preview['stats']] for _, key in STATS_ROWS], dtype=object)
+        self.stats_model.set_data(stats.reshape(len(STATS_ROWS), -1), column_names, [name for name, _ in STATS_ROWS])
         
-        # 填充数据
-        for i in range(preview_rows):
-            for j in range(cols):
-                item = QTableWidgetItem(str(self.current_data[i, j]))
-                self.preview_table.setItem(i, j, item)
+        info = f"共约 {self.preview['rows']} 行" if estimated else f"共 {self.preview['rows']} 行"
+        info += f" × {data.shape[1] if data.ndim > 1 else 0} 列，预览显示开头 {head_rows} 行"
+        if len(row_numbers) > head_rows:
+            info += f"和均匀抽样的 {len(row_numbers) - head_rows} 行"
+        self.preview_info_label.setText(info + "（统计根据预览的行计算，点击“导入”后读取全部数据）")
         
-        # 调整列宽
+        # 按可见行的内容调整列宽
         self.preview_table.resizeColumnsToContents()
+        self.stats_table.resizeColumnsToContents()
+    
+    def _get_column_labels(self):
+        """列标签：列号，有表头时附加列名"""
+        labels = []
+        for i, name in enumerate(self.preview['column_names']):
+            label = f"列 {i+1}"
+            labels.append(label if name == label else f"{label} ({name})")
+        return labels
+    
+    def _format_stat(self, value):
+        """格式化统计值，非数值列显示“-”"""
+        if value is None:
+            return "-"
+        if isinstance(value, int):
+            return str(value)
+        return f"{value:.6g}"
     
     def _update_combo_options(self):
         """更新组合框选项"""
-        if self.current_data is None:
+        if self.preview is None:
             return
         
-        cols = self.current_data.shape[1]
-        
         # 创建选项列表（包括空选项）
-        options = ["未选择"] + [f"列 {i+1}" for i in range(cols)]
+        options = ["未选择"] + self._get_column_labels()
         
         # 更新所有组合框
         for combo in [self.accel_combo1, self.accel_combo2, self.accel_combo3,
@@ -207,6 +323,22 @@ class DataImportDialog(QDialog):
             combo.clear()
             combo.addItems(options)
     
+    def _apply_stored_mapping(self):
+        """按预览中读取到的文件自带映射设置各组合框"""
+        mapping = self.preview.get('data_mapping') if self.preview else None
+        if not mapping:
+            return
+        
+        combos = {
+            'acceleration': [self.accel_combo1, self.accel_combo2, self.accel_combo3],
+            'gyroscope': [self.gyro_combo1, self.gyro_combo2, self.gyro_combo3],
+            'noise': [self.noise_combo]
+        }
+        for key, key_combos in combos.items():
+            for combo, col in zip(key_combos, mapping.get(key, [])):
+                if col + 1 < combo.count():
+                    combo.setCurrentIndex(col + 1)  # 加上空选项
+    
     def _update_mapping(self):
         """更新数据映射"""
         # 重置映射
@@ -234,42 +366,71 @@ class DataImportDialog(QDialog):
             self.data_mapping['noise'].append(idx)
     
     def import_data(self):
-        """导入数据"""
-        if not self.current_file or self.current_data is None:
+        """导入数据（在后台线程中转换，界面保持响应）"""
+        if not self.current_file or self.preview is None:
             QMessageBox.warning(self, "警告", "请先选择并加载数据文件")
             return
         
         # 显示进度
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
+        self.import_btn.setEnabled(False)
+        self.browse_btn.setEnabled(False)
+        self.cancel_btn.setText("取消导入")
         
         # 获取输出文件名
         base_name = os.path.splitext(os.path.basename(self.current_file))[0]
-        output_file = os.path.join(os.path.dirname(self.current_file), f"{base_name}_converted.mat")
-        
-        self.progress_bar.setValue(30)
-        
-        # 转换文件格式
-        success = self.file_handler.convert_to_mat(
-            self.current_file, output_file, self.data_mapping
+        self.output_file = os.path.join(os.path.dirname(self.current_file), f"{base_name}_converted.mat")
+        
+        # 启动转换线程（在后台按映射读取源文件并转换）
+        self.import_worker = ImportWorker(
+            self.file_handler, self.current_file, self.output_file, dict(self.data_mapping),
+            build_channel_store=self.channel_store_check.isChecked(),
+            catalog=self.catalog,
+            sample_rate=self.sample_rate
         )
-        
-        self.progress_bar.setValue(80)
+        self.import_worker.progress.connect(self.progress_bar.setValue)
+        self.import_worker.import_finished.connect(self._on_import_finished)
+        self.import_worker.start()
+    
+    def _on_import_finished(self, success):
+        """转换完成后的处理"""
+        cancelled = self.import_worker.is_cancelled()
+        self.import_worker.wait()
+        self.import_worker = None
+        self.progress_bar.setVisible(False)
+        self.import_btn.setEnabled(True)
+        self.browse_btn.setEnabled(True)
+        self.cancel_btn.setText("取消")
         
         if success:
-            # 发送数据导入完成信号
+            # 发送数据导入完成信号（数据不在内存中，由接收方按需从转换后的文件读取）
             result = {
                 'original_file': self.current_file,
-                'converted_file': output_file,
-                'data_mapping': self.data_mapping,
-                'data': self.current_data
+                'converted_file': self.output_file,
+                'data_mapping': self.data_mapping
             }
             self.data_imported.emit(result)
             
-            QMessageBox.information(self, "成功", f"数据导入成功！\n转换后的文件：{output_file}")
-            self.progress_bar.setValue(100)
-            self.progress_bar.setVisible(False)
+            QMessageBox.information(self, "成功", f"数据导入成功！\n转换后的文件：{self.output_file}")
             self.accept()
+        elif cancelled:
+            QMessageBox.information(self, "提示", "数据导入已取消")
         else:
             QMessageBox.critical(self, "错误", "数据导入失败！")
-            self.progress_bar.setVisible(False)
+    
+    def _on_cancel_clicked(self):
+        """取消按钮：有后台任务时取消任务，否则关闭对话框"""
+        if self.import_worker is not None:
+            self.import_worker.cancel()
+        else:
+            self.reject()
+    
+    def reject(self):
+        """关闭对话框前取消并等待后台任务结束"""
+        if self.import_worker is not None:
+            # 对话框即将关闭，不再处理任务完成信号
+            self.import_worker.blockSignals(True)
+            self.import_worker.cancel()
+            self.import_worker.wait()
+        super().reject()
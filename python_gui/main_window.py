@@ -1,35 +1,67 @@
 from PyQt5.QtWidgets import (QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QMenuBar, 
                             QToolBar, QStatusBar, QAction, QDockWidget, QListWidget, 
-                            QGroupBox, QLabel, QSplitter, QMessageBox)
-from PyQt5.QtCore import Qt, QSize
+                            QListWidgetItem, QGroupBox, QLabel, QSplitter, QMessageBox,
+                            QFileDialog, QApplication, QTableView, QLineEdit, QComboBox,
+                            QDoubleSpinBox, QFormLayout)
+from PyQt5.QtCore import Qt, QSize, pyqtSignal
 from PyQt5.QtGui import QIcon
 import sys
 import os
+import time
 
 # 导入自定义组件
 from data_import_dialog import DataImportDialog
 from data_mapping_widget import DataMappingWidget
-from visualization_panel import VisualizationPanel
+from visualization_panel import VisualizationPanel, DATA_TYPE_KEYS
+from array_table_model import NumpyTableModel, configure_table_view
 from utils.matlab_interface import MatlabInterface
 from utils.file_handler import FileHandler
+from utils.arrow_io import is_arrow_file
+from utils.recording_catalog import RecordingCatalog
+from utils.dataset_cache import DatasetCache, RecordingView, DEFAULT_CACHE_BUDGET_BYTES
+
+# 文件列表中最多显示的记录数
+FILE_LIST_LIMIT = 1000
+
+# 按导入时间筛选的选项：名称 -> 距今的秒数（None为不限）
+IMPORT_PERIODS = [("全部时间", None), ("今天", 86400), ("最近7天", 7 * 86400), ("最近30天", 30 * 86400)]
 
 class MainWindow(QMainWindow):
     """主界面"""
     
+    # Matlab引擎启动完成（在执行线程中发出）
+    engine_started = pyqtSignal(bool)
+    
     def __init__(self):
         super().__init__()
         
         print("初始化主窗口...")
         
-        # 初始化Matlab接口
-        self.matlab_interface = MatlabInterface()
+        # 初始化Matlab接口（设置环境变量DMS_KEEP_MATLAB_SESSION=1时，关闭界面后保留共享Matlab会话供下次连接）
+        self.matlab_interface = MatlabInterface(
+            keep_shared_session=os.environ.get('DMS_KEEP_MATLAB_SESSION') == '1'
+        )
         self.matlab_available = False
+        self.engine_started.connect(self._on_matlab_engine_started)
         
         # 当前数据和映射
         self.current_data = None
         self.current_mapping = None
         self.current_file = None
         
+        # 在文件列表中选中的记录按通道读取到共享的缓存中（设置环境变量DMS_CACHE_BUDGET_MB可修改内存上限）
+        budget_mb = os.environ.get('DMS_CACHE_BUDGET_MB')
+        self.dataset_cache = DatasetCache(
+            int(float(budget_mb) * 1024 * 1024) if budget_mb else DEFAULT_CACHE_BUDGET_BYTES
+        )
+        
+        # 已转换记录的目录（数据库位于应用数据目录）
+        try:
+            self.catalog = RecordingCatalog()
+        except Exception as e:
+            print(f"打开记录目录失败: {e}")
+            self.catalog = None
+        
         # 初始化界面
         print("初始化界面...")
         self.init_ui()
@@ -78,12 +110,23 @@ class MainWindow(QMainWindow):
         import_action.triggered.connect(self.import_data)
         file_menu.addAction(import_action)
         
+        # 打开已转换的记录
+        open_action = QAction("打开记录", self)
+        open_action.setShortcut("Ctrl+O")
+        open_action.triggered.connect(self.open_recording)
+        file_menu.addAction(open_action)
+        
         # 保存数据
         save_action = QAction("保存数据", self)
         save_action.setShortcut("Ctrl+S")
         save_action.triggered.connect(self.save_data)
         file_menu.addAction(save_action)
         
+        # 导出为Parquet/Feather
+        export_action = QAction("导出数据（Parquet/Feather）", self)
+        export_action.triggered.connect(self.export_data)
+        file_menu.addAction(export_action)
+        
         # 退出
         exit_action = QAction("退出", self)
         exit_action.setShortcut("Ctrl+Q")
@@ -172,10 +215,51 @@ class MainWindow(QMainWindow):
         left_dock = QDockWidget("数据文件", self)
         left_dock.setAllowedAreas(Qt.LeftDockWidgetArea)
         
-        # 文件列表
+        left_widget = QWidget()
+        left_layout = QVBoxLayout()
+        left_layout.setContentsMargins(0, 0, 0, 0)
+        
+        # 数据查询与检索：按文件名、通道RMS和导入时间筛选目录中的记录
+        filter_layout = QFormLayout()
+        self.name_filter_edit = QLineEdit()
+        self.name_filter_edit.setPlaceholderText("文件名包含...")
+        filter_layout.addRow("名称:", self.name_filter_edit)
+        
+        self.type_filter_combo = QComboBox()
+        self.type_filter_combo.addItem("全部", None)
+        for type_name, key in DATA_TYPE_KEYS:
+            self.type_filter_combo.addItem(type_name, key)
+        filter_layout.addRow("通道:", self.type_filter_combo)
+        
+        self.rms_filter_spin = QDoubleSpinBox()
+        self.rms_filter_spin.setRange(0.0, 1e9)
+        self.rms_filter_spin.setDecimals(3)
+        self.rms_filter_spin.setSpecialValueText("不限")
+        self.rms_filter_spin.setToolTip("所选通道中任一通道的RMS大于该值")
+        filter_layout.addRow("RMS >", self.rms_filter_spin)
+        
+        self.period_filter_combo = QComboBox()
+        for period_name, seconds in IMPORT_PERIODS:
+            self.period_filter_combo.addItem(period_name, seconds)
+        filter_layout.addRow("导入时间:", self.period_filter_combo)
+        left_layout.addLayout(filter_layout)
+        
+        self.name_filter_edit.textChanged.connect(self._refresh_file_list)
+        self.type_filter_combo.currentIndexChanged.connect(self._refresh_file_list)
+        self.rms_filter_spin.valueChanged.connect(self._refresh_file_list)
+        self.period_filter_combo.currentIndexChanged.connect(self._refresh_file_list)
+        
+        # 文件列表（来自记录目录，无需扫描文件夹）
         self.file_list = QListWidget()
-        left_dock.setWidget(self.file_list)
+        self.file_list.setToolTip("单击加载记录，双击显示波形概览")
+        self.file_list.currentItemChanged.connect(self._on_file_selected)
+        self.file_list.itemDoubleClicked.connect(self._on_file_double_clicked)
+        left_layout.addWidget(self.file_list)
+        
+        left_widget.setLayout(left_layout)
+        left_dock.setWidget(left_widget)
         self.addDockWidget(Qt.LeftDockWidgetArea, left_dock)
+        self._refresh_file_list()
         
         # 右侧停靠部件：数据映射和信息
         right_dock = QDockWidget("数据映射", self)
@@ -185,44 +269,53 @@ class MainWindow(QMainWindow):
         self.data_mapping_widget = DataMappingWidget()
         right_dock.setWidget(self.data_mapping_widget)
         self.addDockWidget(Qt.RightDockWidgetArea, right_dock)
+        
+        # 底部停靠部件：数据浏览（只在绘制时格式化可见单元格，可滚动浏览全部数据）
+        browser_dock = QDockWidget("数据浏览", self)
+        browser_dock.setAllowedAreas(Qt.BottomDockWidgetArea | Qt.RightDockWidgetArea)
+        
+        self.data_browser_model = NumpyTableModel()
+        self.data_browser = QTableView()
+        self.data_browser.setModel(self.data_browser_model)
+        configure_table_view(self.data_browser)
+        browser_dock.setWidget(self.data_browser)
+        self.addDockWidget(Qt.BottomDockWidgetArea, browser_dock)
+    
+    def _update_data_browser(self):
+        """在数据浏览中显示当前数据，已映射的列在列名后标注通道"""
+        if self.current_data is None:
+            self.data_browser_model.set_data(None)
+            return
+        
+        column_names = [f"列 {i+1}" for i in range(self.current_data.shape[1])]
+        for type_name, key in DATA_TYPE_KEYS:
+            for i, col in enumerate((self.current_mapping or {}).get(key, [])):
+                if 0 <= col < len(column_names):
+                    column_names[col] += f" ({type_name} {i+1})"
+        self.data_browser_model.set_data(self.current_data, column_names)
+        self.data_browser.resizeColumnsToContents()
     
     def _start_matlab_engine(self):
         """启动Matlab引擎"""
-        from PyQt5.QtCore import QThread, pyqtSignal
-        
-        # 创建一个内部线程类来启动Matlab引擎
-        class MatlabEngineThread(QThread):
-            engine_started = pyqtSignal(bool)
-            
-            def __init__(self, matlab_interface, functions_path):
-                super().__init__()
-                self.matlab_interface = matlab_interface
-                self.functions_path = functions_path
-            
-            def run(self):
-                try:
-                    print("线程中启动Matlab引擎...")
-                    # 启动Matlab引擎
-                    success = self.matlab_interface.start_engine()
-                    if success:
-                        # 设置Matlab函数路径
-                        self.matlab_interface.set_functions_path(self.functions_path)
-                    self.engine_started.emit(success)
-                except Exception as e:
-                    print(f"启动Matlab引擎时发生异常: {e}")
-                    self.engine_started.emit(False)
-        
         # 准备Matlab函数路径
         matlab_functions_path = os.path.join(os.path.dirname(__file__), "..", "matlab_functions")
         
-        # 创建并启动线程
-        self.matlab_thread = MatlabEngineThread(self.matlab_interface, matlab_functions_path)
-        self.matlab_thread.engine_started.connect(self._on_matlab_engine_started)
-        self.matlab_thread.start()
+        # 引擎在Matlab接口的执行线程中启动，之后所有引擎调用都在该线程中执行；完成后通过信号回到界面线程
+        future = self.matlab_interface.start_engine_async(matlab_functions_path)
+        future.add_done_callback(self._emit_engine_started)
         
         # 立即返回，不阻塞主线程
         self.statusBar.showMessage("正在后台启动Matlab引擎...")
     
+    def _emit_engine_started(self, future):
+        """在执行线程中取得启动结果并发出信号"""
+        try:
+            success = bool(future.result())
+        except Exception as e:
+            print(f"启动Matlab引擎时发生异常: {e}")
+            success = False
+        self.engine_started.emit(success)
+    
     def _on_matlab_engine_started(self, success):
         """Matlab引擎启动完成后的回调"""
         if success:
@@ -231,7 +324,10 @@ class MainWindow(QMainWindow):
             self.file_handler.set_matlab_interface(self.matlab_interface)
             # 更新可视化面板的Matlab接口
             self.vis_panel.set_matlab_interface(self.matlab_interface)
-            self.statusBar.showMessage("Matlab引擎启动成功")
+            if self.matlab_interface.connected_to_shared:
+                self.statusBar.showMessage("已连接到共享Matlab会话")
+            else:
+                self.statusBar.showMessage("Matlab引擎启动成功")
             print("Matlab引擎启动成功")
         else:
             self.matlab_available = False
@@ -241,7 +337,8 @@ class MainWindow(QMainWindow):
     def import_data(self):
         """导入数据"""
         # 创建数据导入对话框
-        dialog = DataImportDialog(self.file_handler, self)
+        dialog = DataImportDialog(self.file_handler, self, catalog=self.catalog,
+                                  sample_rate=self.vis_panel.sample_rate_spin.value())
         
         # 连接数据导入完成信号
         dialog.data_imported.connect(self._on_data_imported)
@@ -250,10 +347,17 @@ class MainWindow(QMainWindow):
         dialog.exec_()
     
     def _on_data_imported(self, result):
-        """数据导入完成后的处理"""
+        """数据导入完成后的处理：转换后的文件按列访问，各通道在显示或绘图时才读取"""
+        # 转换后的文件可能覆盖了之前缓存的同名记录
+        self.dataset_cache.release(result['converted_file'])
+        view = self.dataset_cache.open(result['converted_file'])
+        if view is None:
+            self.statusBar.showMessage(f"无法加载转换后的文件: {os.path.basename(result['converted_file'])}")
+            return
+        
         self.current_file = result['converted_file']
-        self.current_data = result['data']
-        self.current_mapping = result['data_mapping']
+        self.current_data = view
+        self.current_mapping = view.mapping
         
         # 更新数据映射部件
         self.data_mapping_widget.set_data(self.current_data, self.current_mapping)
@@ -261,18 +365,139 @@ class MainWindow(QMainWindow):
         # 更新可视化面板
         self.vis_panel.set_data(self.current_data, self.current_mapping)
         
-        # 将文件添加到文件列表
-        self.file_list.addItem(os.path.basename(self.current_file))
+        # 更新数据浏览
+        self._update_data_browser()
+        
+        # 记录及各通道统计已在导入线程中加入目录，刷新文件列表
+        self._refresh_file_list()
+        self._add_file_item(self.current_file)
         
         # 更新状态栏
         self.statusBar.showMessage(f"数据导入成功: {os.path.basename(self.current_file)}")
     
+    def open_recording(self):
+        """打开已转换的记录并显示波形概览"""
+        file_path, _ = QFileDialog.getOpenFileName(self, "打开记录", "", "Matlab文件 (*.mat)")
+        if not file_path:
+            return
+        
+        # 加入记录目录（目录中已有且文件未变化时不再读取）
+        if self.catalog is not None:
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            try:
+                self.catalog.add_mat_file(file_path)
+            finally:
+                QApplication.restoreOverrideCursor()
+            self._refresh_file_list()
+        
+        self._add_file_item(file_path)
+        self._show_recording(file_path)
+    
+    def _refresh_file_list(self):
+        """按筛选条件从记录目录查询记录并更新文件列表"""
+        if self.catalog is None:
+            return
+        
+        seconds = self.period_filter_combo.currentData()
+        min_rms = self.rms_filter_spin.value()
+        recordings = self.catalog.query(
+            name=self.name_filter_edit.text().strip() or None,
+            variable=self.type_filter_combo.currentData(),
+            min_rms=min_rms if min_rms > 0 else None,
+            since=time.time() - seconds if seconds is not None else None,
+            limit=FILE_LIST_LIMIT
+        )
+        
+        self.file_list.clear()
+        for recording in recordings:
+            tooltip = (f"{recording['path']}\n{recording['rows']} 行 × {recording['cols']} 列"
+                       f"\n导入时间: {time.strftime('%Y-%m-%d %H:%M', time.localtime(recording['imported_at']))}")
+            if recording['sample_rate']:
+                tooltip += f"\n采样率: {recording['sample_rate']:g} Hz"
+            self._add_file_item(recording['path'], tooltip)
+    
+    def _add_file_item(self, file_path, tooltip=None):
+        """将文件添加到文件列表（列表项中保存完整路径）"""
+        for row in range(self.file_list.count()):
+            if os.path.abspath(self.file_list.item(row).data(Qt.UserRole)) == os.path.abspath(file_path):
+                return
+        
+        item = QListWidgetItem(os.path.basename(file_path))
+        item.setData(Qt.UserRole, file_path)
+        item.setToolTip(tooltip or file_path)
+        self.file_list.addItem(item)
+    
+    def _on_file_selected(self, item, previous=None):
+        """选中文件列表中的记录时加载为当前数据：只读取元数据，各通道在显示或绘图时才读取到缓存中"""
+        if item is None:
+            return
+        file_path = item.data(Qt.UserRole)
+        if not file_path or file_path == self.current_file:
+            return
+        if not os.path.exists(file_path):
+            self.statusBar.showMessage(f"文件不存在: {file_path}")
+            return
+        
+        view = self.dataset_cache.open(file_path)
+        if view is None:
+            self.statusBar.showMessage(f"无法加载记录: {os.path.basename(file_path)}")
+            return
+        
+        self.current_file = file_path
+        self.current_data = view
+        self.current_mapping = view.mapping
+        
+        # 数据映射部件、可视化面板和数据浏览共用同一个视图和缓存
+        self.data_mapping_widget.set_data(self.current_data, self.current_mapping)
+        self.vis_panel.set_data(self.current_data, self.current_mapping)
+        self._update_data_browser()
+        
+        cache_stats = self.dataset_cache.stats()
+        self.statusBar.showMessage(
+            f"已加载记录: {os.path.basename(file_path)}（缓存 {cache_stats['bytes'] / (1024 * 1024):.0f}/"
+            f"{cache_stats['budget_bytes'] / (1024 * 1024):.0f} MB）"
+        )
+    
+    def _on_file_double_clicked(self, item):
+        """双击文件列表中的记录时显示其波形概览"""
+        file_path = item.data(Qt.UserRole)
+        if file_path:
+            self._show_recording(file_path)
+    
+    def _show_recording(self, file_path):
+        """显示记录的波形概览，没有概览或概览已过期时先生成"""
+        if not os.path.exists(file_path):
+            QMessageBox.warning(self, "警告", f"文件不存在: {file_path}")
+            return
+        
+        if not self.vis_panel.show_overview(file_path):
+            self.statusBar.showMessage("正在生成概览...")
+            # 重新生成前先关闭正在显示的概览文件
+            self.vis_panel.close_overview()
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            try:
+                built = self.file_handler.build_overview(file_path)
+            finally:
+                QApplication.restoreOverrideCursor()
+            
+            if not built or not self.vis_panel.show_overview(file_path):
+                self.statusBar.showMessage("显示概览失败")
+                QMessageBox.warning(self, "警告", "无法生成该文件的波形概览")
+                return
+        
+        self.statusBar.showMessage(f"已显示概览: {os.path.basename(file_path)}")
+    
     def save_data(self):
         """保存数据"""
         if not self.current_data or not self.current_mapping:
             QMessageBox.warning(self, "警告", "没有可保存的数据")
             return
         
+        # 从文件列表加载的记录直接来自转换后的文件，无需再次保存
+        if isinstance(self.current_data, RecordingView):
+            QMessageBox.information(self, "提示", "当前记录已保存在文件中")
+            return
+        
         # 使用文件处理器保存数据
         success = self.file_handler.write_mat_file(
             self.current_file,
@@ -286,17 +511,44 @@ class MainWindow(QMainWindow):
             self.statusBar.showMessage("数据保存失败")
             QMessageBox.critical(self, "错误", "数据保存失败")
     
+    def export_data(self):
+        """将当前数据的映射通道导出为Parquet或Feather文件（每个通道一列，数据列映射保存在文件中）"""
+        if self.current_data is None or self.current_mapping is None:
+            QMessageBox.warning(self, "警告", "没有可导出的数据")
+            return
+        
+        base_name = os.path.splitext(os.path.basename(self.current_file or "data"))[0]
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "导出数据", f"{base_name}.parquet", "Parquet文件 (*.parquet);;Feather文件 (*.feather)"
+        )
+        if not file_path:
+            return
+        if not is_arrow_file(file_path):
+            file_path += '.feather' if selected_filter.startswith("Feather") else '.parquet'
+        
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            success = self.file_handler.write_arrow_file(
+                file_path, self.file_handler._apply_data_mapping(self.current_data, self.current_mapping)
+            )
+        finally:
+            QApplication.restoreOverrideCursor()
+        
+        if success:
+            self.statusBar.showMessage(f"数据导出成功: {os.path.basename(file_path)}")
+        else:
+            self.statusBar.showMessage("数据导出失败")
+            QMessageBox.critical(self, "错误", "数据导出失败")
+    
     def plot_time_domain(self):
         """绘制时域图"""
         if self.current_data is None or self.current_mapping is None:
             QMessageBox.warning(self, "警告", "没有可绘制的数据")
             return
         
-        # 调用可视化面板的绘制时域图方法
-        self.vis_panel._plot_time_domain(
-            self.vis_panel._get_selected_data(),
-            self.vis_panel.sample_rate_spin.value()
-        )
+        # 切换到时域图选项卡，按所选显示方式绘制
+        self.vis_panel.tab_widget.setCurrentIndex(0)
+        self.vis_panel._plot_current_tab()
     
     def plot_freq_domain(self):
         """绘制频域图"""
@@ -304,11 +556,9 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "警告", "没有可绘制的数据")
             return
         
-        # 调用可视化面板的绘制频域图方法
-        self.vis_panel._plot_freq_domain(
-            self.vis_panel._get_selected_data(),
-            self.vis_panel.sample_rate_spin.value()
-        )
+        # 切换到频域图选项卡，按所选计算后端绘制
+        self.vis_panel.tab_widget.setCurrentIndex(1)
+        self.vis_panel._plot_current_tab()
     
     def show_about(self):
         """显示关于对话框"""
@@ -324,6 +574,9 @@ class MainWindow(QMainWindow):
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         
         if reply == QMessageBox.Yes:
+            # 关闭记录目录
+            if self.catalog is not None:
+                self.catalog.close()
             event.accept()
         else:
             event.ignore()
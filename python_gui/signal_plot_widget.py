@@ -0,0 +1,349 @@
+import time
+from PyQt5.QtWidgets import QWidget, QSizePolicy
+from PyQt5.QtCore import Qt, QPointF, QRectF
+from PyQt5.QtGui import QPainter, QPen, QColor, QPolygonF
+import numpy as np
+from utils.minmax_pyramid import MinMaxPyramid
+
+class SignalPlotWidget(QWidget):
+    """内嵌的时域波形控件：按屏幕分辨率做最小/最大值抽样，支持滚轮缩放和拖动平移，多个通道上下分栏显示"""
+    
+    # 绘图区域的边距（像素）：左、上、右、下
+    MARGINS = (70, 24, 16, 32)
+    
+    # 每次滚轮缩放的比例
+    ZOOM_STEP = 0.8
+    
+    # 最多放大到窗口内显示的采样点数
+    MIN_VISIBLE_SAMPLES = 10
+    
+    # 各通道分栏之间的间隔（像素）
+    LANE_GAP = 6
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 每个通道一个数据源：提供len()和query(start, stop, n_points)，如MinMaxPyramid或OverviewChannel
+        self.sources = []
+        self.channel_names = []
+        self.sample_rate = 1.0
+        self.title = ""
+        
+        # 当前显示的采样点区间[view_start, view_stop)
+        self.view_start = 0
+        self.view_stop = 0
+        
+        self._drag_x = None
+        self._drag_view = None
+        
+        # 最近一次重绘的耗时（毫秒）
+        self.last_render_ms = 0.0
+        
+        self.setMinimumHeight(220)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setFocusPolicy(Qt.WheelFocus)
+    
+    def set_signal(self, data, sample_rate, title="", channel_names=None):
+        """设置要显示的信号（一维为单通道，二维时每列一个通道），并显示全部数据"""
+        data = np.asarray(data)
+        if data.ndim == 1:
+            sources = [MinMaxPyramid(data)]
+        else:
+            sources = [MinMaxPyramid(data[:, i]) for i in range(data.shape[1])]
+        self.set_sources(sources, sample_rate, title, channel_names)
+    
+    def set_source(self, source, sample_rate, title=""):
+        """设置已经建好抽样结构的单个数据源（如概览文件中的通道），并显示全部数据"""
+        self.set_sources([source], sample_rate, title)
+    
+    def set_sources(self, sources, sample_rate, title="", channel_names=None):
+        """设置多个长度相同的数据源，每个通道一栏"""
+        self.sources = list(sources)
+        self.channel_names = list(channel_names or [])
+        self.sample_rate = sample_rate
+        self.title = title
+        self.reset_view()
+    
+    def clear(self):
+        """清除显示的信号"""
+        self.sources = []
+        self.channel_names = []
+        self.view_start = self.view_stop = 0
+        self.update()
+    
+    def reset_view(self):
+        """显示全部数据"""
+        self.view_start = 0
+        self.view_stop = len(self.sources[0]) if self.sources else 0
+        self.update()
+    
+    def set_time_range(self, start_time, end_time):
+        """按时间（秒）设置显示范围"""
+        self._set_view(start_time * self.sample_rate, end_time * self.sample_rate)
+    
+    def get_time_range(self):
+        """返回当前显示范围（秒）"""
+        return self.view_start / self.sample_rate, self.view_stop / self.sample_rate
+    
+    def _set_view(self, start, stop):
+        """设置显示的采样点区间，限制在数据范围内并保持最小宽度"""
+        if not self.sources:
+            return
+        
+        total = len(self.sources[0])
+        span = min(max(stop - start, self.MIN_VISIBLE_SAMPLES), total)
+        start = min(max(start, 0), total - span)
+        self.view_start = int(round(start))
+        self.view_stop = int(round(start + span))
+        self.update()
+    
+    def _plot_rect(self):
+        """绘图区域"""
+        left, top, right, bottom = self.MARGINS
+        return QRectF(left, top, max(1, self.width() - left - right), max(1, self.height() - top - bottom))
+    
+    def wheelEvent(self, event):
+        """以鼠标位置为中心缩放"""
+        if not self.sources:
+            return
+        
+        rect = self._plot_rect()
+        anchor = min(max((event.pos().x() - rect.left()) / rect.width(), 0.0), 1.0)
+        steps = event.angleDelta().y() / 120
+        scale = self.ZOOM_STEP ** steps
+        
+        span = self.view_stop - self.view_start
+        center = self.view_start + anchor * span
+        new_span = span * scale
+        self._set_view(center - anchor * new_span, center + (1 - anchor) * new_span)
+        event.accept()
+    
+    def mousePressEvent(self, event):
+        """开始拖动平移"""
+        if event.button() == Qt.LeftButton:
+            self._drag_x = event.pos().x()
+            self._drag_view = (self.view_start, self.view_stop)
+    
+    def mouseMoveEvent(self, event):
+        """拖动平移"""
+        if self._drag_x is None:
+            return
+        
+        start, stop = self._drag_view
+        shift = (event.pos().x() - self._drag_x) / self._plot_rect().width() * (stop - start)
+        self._set_view(start - shift, stop - shift)
+    
+    def mouseReleaseEvent(self, event):
+        """结束拖动"""
+        self._drag_x = None
+        self._drag_view = None
+    
+    def mouseDoubleClickEvent(self, event):
+        """双击恢复显示全部数据"""
+        self.reset_view()
+    
+    def paintEvent(self, event):
+        """按当前显示范围和控件宽度抽样后绘制"""
+        started = time.perf_counter()
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.white)
+        rect = self._plot_rect()
+        
+        if not self.sources or self.view_stop <= self.view_start:
+            painter.setPen(Qt.gray)
+            painter.drawText(self.rect(), Qt.AlignCenter, "没有数据")
+            painter.end()
+            return
+        
+        # 每个通道占一栏，共用时间轴
+        n_lanes = len(self.sources)
+        lane_height = (rect.height() - self.LANE_GAP * (n_lanes - 1)) / n_lanes
+        for i, source in enumerate(self.sources):
+            lane = QRectF(rect.left(), rect.top() + i * (lane_height + self.LANE_GAP), rect.width(), lane_height)
+            name = self.channel_names[i] if i < len(self.channel_names) else ""
+            self._draw_lane(painter, lane, source, name)
+        
+        self._draw_time_axis(painter, rect)
+        painter.end()
+        
+        self.last_render_ms = (time.perf_counter() - started) * 1000
+    
+    def _draw_lane(self, painter, lane, source, name):
+        """绘制一个通道：每个像素列取一个区间的最小值和最大值"""
+        positions, mins, maxs = source.query(self.view_start, self.view_stop, int(lane.width()))
+        y_min, y_max = float(np.nanmin(mins)), float(np.nanmax(maxs))
+        if not np.isfinite(y_min) or not np.isfinite(y_max):
+            y_min, y_max = 0.0, 1.0
+        if y_max - y_min < 1e-12:
+            y_min, y_max = y_min - 0.5, y_max + 0.5
+        
+        span = self.view_stop - self.view_start
+        xs = lane.left() + (positions - self.view_start) * (lane.width() / span)
+        scale_y = lane.height() / (y_max - y_min)
+        y_low = lane.bottom() - (mins.astype(np.float64) - y_min) * scale_y
+        y_high = lane.bottom() - (maxs.astype(np.float64) - y_min) * scale_y
+        
+        # 抽样数据按最小值、最大值交替连线，原始数据直接连线
+        if mins is maxs:
+            polygon = _make_polygon(xs, y_low)
+        else:
+            polygon = _make_polygon(np.repeat(xs, 2), np.column_stack([y_low, y_high]).ravel())
+        
+        painter.setClipRect(lane)
+        painter.setPen(QPen(QColor(0, 90, 200), 1))
+        painter.drawPolyline(polygon)
+        painter.setClipping(False)
+        
+        # 边框、纵坐标刻度和通道名称
+        painter.setPen(QPen(Qt.black, 1))
+        painter.drawRect(lane)
+        n_ticks = int(min(5, max(2, lane.height() // 40)))
+        for i in range(n_ticks):
+            fraction = i / (n_ticks - 1)
+            y = lane.bottom() - fraction * lane.height()
+            painter.drawLine(QPointF(lane.left() - 4, y), QPointF(lane.left(), y))
+            label = f"{y_min + fraction * (y_max - y_min):.3g}"
+            # 最上和最下的刻度标签收在本栏之内，避免与相邻的栏重叠
+            label_top = min(max(y - 8, lane.top()), lane.bottom() - 16)
+            painter.drawText(QRectF(0, label_top, lane.left() - 6, 16), Qt.AlignRight | Qt.AlignVCenter, label)
+        if name:
+            painter.drawText(lane.adjusted(6, 2, -6, -2), Qt.AlignLeft | Qt.AlignTop, name)
+    
+    def _draw_time_axis(self, painter, rect):
+        """绘制时间刻度和标题"""
+        painter.setPen(QPen(Qt.black, 1))
+        start_time, end_time = self.get_time_range()
+        for i in range(6):
+            fraction = i / 5
+            x = rect.left() + fraction * rect.width()
+            painter.drawLine(QPointF(x, rect.bottom()), QPointF(x, rect.bottom() + 4))
+            label = f"{start_time + fraction * (end_time - start_time):.4g}"
+            painter.drawText(QRectF(x - 40, rect.bottom() + 6, 80, 16), Qt.AlignHCenter | Qt.AlignTop, label)
+        
+        painter.drawText(QRectF(rect.left(), 4, rect.width(), 18), Qt.AlignHCenter | Qt.AlignTop,
+                         f"{self.title}    时间 (s)" if self.title else "时间 (s)")
+
+def _make_polygon(xs, ys):
+    """直接填充QPolygonF的内存构造折线，避免逐点创建QPointF"""
+    polygon = QPolygonF(len(xs))
+    if len(xs):
+        buffer = polygon.data()
+        buffer.setsize(len(xs) * 2 * np.dtype(np.float64).itemsize)
+        points = np.frombuffer(buffer, dtype=np.float64).reshape(-1, 2)
+        points[:, 0] = xs
+        points[:, 1] = ys
+    return polygon
+
+class SpectrumPlotWidget(QWidget):
+    """内嵌的功率谱控件：每个通道一栏，纵轴为功率谱密度的对数刻度（dB），频率点多于像素时按最小/最大值抽样，不需要Matlab"""
+    
+    MARGINS = SignalPlotWidget.MARGINS
+    LANE_GAP = SignalPlotWidget.LANE_GAP
+    
+    # 功率谱为0时取对数的下限
+    PSD_FLOOR = 1e-30
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.freqs = np.empty(0)
+        # 每个通道一个以dB表示的功率谱抽样结构
+        self.pyramids = []
+        self.channel_names = []
+        self.title = ""
+        self.setMinimumHeight(220)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+    
+    def set_spectrum(self, freqs, psd, title="", channel_names=None):
+        """设置要显示的功率谱（psd为一维，或频率点数 × 通道数）"""
+        psd = np.asarray(psd, dtype=np.float64)
+        if psd.ndim == 1:
+            psd = psd.reshape(-1, 1)
+        db = 10 * np.log10(np.maximum(psd, self.PSD_FLOOR))
+        self.freqs = np.asarray(freqs, dtype=np.float64)
+        self.pyramids = [MinMaxPyramid(db[:, i]) for i in range(db.shape[1])]
+        self.channel_names = list(channel_names or [])
+        self.title = title
+        self.update()
+    
+    def clear(self):
+        """清除显示的功率谱"""
+        self.freqs = np.empty(0)
+        self.pyramids = []
+        self.channel_names = []
+        self.update()
+    
+    def _plot_rect(self):
+        """绘图区域"""
+        left, top, right, bottom = self.MARGINS
+        return QRectF(left, top, max(1, self.width() - left - right), max(1, self.height() - top - bottom))
+    
+    def paintEvent(self, event):
+        """按控件宽度抽样后绘制各通道的功率谱"""
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.white)
+        rect = self._plot_rect()
+        
+        if not self.pyramids or len(self.freqs) < 2:
+            painter.setPen(Qt.gray)
+            painter.drawText(self.rect(), Qt.AlignCenter, "没有数据")
+            painter.end()
+            return
+        
+        n_lanes = len(self.pyramids)
+        lane_height = (rect.height() - self.LANE_GAP * (n_lanes - 1)) / n_lanes
+        for i, pyramid in enumerate(self.pyramids):
+            lane = QRectF(rect.left(), rect.top() + i * (lane_height + self.LANE_GAP), rect.width(), lane_height)
+            name = self.channel_names[i] if i < len(self.channel_names) else ""
+            self._draw_lane(painter, lane, pyramid, name)
+        
+        self._draw_freq_axis(painter, rect)
+        painter.end()
+    
+    def _draw_lane(self, painter, lane, pyramid, name):
+        """绘制一个通道的功率谱"""
+        positions, mins, maxs = pyramid.query(0, len(pyramid), int(lane.width()))
+        y_min, y_max = float(np.min(mins)), float(np.max(maxs))
+        if y_max - y_min < 1e-12:
+            y_min, y_max = y_min - 1.0, y_max + 1.0
+        
+        f_min, f_max = self.freqs[0], self.freqs[-1]
+        xs = lane.left() + (self.freqs[positions] - f_min) * (lane.width() / (f_max - f_min))
+        scale_y = lane.height() / (y_max - y_min)
+        y_low = lane.bottom() - (mins - y_min) * scale_y
+        y_high = lane.bottom() - (maxs - y_min) * scale_y
+        if mins is maxs:
+            polygon = _make_polygon(xs, y_low)
+        else:
+            polygon = _make_polygon(np.repeat(xs, 2), np.column_stack([y_low, y_high]).ravel())
+        
+        painter.setClipRect(lane)
+        painter.setPen(QPen(QColor(0, 90, 200), 1))
+        painter.drawPolyline(polygon)
+        painter.setClipping(False)
+        
+        painter.setPen(QPen(Qt.black, 1))
+        painter.drawRect(lane)
+        n_ticks = int(min(5, max(2, lane.height() // 40)))
+        for i in range(n_ticks):
+            fraction = i / (n_ticks - 1)
+            y = lane.bottom() - fraction * lane.height()
+            painter.drawLine(QPointF(lane.left() - 4, y), QPointF(lane.left(), y))
+            label = f"{y_min + fraction * (y_max - y_min):.3g}"
+            label_top = min(max(y - 8, lane.top()), lane.bottom() - 16)
+            painter.drawText(QRectF(0, label_top, lane.left() - 6, 16), Qt.AlignRight | Qt.AlignVCenter, label)
+        if name:
+            painter.drawText(lane.adjusted(6, 2, -6, -2), Qt.AlignLeft | Qt.AlignTop, name)
+    
+    def _draw_freq_axis(self, painter, rect):
+        """绘制频率刻度和标题"""
+        painter.setPen(QPen(Qt.black, 1))
+        f_min, f_max = self.freqs[0], self.freqs[-1]
+        for i in range(6):
+            fraction = i / 5
+            x = rect.left() + fraction * rect.width()
+            painter.drawLine(QPointF(x, rect.bottom()), QPointF(x, rect.bottom() + 4))
+            label = f"{f_min + fraction * (f_max - f_min):.4g}"
+            painter.drawText(QRectF(x - 40, rect.bottom() + 6, 80, 16), Qt.AlignHCenter | Qt.AlignTop, label)
+        
+        axis = "频率 (Hz)    功率谱密度 (dB/Hz)"
+        painter.drawText(QRectF(rect.left(), 4, rect.width(), 18), Qt.AlignHCenter | Qt.AlignTop,
+                         f"{self.title}    {axis}" if self.title else axis)
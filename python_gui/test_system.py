@@ -1,5 +1,6 @@
 import sys
 import os
+import json
 import numpy as np
 
 # 检查Python版本
@@ -25,32 +26,74 @@ except ImportError as e:
 def test_matlab_interface():
     """测试Matlab接口"""
     print("测试Matlab接口...")
-    
+
     if not MATLAB_AVAILABLE:
         print("✗ Matlab相关模块未导入，跳过Matlab接口测试")
         return
-    
+
     # 创建Matlab接口实例
     matlab_interface = MatlabInterface()
-    
+
     # 启动Matlab引擎
     if matlab_interface.start_engine():
         print("✓ Matlab引擎启动成功")
-        
+
         # 设置Matlab函数路径
         matlab_functions_path = os.path.join(os.path.dirname(__file__), "..", "matlab_functions")
         if matlab_interface.set_functions_path(matlab_functions_path):
             print("✓ Matlab函数路径设置成功")
         else:
             print("✗ Matlab函数路径设置失败")
-        
+
         # 测试简单的Matlab函数调用
         result = matlab_interface.call_function('sqrt', 16.0)
         if result == 4.0:
             print("✓ Matlab函数调用成功")
         else:
             print(f"✗ Matlab函数调用失败，结果: {result}")
-        
+
+        # 测试异步调用：返回Future，不阻塞调用线程
+        try:
+            result = matlab_interface.call_function_async('sqrt', 16.0, timeout=60).result()
+            print("✓ Matlab异步调用成功" if result == 4.0 else f"✗ Matlab异步调用失败，结果: {result}")
+        except Exception as e:
+            print(f"✗ Matlab异步调用失败: {e}")
+
+        # 测试工作区数据集：注册一次后按行列号截取调用
+        dataset = matlab_interface.register_dataset(np.random.rand(100, 6))
+        if dataset is not None:
+            size = matlab_interface.call_with_dataset('size', dataset, rows=(10, 30), columns=[1, 2, 3], nargout=1)
+            if size is not None and [int(v) for v in matlab_interface.matlab_to_numpy(size).ravel()] == [20, 3]:
+                print("✓ 工作区数据集截取调用成功")
+            else:
+                print(f"✗ 工作区数据集截取调用失败，结果: {size}")
+
+            if matlab_interface.release_dataset(dataset) and not matlab_interface.has_dataset(dataset):
+                print("✓ 工作区数据集释放成功")
+            else:
+                print("✗ 工作区数据集释放失败")
+        else:
+            print("✗ 工作区数据集注册失败")
+
+        # 测试大数组通过临时二进制文件交给Matlab（阈值设为0，任何数组都通过文件）
+        matlab_interface.handoff_threshold_bytes = 0
+        test_array = np.random.rand(1000, 3).astype(np.float32)
+        dataset = matlab_interface.register_dataset(test_array)
+        size = matlab_interface.call_with_dataset('size', dataset, nargout=1) if dataset is not None else None
+        if size is not None and [int(v) for v in matlab_interface.matlab_to_numpy(size).ravel()] == [1000, 3]:
+            print("✓ 临时文件交接成功")
+        else:
+            print(f"✗ 临时文件交接失败，结果: {size}")
+
+        # 测试在执行线程中读取数据的异步注册
+        dataset = matlab_interface.register_dataset_async(lambda: test_array[:, :2], shape=(1000, 2), dtype=np.float32)
+        size = matlab_interface.call_with_dataset('size', dataset, nargout=1) if dataset is not None else None
+        if size is not None and [int(v) for v in matlab_interface.matlab_to_numpy(size).ravel()] == [1000, 2]:
+            print("✓ 在执行线程中读取数据并注册成功")
+        else:
+            print(f"✗ 在执行线程中读取数据并注册失败，结果: {size}")
+        matlab_interface.release_all_datasets()
+
         # 关闭Matlab引擎
         if matlab_interface.stop_engine():
             print("✓ Matlab引擎关闭成功")
@@ -62,36 +105,36 @@ def test_matlab_interface():
 def test_file_handler():
     """测试文件处理器"""
     print("\n测试文件处理器...")
-    
+
     if not MATLAB_AVAILABLE:
         print("✗ Matlab相关模块未导入，跳过文件处理器测试")
         return
-    
+
     # 创建Matlab接口实例
     matlab_interface = MatlabInterface()
-    
+
     # 启动Matlab引擎
     if matlab_interface.start_engine():
         # 创建文件处理器实例
         file_handler = FileHandler(matlab_interface)
-        
+
         # 创建测试数据
         test_data = np.random.rand(100, 6)  # 100行6列的随机数据
-        
+
         # 测试数据映射
         data_mapping = {
             'acceleration': [0, 1, 2],  # 前3列作为加速度数据
             'gyroscope': [3, 4, 5],      # 后3列作为陀螺仪数据
             'noise': []                  # 没有噪声数据
         }
-        
+
         # 应用数据映射
         mapped_data = file_handler._apply_data_mapping(test_data, data_mapping)
         if 'acceleration' in mapped_data and 'gyroscope' in mapped_data:
             print("✓ 数据映射功能正常")
         else:
             print("✗ 数据映射功能异常")
-        
+
         # 关闭Matlab引擎
         matlab_interface.stop_engine()
     else:
@@ -100,34 +143,34 @@ def test_file_handler():
 def test_data_import():
     """测试数据导入功能"""
     print("\n测试数据导入功能...")
-    
+
     # 创建测试数据文件（CSV格式）
     test_csv_file = "test_data.csv"
     test_data = np.random.rand(100, 6)
     np.savetxt(test_csv_file, test_data, delimiter=",")
-    
+
     if not MATLAB_AVAILABLE:
         print("✗ Matlab相关模块未导入，跳过数据导入测试")
         # 删除测试CSV文件
         if os.path.exists(test_csv_file):
             os.remove(test_csv_file)
         return
-    
+
     # 创建Matlab接口实例
     matlab_interface = MatlabInterface()
-    
+
     # 启动Matlab引擎
     if matlab_interface.start_engine():
         # 创建文件处理器实例
         file_handler = FileHandler(matlab_interface)
-        
+
         # 测试读取CSV文件
         csv_data = file_handler.read_file(test_csv_file)
         if csv_data is not None and csv_data.shape == (100, 6):
             print("✓ CSV文件读取成功")
         else:
             print("✗ CSV文件读取失败")
-        
+
         # 转换为Matlab格式
         output_mat_file = "test_data_converted.mat"
         success = file_handler.convert_to_mat(
@@ -137,37 +180,756 @@ def test_data_import():
                 'noise': []
             }
         )
-        
+
         if success and os.path.exists(output_mat_file):
             print("✓ 文件格式转换成功")
             # 删除测试文件
             os.remove(output_mat_file)
         else:
             print("✗ 文件格式转换失败")
-        
+
         # 关闭Matlab引擎
         matlab_interface.stop_engine()
     else:
         print("✗ 无法启动Matlab引擎，跳过数据导入测试")
-    
+
     # 删除测试CSV文件
     if os.path.exists(test_csv_file):
         os.remove(test_csv_file)
 
+def test_mat_io():
+    """测试纯Python的.mat文件读写"""
+    print("\n测试纯Python的.mat文件读写...")
+
+    if not MATLAB_AVAILABLE:
+        print("✗ 文件处理模块未导入，跳过.mat文件读写测试")
+        return
+
+    file_handler = FileHandler()
+    test_data = {
+        'acceleration': np.random.rand(100, 3),
+        'noise': np.random.rand(100).astype(np.float32)
+    }
+
+    for version in ['7.3', '5']:
+        output_mat_file = f"test_data_v{version}.mat"
+        file_handler.mat_version = version
+
+        if not file_handler.write_mat_file(output_mat_file, test_data):
+            print(f"✗ v{version}格式.mat文件写入失败")
+            continue
+
+        loaded = file_handler.read_file(output_mat_file)
+        if (isinstance(loaded, list) and len(loaded) == 2
+                and np.allclose(loaded[0], test_data['acceleration'])
+                and loaded[1].shape == (100, 1)):
+            print(f"✓ v{version}格式.mat文件读写成功")
+        else:
+            print(f"✗ v{version}格式.mat文件读写结果不一致")
+
+        os.remove(output_mat_file)
+
+def test_mat_layout():
+    """测试分块压缩的.mat文件和部分读取"""
+    print("\n测试分块压缩的.mat文件和部分读取...")
+
+    import h5py
+    from utils import mat_io
+
+    test_mat_file = "test_layout.mat"
+    acceleration = np.round(np.random.rand(20000, 3) * 1000) / 1000
+    file_handler = FileHandler(chunk_rows=4096, compression='gzip', compression_level=1)
+    if not file_handler.write_mat_file(test_mat_file, {'acceleration': acceleration}):
+        print("✗ 分块压缩的.mat文件写入失败")
+        return
+
+    with h5py.File(test_mat_file, 'r') as f:
+        dataset = f['acceleration']
+        layout_ok = dataset.chunks == (1, 4096) and dataset.compression == 'gzip' and dataset.shuffle
+    if layout_ok and os.path.getsize(test_mat_file) < acceleration.nbytes:
+        print("✓ 每个通道按时间方向分块并压缩")
+    else:
+        print("✗ 分块或压缩设置不正确")
+
+    with mat_io.MatFile(test_mat_file) as mat_file:
+        variable = mat_file['acceleration']
+        if (variable.shape == (20000, 3) and np.array_equal(variable[5000:6000, 1], acceleration[5000:6000, 1])
+                and np.array_equal(variable[[30, 10], [2, 0]], acceleration[[30, 10]][:, [2, 0]])
+                and variable[-1, -1] == acceleration[-1, -1]):
+            print("✓ 部分读取结果正确")
+        else:
+            print("✗ 部分读取结果不正确")
+
+    os.remove(test_mat_file)
+
+def test_csv_streaming():
+    """测试CSV文件分块流式转换"""
+    print("\n测试CSV文件分块流式转换...")
+
+    if not MATLAB_AVAILABLE:
+        print("✗ 文件处理模块未导入，跳过流式转换测试")
+        return
+
+    from utils import mat_io
+
+    test_csv_file = "test_stream.csv"
+    output_mat_file = "test_stream_converted.mat"
+    test_data = np.random.rand(5000, 7)
+    np.savetxt(test_csv_file, test_data, delimiter=",", header="a,b,c,d,e,f,g", comments="")
+
+    file_handler = FileHandler()
+    success = file_handler.convert_to_mat(
+        test_csv_file, output_mat_file, {
+            'acceleration': [0, 1, 2],
+            'gyroscope': [3, 4, 5],
+            'noise': [6]
+        },
+        streaming=True, dtype=np.float32, memory_budget_mb=0.1
+    )
+
+    if success:
+        mat_data = mat_io.read_mat(output_mat_file)
+        if (mat_data['acceleration'].shape == (5000, 3)
+                and mat_data['acceleration'].dtype == np.float32
+                and np.allclose(mat_data['gyroscope'], test_data[:, 3:6], atol=1e-6)):
+            print("✓ CSV文件流式转换成功")
+        else:
+            print("✗ CSV文件流式转换结果不一致")
+
+        # 转换失败时保留已有的输出文件，也不留下临时文件
+        failed = file_handler.convert_to_mat("missing.csv", output_mat_file, streaming=True)
+        leftovers = [name for name in os.listdir('.') if name.endswith('.partial.mat')]
+        if not failed and os.path.exists(output_mat_file) and not leftovers:
+            print("✓ 转换失败时不删除已有的输出文件")
+        else:
+            print("✗ 转换失败时删除了已有的输出文件或留下了临时文件")
+        os.remove(output_mat_file)
+    else:
+        print("✗ CSV文件流式转换失败")
+
+    # 指定v5格式时不使用只支持v7.3的分块写入，写出的文件确实是v5格式
+    if FileHandler(mat_version='5').convert_to_mat(test_csv_file, output_mat_file, streaming=True):
+        with open(output_mat_file, 'rb') as f:
+            header = f.read(116)
+        loaded = mat_io.read_mat(output_mat_file)
+        if header.startswith(b'MATLAB 5.0') and np.allclose(loaded['raw_data'], test_data):
+            print("✓ 指定v5格式时写出v5格式的文件")
+        else:
+            print(f"✗ 写出的文件版本不正确: {header[:20]}")
+        os.remove(output_mat_file)
+    else:
+        print("✗ 指定v5格式时转换失败")
+
+    os.remove(test_csv_file)
+
+def test_batch_output_paths():
+    """测试批量转换的输出路径分配"""
+    print("\n测试批量转换的输出路径分配...")
+
+    import shutil
+    import tempfile
+    from utils.batch_converter import BatchConverter, collect_input_files, plan_output_paths
+
+    root = tempfile.mkdtemp()
+    data = np.random.rand(200, 3)
+    for sub in ('s1', 's2'):
+        os.makedirs(os.path.join(root, 'in', sub))
+        np.savetxt(os.path.join(root, 'in', sub, 'a.csv'), data, delimiter=",", header="x,y,z", comments="")
+    open(os.path.join(root, 'in', 's1', 'a.xlsx'), 'wb').close()
+    output_dir = os.path.join(root, 'out')
+
+    input_files = collect_input_files([os.path.join(root, 'in')], recursive=True)
+    planned, conflicts = plan_output_paths(input_files + input_files[:1], output_dir)
+    outputs = sorted(os.path.relpath(output_file, output_dir) for _, output_file in planned)
+    expected = sorted([os.path.join('s1', 'a_csv_converted.mat'), os.path.join('s1', 'a_xlsx_converted.mat'),
+                       os.path.join('s2', 'a_converted.mat')])
+    if outputs == expected and not conflicts:
+        print("✓ 同名文件分配到不同的输出路径")
+    else:
+        print(f"✗ 输出路径冲突: {outputs} {conflicts}")
+
+    csv_files = [f for f in input_files if f.endswith('.csv')]
+    results = BatchConverter(output_dir=output_dir, workers=2).run(csv_files)
+    if all(r['success'] for r in results) and len({r['output_file'] for r in results}) == 2:
+        print("✓ 不同子目录中的同名文件并行转换成功")
+    else:
+        print(f"✗ 同名文件并行转换失败: {results}")
+
+    # 命令行指定--mat-version 5时，默认开启流式转换的CSV文件也写出v5格式
+    import cli
+    v5_dir = os.path.join(root, 'v5')
+    status = cli.main(['convert', '--mat-version', '5', '--workers', '1', '--output-dir', v5_dir, csv_files[0]])
+    v5_files = [os.path.join(v5_dir, name) for name in os.listdir(v5_dir) if name.endswith('.mat')] if status == 0 else []
+    headers = []
+    for path in v5_files:
+        with open(path, 'rb') as f:
+            headers.append(f.read(10))
+    if headers == [b'MATLAB 5.0']:
+        print("✓ 命令行按指定的.mat版本写出文件")
+    else:
+        print(f"✗ 命令行写出的.mat版本不正确: {status} {headers}")
+
+    shutil.rmtree(root)
+
+def test_file_preview():
+    """测试文件快速预览"""
+    print("\n测试文件快速预览...")
+
+    if not MATLAB_AVAILABLE:
+        print("✗ 文件处理模块未导入，跳过快速预览测试")
+        return
+
+    from utils import mat_io
+
+    test_csv_file = "test_preview.csv"
+    test_data = np.column_stack([np.arange(20000), np.random.rand(20000, 3)])
+    np.savetxt(test_csv_file, test_data, delimiter=",", header="index,a,b,c", comments="", fmt="%.6f")
+
+    file_handler = FileHandler()
+    preview = file_handler.read_preview(test_csv_file, head_rows=100, sample_rows=50)
+    if preview is not None and preview['data'].shape == (150, 4) and np.allclose(preview['data'][:100], test_data[:100], atol=1e-6):
+        print("✓ 读取开头的行和抽样的行成功")
+    else:
+        print("✗ 快速预览读取失败")
+
+    if preview is not None:
+        # 抽样行的估计行号与实际行号（index列）的误差
+        errors = np.abs(np.array(preview['row_numbers']) - 1 - preview['data'][:, 0])
+        if errors.max() < 200 and abs(preview['rows'] - 20000) < 200 and preview['column_names'][0] == "index":
+            print("✓ 抽样行号和总行数估计正确")
+        else:
+            print(f"✗ 行号估计误差过大: {errors.max()}")
+
+        stats = preview['stats'][0]
+        if stats['min'] == 0 and stats['max'] == preview['data'][:, 0].max() and stats['missing'] == 0:
+            print("✓ 各列统计正确")
+        else:
+            print(f"✗ 各列统计不正确: {stats}")
+    os.remove(test_csv_file)
+
+    test_mat_file = "test_preview.mat"
+    mat_io.write_mat(test_mat_file, {'raw_data': test_data})
+    preview = file_handler.read_preview(test_mat_file, head_rows=100, sample_rows=50)
+    rows = [row - 1 for row in preview['row_numbers']] if preview is not None else []
+    if preview is not None and preview['rows'] == 20000 and np.array_equal(preview['data'], test_data[rows]):
+        print("✓ .mat文件只读取预览的行")
+    else:
+        print("✗ .mat文件预览失败")
+
+    # 探测缓存：间隔内的新结果合并到之后一次写回
+    from utils.file_probe import ProbeCache
+    cache_path = "test_probe_cache.json"
+    cache = ProbeCache(cache_path)
+    cache.put(test_mat_file, {'file_ext': '.mat', 'datasets': []})
+    cache.put(__file__, {'file_ext': '.py', 'datasets': []})
+    with open(cache_path, 'r', encoding='utf-8') as f:
+        saved_before = len(json.load(f))
+    cache.flush()
+    with open(cache_path, 'r', encoding='utf-8') as f:
+        saved_after = len(json.load(f))
+    if saved_before == 1 and saved_after == 2 and ProbeCache(cache_path).get(__file__) is not None:
+        print("✓ 探测缓存合并写回成功")
+    else:
+        print(f"✗ 探测缓存写回不正确: {saved_before}, {saved_after}")
+    os.remove(cache_path)
+    os.remove(test_mat_file)
+
+def test_welch_psd():
+    """测试Python端的Welch功率谱计算"""
+    print("\n测试Welch功率谱计算...")
+
+    from utils.spectral import welch_psd
+
+    sample_rate = 1000.0
+    t = np.arange(10000) / sample_rate
+    test_data = np.column_stack([np.sin(2 * np.pi * 50 * t), np.sin(2 * np.pi * 120 * t)])
+    freqs, psd = welch_psd(test_data, sample_rate)
+
+    if psd.shape == (len(freqs), 2) and abs(freqs[np.argmax(psd[:, 0])] - 50) < 1 and abs(freqs[np.argmax(psd[:, 1])] - 120) < 1:
+        print("✓ 多通道功率谱计算成功")
+    else:
+        print("✗ 多通道功率谱计算结果不正确")
+
+    try:
+        import scipy.signal
+    except ImportError:
+        print("✗ 未安装scipy，跳过与scipy.signal.welch的对比")
+        return
+
+    segment_length = int(len(t) / 4.5)
+    _, expected = scipy.signal.welch(test_data, sample_rate, window=np.hamming(segment_length),
+                                     noverlap=segment_length // 2, nfft=len(freqs) * 2 - 2,
+                                     detrend=False, axis=0)
+    if np.allclose(psd, expected):
+        print("✓ 与scipy.signal.welch结果一致")
+    else:
+        print("✗ 与scipy.signal.welch结果不一致")
+
+def test_minmax_pyramid():
+    """测试最小/最大值金字塔抽样"""
+    print("\n测试最小/最大值金字塔抽样...")
+
+    from utils.minmax_pyramid import MinMaxPyramid, decimate_minmax
+
+    test_data = np.random.randn(1000000).astype(np.float32)
+    test_data[123457] = 100.0
+    pyramid = MinMaxPyramid(test_data)
+
+    positions, mins, maxs = pyramid.query(0, len(test_data), 1000)
+    if len(positions) <= 1000 and maxs.max() == 100.0 and mins.min() == test_data.min():
+        print("✓ 抽样后保留了峰值")
+    else:
+        print("✗ 抽样后峰值丢失")
+
+    positions, mins, maxs = pyramid.query(500, 600, 1000)
+    if np.array_equal(positions, np.arange(500, 600)) and np.array_equal(mins, test_data[500:600]):
+        print("✓ 放大后返回原始采样点")
+    else:
+        print("✗ 放大后返回的数据不正确")
+
+    rows, values = decimate_minmax(test_data, 2000)
+    if len(values) <= 2000 and values.max() == 100.0 and np.all(np.diff(rows) > 0):
+        print("✓ 按点数上限抽样成功")
+    else:
+        print("✗ 按点数上限抽样失败")
+
+def test_overview():
+    """测试转换时生成的波形概览"""
+    print("\n测试波形概览...")
+
+    if not MATLAB_AVAILABLE:
+        print("✗ 文件处理模块未导入，跳过波形概览测试")
+        return
+
+    from utils.overview_store import RecordingOverview, get_overview_path
+
+    test_csv_file = "test_overview.csv"
+    output_mat_file = "test_overview_converted.mat"
+    test_data = np.random.rand(50000, 2)
+    test_data[12345, 1] = 10.0
+    np.savetxt(test_csv_file, test_data, delimiter=",", header="a,b", comments="")
+
+    file_handler = FileHandler()
+    success = file_handler.convert_to_mat(
+        test_csv_file, output_mat_file, {'acceleration': [0, 1], 'gyroscope': [], 'noise': []},
+        streaming=True, build_overview=True
+    )
+
+    if success and os.path.exists(get_overview_path(output_mat_file)):
+        with RecordingOverview(output_mat_file) as overview:
+            times, mins, maxs, means = overview.query('acceleration', 1, 0.0, 50.0, 200, 1000.0)
+            if len(times) <= 200 and maxs.max() == np.float32(10.0) and overview.is_current():
+                print("✓ 概览查询保留了峰值")
+            else:
+                print("✗ 概览查询结果不正确")
+
+            times, mins, maxs, means = overview.query('acceleration', 0, 1.0, 1.05, 200, 1000.0)
+            if len(times) == 50 and np.allclose(mins, test_data[1000:1050, 0]):
+                print("✓ 放大后从原始文件读取采样点")
+            else:
+                print("✗ 放大后读取的采样点不正确")
+        os.remove(get_overview_path(output_mat_file))
+        os.remove(output_mat_file)
+    else:
+        print("✗ 生成波形概览失败")
+
+    os.remove(test_csv_file)
+
+def test_engine_executor():
+    """测试引擎执行线程的优先级、请求合并和统计"""
+    print("\n测试引擎执行线程...")
+
+    import threading
+    import time
+    from utils.engine_executor import EngineExecutor, PRIORITY_INTERACTIVE, PRIORITY_BATCH
+
+    executor = EngineExecutor()
+    order = []
+    gate = threading.Event()
+
+    # 第一个请求执行期间提交其余请求，检查出队顺序
+    blocker = executor.submit(gate.wait)
+    time.sleep(0.05)
+    batch = executor.submit(order.append, "保存", priority=PRIORITY_BATCH)
+    plots = [executor.submit(order.append, f"绘图{i}", priority=PRIORITY_INTERACTIVE, key="plot") for i in range(5)]
+    gate.set()
+    batch.result(timeout=5)
+
+    if order == ["绘图4", "保存"] and all(f.cancelled() for f in plots[:4]):
+        print("✓ 交互请求优先执行，连续的绘图请求只执行最新的一个")
+    else:
+        print(f"✗ 执行顺序不正确: {order}")
+
+    stats = executor.stats()
+    if stats['coalesced'] == 4 and stats['completed'] == 3 and stats['depth'] == 0:
+        print("✓ 队列统计正确")
+    else:
+        print(f"✗ 队列统计不正确: {stats}")
+
+    if executor.call(threading.current_thread) is not threading.current_thread():
+        print("✓ 同步调用在执行线程中执行")
+    else:
+        print("✗ 同步调用没有在执行线程中执行")
+
+    # 开始执行后普通调用不能再取消，cancel()返回False且调用正常完成
+    from concurrent.futures import CancelledError, Future
+    started = threading.Event()
+    running = executor.submit(lambda: started.set() or time.sleep(0.2) or "完成")
+    started.wait(5)
+    if not running.cancel() and running.result(timeout=5) == "完成":
+        print("✓ 执行中的普通调用不能取消")
+    else:
+        print("✗ 执行中的普通调用被错误地取消")
+
+    # 执行中的后台调用可以取消，结果为CancelledError
+    engine_call = Future()
+    started.clear()
+    background = executor.submit(lambda: started.set() or engine_call)
+    started.wait(5)
+    cancelled = any(background.cancel() or time.sleep(0.01) for _ in range(100))
+    if cancelled and engine_call.cancelled() and isinstance(background.exception(timeout=5), CancelledError):
+        print("✓ 执行中的后台调用取消成功")
+    else:
+        print("✗ 执行中的后台调用取消失败")
+    executor.shutdown()
+
+def test_engine_pool():
+    """测试引擎池：多个引擎并行执行，每个引擎只在自己的执行线程中调用"""
+    print("\n测试引擎池...")
+
+    import threading
+    import time
+    from utils.engine_pool import MatlabEnginePool
+
+    class FakeEngine:
+        def __init__(self):
+            self.owner = threading.current_thread()
+            self.foreign_calls = 0
+
+        def pwelch(self, seconds, nargout=1):
+            if threading.current_thread() is not self.owner:
+                self.foreign_calls += 1
+            time.sleep(seconds)
+            return threading.current_thread().name
+
+        def eval(self, code, nargout=0):
+            pass
+
+        def quit(self):
+            pass
+
+    engines = []
+    pool = MatlabEnginePool(2, engine_factory=lambda: engines.append(FakeEngine()) or engines[-1])
+    start = time.perf_counter()
+    threads = pool.map('pwelch', [(0.2,)] * 4)
+    elapsed = time.perf_counter() - start
+
+    if len(engines) == 2 and len(set(threads)) == 2 and elapsed < 0.7:
+        print("✓ 引擎池并行执行独立调用")
+    else:
+        print(f"✗ 引擎池没有并行执行: {len(engines)} 个引擎, {elapsed:.2f} s")
+
+    if all(engine.foreign_calls == 0 for engine in engines) and all(name.startswith('matlab-pool-') for name in threads):
+        print("✓ 每个引擎只在自己的执行线程中调用")
+    else:
+        print("✗ 引擎在其他线程中被调用")
+
+    # 所有引擎都被借出时等待超时
+    held = [pool.checkout(), pool.checkout()]
+    try:
+        pool.checkout(timeout=0.1)
+        print("✗ 借出引擎没有超时")
+    except TimeoutError:
+        print("✓ 借出引擎超时")
+    for engine in held:
+        pool.checkin(engine)
+    pool.shutdown()
+
+def test_array_table_model():
+    """测试数组表格模型"""
+    print("\n测试数组表格模型...")
+
+    from PyQt5.QtCore import Qt
+    from array_table_model import NumpyTableModel
+
+    # 一千万行、500列的只读视图，不占用实际内存
+    test_data = np.broadcast_to(np.float32(1.5), (10000000, 500))
+    model = NumpyTableModel(test_data, ["通道A"])
+    if model.rowCount() == 10000000 and model.columnCount() == 500 and model.get_data() is test_data:
+        print("✓ 模型直接引用数组，行列数正确")
+    else:
+        print("✗ 模型行列数不正确")
+
+    last = model.index(9999999, 499)
+    if model.data(last) == "1.5" and model.headerData(0, Qt.Horizontal) == "通道A" and model.headerData(1, Qt.Horizontal) == "列 2":
+        print("✓ 单元格和列名格式化正确")
+    else:
+        print(f"✗ 单元格或列名不正确: {model.data(last)}")
+
+    model.set_data(np.arange(5))
+    if model.rowCount() == 5 and model.columnCount() == 1 and model.data(model.index(4, 0)) == "4":
+        print("✓ 一维数组按单列显示")
+    else:
+        print("✗ 一维数组显示不正确")
+
+def test_recording_catalog():
+    """测试记录目录"""
+    print("\n测试记录目录...")
+
+    import time
+    from utils.recording_catalog import RecordingCatalog
+
+    test_db_file = "test_catalog.db"
+    catalog = RecordingCatalog(test_db_file)
+    now = time.time()
+    for i in range(100):
+        gyroscope = np.random.randn(500, 3) * (i + 1)
+        catalog.add_recording(f"rec_{i:03d}.mat", {'acceleration': np.random.randn(500, 3), 'gyroscope': gyroscope},
+                              {'acceleration': [0, 1, 2], 'gyroscope': [3, 4, 5]}, sample_rate=1000.0,
+                              imported_at=now - i * 86400)
+
+    # 陀螺仪RMS约为i+1，第i条记录在i天前导入
+    recordings = catalog.query(variable='gyroscope', min_rms=4.5, since=now - 6.5 * 86400)
+    if [recording['name'] for recording in recordings] == ["rec_004.mat", "rec_005.mat", "rec_006.mat"]:
+        print("✓ 按通道RMS和导入时间筛选正确")
+    else:
+        print(f"✗ 筛选结果不正确: {len(recordings)} 条")
+
+    recordings = catalog.query(variable='gyroscope', min_rms=50)
+    stats = catalog.get_channel_stats(recordings[0]['id']) if recordings else []
+    if (len(recordings) > 0 and all(recording['mapping']['gyroscope'] == [3, 4, 5] for recording in recordings)
+            and any(s['variable'] == 'gyroscope' and s['rms'] > 50 for s in stats)):
+        print("✓ 保存的映射和通道统计正确")
+    else:
+        print("✗ 保存的映射或通道统计不正确")
+
+    catalog.add_recording("rec_000.mat", {'noise': np.ones(10)})
+    if catalog.count() == 100 and len(catalog.query(name="rec_00")) == 10:
+        print("✓ 同一路径重新加入时覆盖旧记录，按名称筛选正确")
+    else:
+        print("✗ 重新加入或按名称筛选不正确")
+
+    # 从v7.3文件加入时按块读取统计
+    from utils import mat_io
+    test_mat_file = "test_catalog.mat"
+    acceleration = np.random.randn(3000, 3) * 2
+    mat_io.write_mat(test_mat_file, {'acceleration': acceleration})
+    recording_id = catalog.add_mat_file(test_mat_file, sample_rate=500.0, original_file="test_catalog.csv")
+    stats = catalog.get_channel_stats(recording_id) if recording_id is not None else []
+    if len(stats) == 3 and np.isclose(stats[1]['rms'], np.sqrt(np.mean(acceleration[:, 1] ** 2))) \
+            and catalog.get_recording(test_mat_file)['original_file'] == "test_catalog.csv":
+        print("✓ 从.mat文件加入目录时按块统计正确")
+    else:
+        print("✗ 从.mat文件加入目录失败")
+    os.remove(test_mat_file)
+
+    catalog.close()
+    for path in (test_db_file, test_db_file + "-wal", test_db_file + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+
+def test_dataset_cache():
+    """测试记录的通道缓存"""
+    print("\n测试记录的通道缓存...")
+
+    from utils import mat_io
+    from utils.dataset_cache import DatasetCache
+
+    test_mat_file = "test_cache.mat"
+    acceleration = np.random.rand(100000, 3)
+    noise = np.random.rand(100000)
+    mat_io.write_mat(test_mat_file, {'noise': noise, 'acceleration': acceleration})
+
+    # 预算只能容纳两个通道
+    cache = DatasetCache(budget_bytes=2 * 100000 * 8)
+    view = cache.open(test_mat_file)
+    if view is not None and view.shape == (100000, 4) and view.mapping['noise'] == [3] and cache.stats()['bytes'] == 0:
+        print("✓ 打开记录时只读取元数据")
+    else:
+        print("✗ 打开记录失败")
+        os.remove(test_mat_file)
+        return
+
+    if (np.array_equal(view[:, 0:3], acceleration) and np.array_equal(view[10:20, 3], noise[10:20])
+            and view[5, 1] == acceleration[5, 1]):
+        print("✓ 按列索引读取正确")
+    else:
+        print("✗ 按列索引读取不正确")
+
+    stats = cache.stats()
+    column = view[:, 0]
+    if stats['bytes'] <= stats['budget_bytes'] and stats['evictions'] > 0 and isinstance(column, np.memmap) \
+            and np.array_equal(column, acceleration[:, 0]):
+        print("✓ 缓存不超过预算，被逐出的通道通过内存映射读取")
+    else:
+        print(f"✗ 缓存预算或逐出不正确: {stats}")
+
+    if cache.open(test_mat_file) is view:
+        print("✓ 再次打开最近的记录时复用视图")
+    else:
+        print("✗ 没有复用最近打开的记录")
+
+    # 只选择部分行时只读取这些行，不把整个通道放入缓存
+    partial_cache = DatasetCache()
+    partial_view = partial_cache.open(test_mat_file)
+    rows = partial_view[500:600, [0, 3]]
+    picked = partial_view[[7, 3, 9000], 1]
+    if (np.array_equal(rows, np.column_stack([acceleration[500:600, 0], noise[500:600]]))
+            and np.array_equal(picked, acceleration[[7, 3, 9000], 1]) and partial_cache.stats()['bytes'] == 0):
+        print("✓ 按行区间读取时只读取需要的行")
+    else:
+        print(f"✗ 按行区间读取不正确: {partial_cache.stats()}")
+
+    # 转换为数组总是复制数据，不允许复制时报错
+    try:
+        np.asarray(partial_view, copy=False)
+        print("✗ copy=False时没有报错")
+    except ValueError:
+        if np.array_equal(np.asarray(partial_view, dtype=np.float32), np.column_stack([acceleration, noise]).astype(np.float32)):
+            print("✓ 转换为数组时遵循copy参数")
+        else:
+            print("✗ 转换为数组的结果不正确")
+
+    del column, view, partial_view
+    cache.clear()
+    partial_cache.clear()
+    os.remove(test_mat_file)
+
+def test_channel_store():
+    """测试通道存储"""
+    print("\n测试通道存储...")
+
+    import shutil
+    from utils.file_handler import FileHandler
+    from utils.channel_store import open_channel_store, get_channel_store_path
+
+    test_mat_file = "test_channels.mat"
+    data = np.random.rand(50000, 4)
+    file_handler = FileHandler()
+    success = file_handler.convert_to_mat(
+        "test_channels.csv", test_mat_file, {'acceleration': [0, 1, 2], 'noise': [3]},
+        data=data, build_channel_store=True, sample_rate=1000.0
+    )
+    store = open_channel_store(test_mat_file) if success else None
+    if store is not None and store.variables() == {'acceleration': (50000, 3), 'noise': (50000, 1)}:
+        print("✓ 转换时生成通道存储")
+    else:
+        print("✗ 生成通道存储失败")
+        if os.path.exists(test_mat_file):
+            os.remove(test_mat_file)
+        shutil.rmtree(get_channel_store_path(test_mat_file), ignore_errors=True)
+        return
+
+    window = store.read_time('acceleration', 1, 10.0, 12.5)
+    if isinstance(window, np.memmap) and np.array_equal(window, data[10000:12500, 1]) \
+            and np.array_equal(store.read('noise', 0, 100, 200), data[100:200, 3]):
+        print("✓ 按通道和时间段读取正确（内存映射，不复制）")
+    else:
+        print("✗ 按通道和时间段读取不正确")
+    store.close()
+
+    # 重新转换后旧的通道存储不再使用
+    file_handler.convert_to_mat("test_channels.csv", test_mat_file, {'acceleration': [0, 1, 2]}, data=data[:1000])
+    if open_channel_store(test_mat_file) is None:
+        print("✓ 文件重新转换后不使用过期的通道存储")
+    else:
+        print("✗ 使用了过期的通道存储")
+
+    os.remove(test_mat_file)
+    shutil.rmtree(get_channel_store_path(test_mat_file))
+
+    # 导入对话框的后台任务：转换后的概览和通道存储也报告进度，转换完成后仍可取消
+    from data_import_dialog import ImportWorker, CONVERT_PROGRESS_SHARE
+    from utils.overview_store import get_overview_path
+
+    test_csv_file = "test_channels.csv"
+    np.savetxt(test_csv_file, data[:20000], delimiter=",")
+    mapping = {'acceleration': [0, 1, 2], 'noise': [3]}
+    worker = ImportWorker(file_handler, test_csv_file, test_mat_file, mapping, build_channel_store=True)
+    values, results = [], []
+    worker.progress.connect(values.append)
+    worker.import_finished.connect(results.append)
+    worker.run()
+    if results == [True] and values[-1] == 100 and values == sorted(values) \
+            and any(int(CONVERT_PROGRESS_SHARE * 100) < v < 100 for v in values) \
+            and open_channel_store(test_mat_file) is not None:
+        print("✓ 导入任务为概览和通道存储分配进度")
+    else:
+        print("✗ 导入任务的进度不正确")
+
+    # 概览生成过程中取消：保留已转换的文件，不再生成通道存储
+    shutil.rmtree(get_channel_store_path(test_mat_file), ignore_errors=True)
+    os.remove(get_overview_path(test_mat_file))
+    worker = ImportWorker(file_handler, test_csv_file, test_mat_file, mapping, build_channel_store=True)
+    results = []
+    worker.progress.connect(lambda value: value > CONVERT_PROGRESS_SHARE * 100 and worker.cancel())
+    worker.import_finished.connect(results.append)
+    worker.run()
+    if results == [False] and os.path.exists(test_mat_file) \
+            and not os.path.exists(get_overview_path(test_mat_file)) \
+            and not os.path.exists(get_channel_store_path(test_mat_file)):
+        print("✓ 转换完成后仍可取消后续步骤")
+    else:
+        print("✗ 转换完成后取消导入失败")
+
+    os.remove(test_csv_file)
+    os.remove(test_mat_file)
+    for path in (get_overview_path(test_mat_file), get_channel_store_path(test_mat_file)):
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+def test_arrow_io():
+    """测试Parquet/Feather导入和导出"""
+    print("\n测试Parquet/Feather导入和导出...")
+
+    from utils import arrow_io, mat_io
+    if not arrow_io.PYARROW_AVAILABLE:
+        print("✗ 未安装pyarrow，跳过Parquet/Feather测试")
+        return
+
+    file_handler = FileHandler()
+    data = {'acceleration': np.random.rand(5000, 3), 'gyroscope': np.random.rand(5000, 3), 'noise': np.random.rand(5000)}
+    for ext in ['.parquet', '.feather']:
+        test_file = f"test_arrow{ext}"
+        test_mat_file = "test_arrow.mat"
+        if not file_handler.write_arrow_file(test_file, data):
+            print(f"✗ {ext}文件写入失败")
+            continue
+
+        if arrow_io.read_mapping(test_file) == {'acceleration': [0, 1, 2], 'gyroscope': [3, 4, 5], 'noise': [6]} \
+                and file_handler.read_file(test_file).shape == (5000, 7):
+            print(f"✓ {ext}文件读写成功，数据列映射保存在表结构元数据中")
+        else:
+            print(f"✗ {ext}文件的映射或数据不正确")
+
+        # 只读取映射的列，按读取的列重新编号
+        for streaming in (False, True):
+            success = file_handler.convert_to_mat(test_file, test_mat_file, {'gyroscope': [5, 3]}, streaming=streaming)
+            converted = mat_io.read_mat(test_mat_file) if success else {}
+            if list(converted) == ['gyroscope'] and np.array_equal(converted['gyroscope'], data['gyroscope'][:, [2, 0]]):
+                print(f"✓ {ext}文件按映射的列转换成功（{'流式' if streaming else '整体'}）")
+            else:
+                print(f"✗ {ext}文件按映射的列转换失败（{'流式' if streaming else '整体'}）")
+
+        os.remove(test_mat_file)
+        os.remove(test_file)
+
 def test_python_only_features():
     """测试仅使用Python的功能"""
     print("\n测试仅使用Python的功能...")
-    
+
     # 测试数据映射功能（不依赖Matlab）
     test_data = np.random.rand(100, 6)  # 100行6列的随机数据
-    
+
     # 模拟数据映射逻辑
     data_mapping = {
         'acceleration': [0, 1, 2],  # 前3列作为加速度数据
         'gyroscope': [3, 4, 5],      # 后3列作为陀螺仪数据
         'noise': []                  # 没有噪声数据
     }
-    
+
     # 应用数据映射
     mapped_data = {}
     if data_mapping['acceleration']:
@@ -176,12 +938,12 @@ def test_python_only_features():
         mapped_data['gyroscope'] = test_data[:, data_mapping['gyroscope']]
     if data_mapping['noise']:
         mapped_data['noise'] = test_data[:, data_mapping['noise'][0]]
-    
+
     if 'acceleration' in mapped_data and 'gyroscope' in mapped_data:
         print("✓ 数据映射逻辑测试成功")
     else:
         print("✗ 数据映射逻辑测试失败")
-    
+
     # 测试数据形状
     if mapped_data['acceleration'].shape == (100, 3) and mapped_data['gyroscope'].shape == (100, 3):
         print("✓ 数据形状测试成功")
@@ -192,19 +954,64 @@ def main():
     """主测试函数"""
     print("开始测试全周期数据管理系统...")
     print("=" * 50)
-    
+
     # 测试仅使用Python的功能
     test_python_only_features()
-    
+
     # 测试Matlab接口
     test_matlab_interface()
-    
+
     # 测试文件处理器
     test_file_handler()
-    
+
     # 测试数据导入
     test_data_import()
-    
+
+    # 测试.mat文件读写
+    test_mat_io()
+
+    # 测试分块压缩的.mat文件和部分读取
+    test_mat_layout()
+
+    # 测试CSV流式转换
+    test_csv_streaming()
+
+    # 测试批量转换的输出路径分配
+    test_batch_output_paths()
+
+    # 测试文件快速预览
+    test_file_preview()
+
+    # 测试Welch功率谱计算
+    test_welch_psd()
+
+    # 测试最小/最大值金字塔抽样
+    test_minmax_pyramid()
+
+    # 测试波形概览
+    test_overview()
+
+    # 测试引擎执行线程
+    test_engine_executor()
+
+    # 测试引擎池
+    test_engine_pool()
+
+    # 测试数组表格模型
+    test_array_table_model()
+
+    # 测试记录目录
+    test_recording_catalog()
+
+    # 测试记录的通道缓存
+    test_dataset_cache()
+
+    # 测试通道存储
+    test_channel_store()
+
+    # 测试Parquet/Feather导入和导出
+    test_arrow_io()
+
     print("\n" + "=" * 50)
     print("测试完成！")
 
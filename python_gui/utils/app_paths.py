@@ -0,0 +1,7 @@
+import os
+
+def get_app_data_dir():
+    """获取应用数据目录（用于缓存等），可通过环境变量DMS_DATA_DIR指定"""
+    path = os.environ.get('DMS_DATA_DIR') or os.path.join(os.path.expanduser('~'), '.data_management')
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,203 @@
+import json
+import os
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# 支持的Arrow格式文件扩展名
+PARQUET_EXTENSIONS = ('.parquet',)
+FEATHER_EXTENSIONS = ('.feather', '.arrow')
+ARROW_EXTENSIONS = PARQUET_EXTENSIONS + FEATHER_EXTENSIONS
+
+# 表结构元数据中保存数据列映射的键
+MAPPING_METADATA_KEY = b'dms.data_mapping'
+
+# 写入时每个行组（Parquet）或记录批次（Feather）的行数
+DEFAULT_BATCH_ROWS = 1 << 20
+
+def is_arrow_file(file_path):
+    """是否为Parquet或Feather（Arrow IPC）文件"""
+    return os.path.splitext(file_path)[1].lower() in ARROW_EXTENSIONS
+
+def read_schema(file_path):
+    """只读取文件的表结构（列名、类型和元数据），不读取数据"""
+    _require_pyarrow()
+    if _is_parquet(file_path):
+        return pq.read_schema(file_path)
+    with pa.memory_map(file_path) as source:
+        return pa.ipc.open_file(source).schema
+
+def read_mapping(file_path):
+    """读取表结构元数据中保存的数据列映射（列号从0开始），没有时返回None"""
+    metadata = read_schema(file_path).metadata or {}
+    if MAPPING_METADATA_KEY not in metadata:
+        return None
+    mapping = json.loads(metadata[MAPPING_METADATA_KEY].decode('utf-8'))
+    return {key: [int(col) for col in cols] for key, cols in mapping.items()}
+
+def list_columns(file_path):
+    """返回(列名列表, 各列类型名列表, 总行数)，只读取文件的元数据"""
+    _require_pyarrow()
+    schema = read_schema(file_path)
+    names = list(schema.names)
+    dtypes = [str(field.type) for field in schema]
+    if _is_parquet(file_path):
+        rows = pq.ParquetFile(file_path).metadata.num_rows
+    else:
+        with pa.memory_map(file_path) as source:
+            rows = pa.ipc.open_file(source).count_rows()
+    return names, dtypes, rows
+
+def row_chunks(file_path):
+    """返回文件中各行组（Parquet）或记录批次（Feather）的(起始行, 行数)，可以只读取需要的部分"""
+    _require_pyarrow()
+    if _is_parquet(file_path):
+        metadata = pq.ParquetFile(file_path).metadata
+        sizes = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+    else:
+        with pa.memory_map(file_path) as source:
+            reader = pa.ipc.open_file(source)
+            sizes = [reader.get_batch(i).num_rows for i in range(reader.num_record_batches)]
+    
+    chunks = []
+    start = 0
+    for size in sizes:
+        chunks.append((start, size))
+        start += size
+    return chunks
+
+def iter_blocks(file_path, columns=None, chunk_indices=None):
+    """逐个行组或记录批次读取，每次产生(行数 × 列数)的NumPy数组（按列存放）；columns为列号列表时只读取这些列，chunk_indices为要读取的行组/批次编号"""
+    for table in _iter_tables(file_path, columns, chunk_indices):
+        yield _table_to_array(table)
+
+def read_arrow(file_path, columns=None, progress=None):
+    """读取整个文件为(行数 × 列数)的NumPy数组（按列存放，各行组直接复制到结果中），columns为列号列表时只读取这些列，progress接收0~1的进度"""
+    _, _, rows = list_columns(file_path)
+    data = None
+    offset = 0
+    for table in _iter_tables(file_path, columns):
+        dtype = _table_dtype(table)
+        if data is None:
+            data = np.empty((rows, table.num_columns), dtype=dtype, order='F')
+        elif np.result_type(data.dtype, dtype) != data.dtype:
+            # 后面的行组出现缺失值或不同类型时提升整个数组的类型
+            data = data.astype(np.result_type(data.dtype, dtype), order='F')
+        _fill_array(data, table, offset)
+        offset += table.num_rows
+        if progress:
+            progress(offset / max(1, rows))
+    
+    if data is None:
+        n_cols = len(columns) if columns is not None else len(read_schema(file_path).names)
+        data = np.empty((0, n_cols))
+    return data
+
+def read_arrow_rows(file_path, rows):
+    """只读取指定的行（行号按升序排列），只读取这些行所在的行组或记录批次，返回(行数 × 列数)的NumPy数组"""
+    rows = np.asarray(rows, dtype=np.int64)
+    chunks = row_chunks(file_path)
+    starts = np.array([start for start, _ in chunks], dtype=np.int64)
+    chunk_of_row = np.searchsorted(starts, rows, side='right') - 1
+    needed = sorted(set(chunk_of_row.tolist()))
+    
+    parts = []
+    for index, block in zip(needed, iter_blocks(file_path, chunk_indices=needed)):
+        parts.append(block[rows[chunk_of_row == index] - starts[index]])
+    if not parts:
+        return np.empty((0, len(read_schema(file_path).names)))
+    return np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+def write_arrow(file_path, data_dict, batch_rows=DEFAULT_BATCH_ROWS):
+    """将{变量名: 数组}写入Parquet或Feather文件：每个通道一列（列名为“变量名_通道”），各变量对应的列号作为数据列映射保存在表结构元数据中"""
+    _require_pyarrow()
+    arrays = []
+    names = []
+    mapping = {}
+    for name, value in data_dict.items():
+        value = np.asarray(value)
+        value = value.reshape(value.shape[0], -1) if value.ndim else value.reshape(1, 1)
+        mapping[name] = list(range(len(names), len(names) + value.shape[1]))
+        for channel in range(value.shape[1]):
+            arrays.append(pa.array(np.ascontiguousarray(value[:, channel])))
+            names.append(f"{name}_{channel}")
+    
+    table = pa.Table.from_arrays(arrays, names=names)
+    table = table.replace_schema_metadata({MAPPING_METADATA_KEY: json.dumps(mapping).encode('utf-8')})
+    
+    if _is_parquet(file_path):
+        pq.write_table(table, file_path, row_group_size=batch_rows)
+    else:
+        # 不压缩，读取时可以直接内存映射
+        with pa.OSFile(file_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table, max_chunksize=batch_rows)
+
+def _require_pyarrow():
+    if not PYARROW_AVAILABLE:
+        raise ImportError("读写Parquet/Feather文件需要安装pyarrow")
+
+def _is_parquet(file_path):
+    return os.path.splitext(file_path)[1].lower() in PARQUET_EXTENSIONS
+
+def _iter_tables(file_path, columns=None, chunk_indices=None):
+    """逐个行组（Parquet）或记录批次（Feather）读取为pyarrow表，只读取选中的列"""
+    _require_pyarrow()
+    if _is_parquet(file_path):
+        parquet_file = pq.ParquetFile(file_path, memory_map=True)
+        names = _column_names(parquet_file.schema_arrow, columns)
+        for i in (range(parquet_file.num_row_groups) if chunk_indices is None else chunk_indices):
+            # 只解码选中的列，各列在多个线程中并行解码
+            yield parquet_file.read_row_group(i, columns=names, use_threads=True)
+        return
+    
+    # Feather文件通过内存映射读取，未压缩时各列直接引用映射的内存，不复制
+    with pa.memory_map(file_path) as source:
+        reader = pa.ipc.open_file(source)
+        names = _column_names(reader.schema, columns)
+        for i in (range(reader.num_record_batches) if chunk_indices is None else chunk_indices):
+            yield pa.Table.from_batches([reader.get_batch(i)]).select(names)
+
+def _column_names(schema, columns):
+    """将列号列表转换为列名列表，None表示所有列"""
+    if columns is None:
+        return list(schema.names)
+    return [schema.names[col] for col in columns]
+
+def _is_numeric(table):
+    return all(pa.types.is_integer(field.type) or pa.types.is_floating(field.type)
+               or pa.types.is_boolean(field.type) for field in table.schema)
+
+def _table_dtype(table):
+    """表转换为NumPy数组后的数据类型：有缺失值的整数和布尔列转为浮点数（缺失值为NaN），含非数值列时为object"""
+    if not _is_numeric(table):
+        return np.dtype(object)
+    dtypes = [np.float64 if column.null_count and not pa.types.is_floating(column.type)
+              else column.type.to_pandas_dtype() for column in table.columns]
+    return np.result_type(*dtypes) if dtypes else np.dtype(np.float64)
+
+def _fill_array(data, table, row_offset=0):
+    """将表的各列复制到data从row_offset开始的行中（data按列存放时每列连续写入，每个值只复制一次）"""
+    if not _is_numeric(table):
+        data[row_offset:row_offset + table.num_rows] = table.to_pandas().to_numpy()
+        return
+    
+    for col, column in enumerate(table.columns):
+        if column.null_count and not pa.types.is_floating(column.type):
+            column = column.cast(pa.float64())
+        offset = row_offset
+        for chunk in column.chunks:
+            data[offset:offset + len(chunk), col] = chunk.to_numpy(zero_copy_only=False)
+            offset += len(chunk)
+
+def _table_to_array(table):
+    """将表转换为(行数 × 列数)的NumPy数组，按列存放（与Matlab一致），逐列写入和按通道写入.mat文件时都是连续内存"""
+    data = np.empty((table.num_rows, table.num_columns), dtype=_table_dtype(table), order='F')
+    _fill_array(data, table)
+    return data
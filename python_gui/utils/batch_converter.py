@@ -0,0 +1,251 @@
+import contextlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from utils.file_handler import FileHandler
+from utils.arrow_io import ARROW_EXTENSIONS
+
+# 批量转换支持的输入文件格式
+BATCH_INPUT_EXTENSIONS = ('.csv', '.xlsx', '.xls') + ARROW_EXTENSIONS
+
+# 批量转换支持的输出格式
+BATCH_OUTPUT_FORMATS = ('mat', 'parquet', 'feather')
+
+# 记录已完成文件的清单文件名（用于中断后续传）
+MANIFEST_FILE_NAME = 'batch_manifest.json'
+
+def collect_input_files(paths, recursive=False):
+    """展开文件和目录参数，返回所有支持格式的输入文件"""
+    input_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            if recursive:
+                for root, _, names in os.walk(path):
+                    input_files.extend(os.path.join(root, name) for name in sorted(names))
+            else:
+                input_files.extend(os.path.join(path, name) for name in sorted(os.listdir(path)))
+        else:
+            input_files.append(path)
+    
+    return [f for f in input_files
+            if os.path.isfile(f) and os.path.splitext(f)[1].lower() in BATCH_INPUT_EXTENSIONS]
+
+def get_output_path(input_file, output_dir=None, output_format='mat', base_dir=None, tag_extension=False):
+    """生成转换后的文件路径（与导入对话框的命名规则一致），output_format为'mat'、'parquet'或'feather'；指定base_dir时在输出目录下保留输入文件相对于base_dir的子目录，tag_extension为True时在文件名中加上输入文件的扩展名"""
+    base_name, ext = os.path.splitext(os.path.basename(input_file))
+    if tag_extension:
+        base_name = f"{base_name}_{ext.lstrip('.').lower()}"
+    if output_dir and base_dir:
+        target_dir = os.path.normpath(os.path.join(output_dir, os.path.relpath(os.path.dirname(input_file), base_dir)))
+    else:
+        target_dir = output_dir or os.path.dirname(input_file)
+    return os.path.join(target_dir, f"{base_name}_converted.{output_format}")
+
+def plan_output_paths(input_files, output_dir=None, output_format='mat'):
+    """为每个输入文件分配不重复的输出路径，返回([(输入文件, 输出文件)], [(输入文件, 输出文件, 冲突的输入文件)])
+    
+    指定输出目录时保留各文件相对于共同上级目录的子目录；同一目录中只有扩展名不同的文件（如a.csv和a.xlsx）在输出文件名中加上扩展名；
+    重复的输入文件只转换一次，仍然冲突的文件不转换，避免多个进程同时写入同一个输出文件
+    """
+    unique_files = []
+    seen = set()
+    for input_file in input_files:
+        key = os.path.normcase(os.path.abspath(input_file))
+        if key not in seen:
+            seen.add(key)
+            unique_files.append(input_file)
+    
+    base_dir = None
+    if output_dir and unique_files:
+        try:
+            base_dir = os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in unique_files])
+        except ValueError:
+            # 不同驱动器上的文件没有共同上级目录
+            base_dir = None
+    
+    def output_key(input_file, tag_extension=False):
+        output_file = get_output_path(os.path.abspath(input_file) if base_dir else input_file,
+                                      output_dir, output_format, base_dir, tag_extension)
+        return output_file, os.path.normcase(os.path.abspath(output_file))
+    
+    # 先找出按常规命名会冲突的文件，改为在文件名中加上扩展名
+    counts = {}
+    for input_file in unique_files:
+        key = output_key(input_file)[1]
+        counts[key] = counts.get(key, 0) + 1
+    
+    planned = []
+    conflicts = []
+    owners = {}
+    for input_file in unique_files:
+        output_file, key = output_key(input_file)
+        if counts[key] > 1:
+            output_file, key = output_key(input_file, tag_extension=True)
+        if key in owners:
+            conflicts.append((input_file, output_file, owners[key]))
+        else:
+            owners[key] = input_file
+            planned.append((input_file, output_file))
+    return planned, conflicts
+
+def _convert_one(input_file, output_file, data_mapping, options):
+    """在子进程中转换单个文件，返回转换结果和耗时"""
+    file_handler = FileHandler(
+        mat_version=options['mat_version'],
+        chunk_rows=options['chunk_rows'],
+        compression=options['compression'],
+        compression_level=options['compression_level']
+    )
+    
+    # FileHandler通过print输出错误信息，这里收集起来作为失败原因
+    messages = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(messages):
+            success = file_handler.convert_to_mat(
+                input_file, output_file, data_mapping,
+                streaming=options['streaming'],
+                dtype=options['dtype'],
+                memory_budget_mb=options['memory_budget_mb'],
+                csv_engine=options['csv_engine'],
+                build_overview=options['build_overview'],
+                build_channel_store=options['build_channel_store']
+            )
+        error = None if success else (messages.getvalue().strip() or "转换失败")
+    except Exception as e:
+        success = False
+        error = f"{type(e).__name__}: {e}"
+    
+    return {
+        'input_file': input_file,
+        'output_file': output_file,
+        'success': success,
+        'seconds': time.perf_counter() - start,
+        'error': error
+    }
+
+class BatchConverter:
+    """使用进程池并行转换多个数据文件，支持中断后续传"""
+    
+    def __init__(self, output_dir=None, data_mapping=None, workers=None, streaming=True,
+                 dtype=None, memory_budget_mb=256, csv_engine=None, mat_version='7.3', resume=True,
+                 build_overview=False, build_channel_store=False,
+                 chunk_rows=None, compression=None, compression_level=None, output_format='mat'):
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.data_mapping = data_mapping
+        self.workers = workers or os.cpu_count() or 1
+        self.resume = resume
+        self.options = {
+            'streaming': streaming,
+            'dtype': dtype,
+            'memory_budget_mb': memory_budget_mb,
+            'csv_engine': csv_engine,
+            'mat_version': mat_version,
+            'chunk_rows': chunk_rows,
+            'compression': compression,
+            'compression_level': compression_level,
+            'build_overview': build_overview,
+            'build_channel_store': build_channel_store
+        }
+        self.manifest = {}
+    
+    def run(self, input_files, result_callback=None):
+        """转换所有文件，返回每个文件的结果列表（已完成而跳过的文件标记为skipped，输出文件冲突的文件不转换并标记为失败）"""
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+        self.manifest = self._load_manifest() if self.resume else {}
+        
+        results = []
+        pending = []
+        planned, conflicts = plan_output_paths(input_files, self.output_dir, self.output_format)
+        for input_file, output_file, other_file in conflicts:
+            result = {
+                'input_file': input_file,
+                'output_file': output_file,
+                'success': False,
+                'seconds': 0.0,
+                'error': f"输出文件与 {other_file} 的输出文件相同",
+                'skipped': False
+            }
+            results.append(result)
+            if result_callback:
+                result_callback(result)
+        
+        for input_file, output_file in planned:
+            if self._is_done(input_file, output_file):
+                result = dict(self.manifest[os.path.abspath(input_file)], skipped=True)
+                results.append(result)
+                if result_callback:
+                    result_callback(result)
+            else:
+                pending.append((input_file, output_file))
+                # 保留子目录时输出目录下可能需要创建多级目录
+                if os.path.dirname(output_file):
+                    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(_convert_one, input_file, output_file, self.data_mapping, self.options):
+                    (input_file, output_file)
+                for input_file, output_file in pending
+            }
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # 子进程异常退出等情况
+                    input_file, output_file = futures[future]
+                    result = {
+                        'input_file': input_file,
+                        'output_file': output_file,
+                        'success': False,
+                        'seconds': 0.0,
+                        'error': f"{type(e).__name__}: {e}"
+                    }
+                
+                result['skipped'] = False
+                results.append(result)
+                self._record(result)
+                if result_callback:
+                    result_callback(result)
+        
+        return results
+    
+    def _manifest_path(self):
+        """清单文件路径：输出目录下（未指定输出目录时为当前目录）"""
+        return os.path.join(self.output_dir or os.getcwd(), MANIFEST_FILE_NAME)
+    
+    def _load_manifest(self):
+        """加载上次运行留下的清单"""
+        try:
+            with open(self._manifest_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _is_done(self, input_file, output_file):
+        """判断文件是否已在之前的运行中成功转换且之后未被修改"""
+        entry = self.manifest.get(os.path.abspath(input_file))
+        if not entry or not entry.get('success') or not os.path.exists(output_file):
+            return False
+        stat = os.stat(input_file)
+        return entry.get('mtime_ns') == stat.st_mtime_ns and entry.get('size') == stat.st_size
+    
+    def _record(self, result):
+        """每完成一个文件就写回清单，保证进程崩溃后可以续传"""
+        stat = os.stat(result['input_file'])
+        entry = {key: value for key, value in result.items() if key != 'skipped'}
+        entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        self.manifest[os.path.abspath(result['input_file'])] = entry
+        
+        manifest_path = self._manifest_path()
+        tmp_path = manifest_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, manifest_path)
+        except OSError as e:
+            print(f"保存批量转换清单失败: {e}")
@@ -0,0 +1,219 @@
+import json
+import math
+import os
+import shutil
+import sys
+import numpy as np
+from utils import mat_io
+
+try:
+    import h5py
+    H5PY_AVAILABLE = True
+except ImportError:
+    H5PY_AVAILABLE = False
+
+# 通道存储目录的后缀，与转换后的.mat文件放在同一目录
+CHANNEL_STORE_SUFFIX = '.channels'
+
+# 通道存储目录中的头文件名
+HEADER_FILE_NAME = 'header.json'
+
+# 通道存储格式版本，格式变化时递增
+CHANNEL_STORE_VERSION = 1
+
+# 从.mat文件生成通道存储时每次读取的采样点数
+CHANNEL_STORE_BLOCK_SAMPLES = 1 << 20
+
+def get_channel_store_path(mat_path):
+    """转换后文件对应的通道存储目录路径"""
+    return os.path.splitext(mat_path)[0] + CHANNEL_STORE_SUFFIX
+
+class ChannelStoreWriter:
+    """逐块写入通道存储：每个通道保存为一个连续的原始二进制文件，关闭时写入头文件并替换旧的存储目录"""
+    
+    def __init__(self, store_path, source_path=None, sample_rate=None):
+        self.store_path = store_path
+        self.source_path = source_path
+        self.sample_rate = sample_rate
+        self._tmp_path = store_path + '.tmp'
+        if os.path.exists(self._tmp_path):
+            shutil.rmtree(self._tmp_path)
+        os.makedirs(self._tmp_path)
+        
+        # 变量名 -> {'dtype', 'n_samples', 'files', 'handles'}
+        self._variables = {}
+    
+    def append(self, name, block):
+        """将一块数据（行为采样点，列为通道）追加到变量name的各通道文件末尾"""
+        block = np.asarray(block)
+        if block.ndim == 1:
+            block = block.reshape(-1, 1)
+        rows, cols = block.shape
+        
+        variable = self._variables.get(name)
+        if variable is None:
+            files = [f"{name}_{channel}.bin" for channel in range(cols)]
+            variable = {
+                'dtype': block.dtype,
+                'n_samples': 0,
+                'files': files,
+                'handles': [open(os.path.join(self._tmp_path, file_name), 'wb') for file_name in files]
+            }
+            self._variables[name] = variable
+        if len(variable['handles']) != cols:
+            raise ValueError(f"变量 {name} 的列数不一致: {len(variable['handles'])} != {cols}")
+        
+        for channel, handle in enumerate(variable['handles']):
+            np.ascontiguousarray(block[:, channel], dtype=variable['dtype']).tofile(handle)
+        variable['n_samples'] += rows
+    
+    def close(self):
+        """关闭通道文件，写入头文件后替换旧的存储目录"""
+        header = {
+            'version': CHANNEL_STORE_VERSION,
+            'byte_order': sys.byteorder,
+            'sample_rate': self.sample_rate,
+            'variables': {}
+        }
+        if self.source_path is not None:
+            stat = os.stat(self.source_path)
+            header['source_mtime_ns'] = stat.st_mtime_ns
+            header['source_size'] = stat.st_size
+        
+        for name, variable in self._variables.items():
+            for handle in variable['handles']:
+                handle.close()
+            header['variables'][name] = {
+                'dtype': variable['dtype'].str,
+                'n_samples': variable['n_samples'],
+                'n_channels': len(variable['files']),
+                'files': variable['files']
+            }
+        
+        with open(os.path.join(self._tmp_path, HEADER_FILE_NAME), 'w', encoding='utf-8') as f:
+            json.dump(header, f, ensure_ascii=False, indent=2)
+        
+        if os.path.exists(self.store_path):
+            shutil.rmtree(self.store_path)
+        os.rename(self._tmp_path, self.store_path)
+        return self.store_path
+    
+    def abort(self):
+        """放弃写入，删除临时目录"""
+        for variable in self._variables.values():
+            for handle in variable['handles']:
+                handle.close()
+        shutil.rmtree(self._tmp_path, ignore_errors=True)
+
+def build_channel_store(mat_path, store_path=None, sample_rate=None, progress=None):
+    """从.mat文件生成通道存储（按通道连续存放的原始二进制文件 + 头文件），progress接收0~1的进度"""
+    store_path = store_path or get_channel_store_path(mat_path)
+    variables = [(name, shape, matlab_class) for name, shape, matlab_class in mat_io.list_variables(mat_path)
+                 if 0 < len(shape) <= 2 and shape[0] > 0]
+    total = max(1, sum(shape[0] for _, shape, _ in variables))
+    done = 0
+    
+    writer = ChannelStoreWriter(store_path, source_path=mat_path, sample_rate=sample_rate)
+    try:
+        for name, shape, matlab_class in variables:
+            for block in _iter_variable_blocks(mat_path, name, shape[0]):
+                writer.append(name, block.astype(bool) if matlab_class == 'logical' else block)
+                done += len(block)
+                if progress:
+                    progress(done / total)
+    except Exception:
+        writer.abort()
+        raise
+    return writer.close()
+
+def _iter_variable_blocks(mat_path, name, n_samples):
+    """按采样点分块读取变量，每次产生(采样点数 × 通道数)的数组；v7.3文件直接从HDF5中按块读取"""
+    if mat_io.is_mat73_file(mat_path):
+        if not H5PY_AVAILABLE:
+            raise ImportError("读取v7.3格式.mat文件需要安装h5py")
+        with h5py.File(mat_path, 'r') as f:
+            # HDF5中的维度顺序与Matlab相反（通道数 × 采样点数）
+            dataset = f[name]
+            for start in range(0, n_samples, CHANNEL_STORE_BLOCK_SAMPLES):
+                yield dataset[:, start:start + CHANNEL_STORE_BLOCK_SAMPLES].T
+        return
+    
+    value = mat_io.read_mat(mat_path, [name])[name]
+    value = value.reshape(value.shape[0], -1)
+    for start in range(0, n_samples, CHANNEL_STORE_BLOCK_SAMPLES):
+        yield value[start:start + CHANNEL_STORE_BLOCK_SAMPLES]
+
+class ChannelStore:
+    """读取通道存储：每个通道映射为只读的np.memmap，按通道和采样点区间切片时不复制数据，重复读取由操作系统页缓存加速"""
+    
+    def __init__(self, mat_path, store_path=None):
+        self.mat_path = mat_path
+        self.store_path = store_path or get_channel_store_path(mat_path)
+        with open(os.path.join(self.store_path, HEADER_FILE_NAME), 'r', encoding='utf-8') as f:
+            self.header = json.load(f)
+        if self.header.get('version') != CHANNEL_STORE_VERSION:
+            raise ValueError(f"不支持的通道存储版本: {self.header.get('version')}")
+        if self.header.get('byte_order') != sys.byteorder:
+            raise ValueError("通道存储的字节序与本机不一致")
+        self.sample_rate = self.header.get('sample_rate')
+        self._maps = {}
+    
+    def variables(self):
+        """返回{变量名: (采样点数, 通道数)}"""
+        return {name: (variable['n_samples'], variable['n_channels'])
+                for name, variable in self.header['variables'].items()}
+    
+    def is_current(self):
+        """通道存储是否与当前的.mat文件一致（文件被重新转换后需要重建）"""
+        try:
+            stat = os.stat(self.mat_path)
+        except OSError:
+            return False
+        return (self.header.get('source_mtime_ns') == stat.st_mtime_ns
+                and self.header.get('source_size') == stat.st_size)
+    
+    def channel(self, variable, channel):
+        """返回整个通道的只读内存映射（一维，首次访问时映射）"""
+        key = (variable, channel)
+        mapped = self._maps.get(key)
+        if mapped is None:
+            info = self.header['variables'][variable]
+            mapped = np.memmap(os.path.join(self.store_path, info['files'][channel]),
+                               dtype=np.dtype(info['dtype']), mode='r', shape=(info['n_samples'],))
+            self._maps[key] = mapped
+        return mapped
+    
+    def read(self, variable, channel, start=0, stop=None):
+        """返回通道在采样点区间[start, stop)内的数据（内存映射的切片，不复制）"""
+        return self.channel(variable, channel)[start:stop]
+    
+    def read_time(self, variable, channel, start_time, end_time, sample_rate=None):
+        """返回通道在[start_time, end_time)秒内的数据，sample_rate为None时使用存储中记录的采样率"""
+        sample_rate = sample_rate or self.sample_rate
+        if not sample_rate:
+            raise ValueError("通道存储中没有记录采样率")
+        start = max(0, int(math.floor(start_time * sample_rate)))
+        stop = max(start, int(math.ceil(end_time * sample_rate)))
+        return self.read(variable, channel, start, stop)
+    
+    def close(self):
+        """释放内存映射"""
+        self._maps.clear()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+def open_channel_store(mat_path):
+    """打开.mat文件对应的通道存储，不存在、无法读取或已过期时返回None"""
+    if not os.path.exists(os.path.join(get_channel_store_path(mat_path), HEADER_FILE_NAME)):
+        return None
+    try:
+        store = ChannelStore(mat_path)
+    except (OSError, ValueError) as e:
+        print(f"打开通道存储失败: {e}")
+        return None
+    return store if store.is_current() else None
@@ -0,0 +1,346 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+from utils import mat_io
+from utils.channel_store import open_channel_store
+
+try:
+    import h5py
+    H5PY_AVAILABLE = True
+except ImportError:
+    H5PY_AVAILABLE = False
+
+# 缓存的默认字节预算（可通过环境变量DMS_CACHE_BUDGET_MB设置）
+DEFAULT_CACHE_BUDGET_BYTES = 1024 * 1024 * 1024
+
+# 保留元数据的最近打开的记录数
+MAX_OPEN_RECORDINGS = 32
+
+# 记录中已映射的变量及其在视图中的顺序，其余变量排在后面
+MAPPED_VARIABLES = ['acceleration', 'gyroscope', 'noise']
+
+# Matlab类名与NumPy数据类型的对应关系
+MATLAB_DTYPES = {matlab_class: dtype for dtype, matlab_class in mat_io.MATLAB_CLASS_NAMES.items()}
+
+class DatasetCache:
+    """按字节预算的LRU通道缓存：记录的各通道首次访问时才从文件读取，超出预算时释放最久未使用的通道，已释放的通道之后尽量通过内存映射读取"""
+    
+    def __init__(self, budget_bytes=DEFAULT_CACHE_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._lock = threading.RLock()
+        # (路径, 变量名, 通道) -> 只读数组，按最近使用顺序排列
+        self._entries = OrderedDict()
+        self._bytes = 0
+        # 被逐出过的通道，再次访问时改用内存映射读取
+        self._evicted = set()
+        # 路径 -> RecordingView，切换回最近查看的记录时不再重新读取元数据
+        self._views = OrderedDict()
+        self._counts = {'hits': 0, 'misses': 0, 'evictions': 0, 'mapped_reads': 0}
+    
+    def open(self, path):
+        """返回记录的按列访问视图（只读取元数据，不读取数据），失败时返回None"""
+        path = os.path.abspath(path)
+        with self._lock:
+            view = self._views.get(path)
+            if view is not None and view.is_current():
+                self._views.move_to_end(path)
+                return view
+        
+        try:
+            view = RecordingView(self, path)
+        except Exception as e:
+            print(f"打开记录 {path} 失败: {e}")
+            return None
+        
+        with self._lock:
+            # 文件已变化时丢弃旧的通道
+            if path in self._views:
+                self.release(path)
+            self._views[path] = view
+            while len(self._views) > MAX_OPEN_RECORDINGS:
+                self._views.popitem(last=False)
+        return view
+    
+    def get(self, key):
+        """获取缓存的通道并标记为最近使用，不存在时返回None"""
+        with self._lock:
+            array = self._entries.get(key)
+            if array is None:
+                self._counts['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counts['hits'] += 1
+            return array
+    
+    def contains(self, key):
+        """通道是否在缓存中（不计入命中统计，也不改变使用顺序）"""
+        with self._lock:
+            return key in self._entries
+    
+    def put(self, key, array):
+        """放入通道（设为只读），超出预算时逐出最久未使用的通道；单个通道超过整个预算时不缓存"""
+        array.flags.writeable = False
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key).nbytes
+            if array.nbytes > self.budget_bytes:
+                self._evicted.add(key)
+                return array
+            
+            while self._entries and self._bytes + array.nbytes > self.budget_bytes:
+                old_key, old_array = self._entries.popitem(last=False)
+                self._bytes -= old_array.nbytes
+                self._evicted.add(old_key)
+                self._counts['evictions'] += 1
+            
+            self._entries[key] = array
+            self._bytes += array.nbytes
+            self._evicted.discard(key)
+        return array
+    
+    def was_evicted(self, key):
+        """通道是否因超出预算被逐出过"""
+        with self._lock:
+            return key in self._evicted
+    
+    def count_mapped_read(self):
+        """记录一次通过内存映射的读取"""
+        with self._lock:
+            self._counts['mapped_reads'] += 1
+    
+    def release(self, path):
+        """释放记录的所有通道和元数据（文件被重写后调用）"""
+        path = os.path.abspath(path)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == path]:
+                self._bytes -= self._entries.pop(key).nbytes
+            self._evicted = {key for key in self._evicted if key[0] != path}
+            self._views.pop(path, None)
+    
+    def clear(self):
+        """释放所有缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._evicted.clear()
+            self._views.clear()
+            self._bytes = 0
+    
+    def stats(self):
+        """返回缓存统计：已用字节数、预算、通道数、打开的记录数、命中/未命中/逐出/内存映射读取次数"""
+        with self._lock:
+            stats = dict(self._counts)
+            stats.update({
+                'bytes': self._bytes,
+                'budget_bytes': self.budget_bytes,
+                'entries': len(self._entries),
+                'recordings': len(self._views)
+            })
+        return stats
+
+class RecordingView:
+    """转换后.mat文件的按列访问视图：像(行数 × 列数)的数组一样支持data[:, col]、shape等，各列在首次访问时才读取"""
+    
+    ndim = 2
+    
+    def __init__(self, cache, path):
+        self.cache = cache
+        self.path = os.path.abspath(path)
+        stat = os.stat(self.path)
+        self._file_key = (stat.st_size, stat.st_mtime_ns)
+        self._is_mat73 = mat_io.is_mat73_file(self.path)
+        self._memmaps = {}
+        self._channel_store = False
+        
+        # 只保留行数与第一个变量相同的二维以内的数值变量，按已映射的变量在前排列
+        variables = [(name, shape, matlab_class) for name, shape, matlab_class in mat_io.list_variables(self.path)
+                     if 0 < len(shape) <= 2]
+        variables.sort(key=lambda item: (MAPPED_VARIABLES.index(item[0]) if item[0] in MAPPED_VARIABLES
+                                          else len(MAPPED_VARIABLES)))
+        if not variables:
+            raise ValueError("文件中没有数值变量")
+        rows = variables[0][1][0]
+        
+        # 视图中的每一列对应(变量名, 通道)
+        self.columns = []
+        self.mapping = {key: [] for key in MAPPED_VARIABLES}
+        self.variable_columns = {}
+        self._logical = set()
+        dtypes = []
+        for name, shape, matlab_class in variables:
+            if shape[0] != rows:
+                continue
+            n_channels = shape[1] if len(shape) > 1 else 1
+            start = len(self.columns)
+            self.columns.extend((name, channel) for channel in range(n_channels))
+            self.variable_columns[name] = list(range(start, start + n_channels))
+            if name in self.mapping:
+                self.mapping[name] = self.variable_columns[name]
+            
+            if matlab_class == 'logical':
+                self._logical.add(name)
+                dtypes.append(np.dtype(bool))
+            else:
+                dtypes.append(MATLAB_DTYPES[matlab_class])
+        
+        self.shape = (rows, len(self.columns))
+        self.dtype = np.result_type(*dtypes)
+    
+    def is_current(self):
+        """文件是否未被修改"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) == self._file_key
+    
+    def __len__(self):
+        return self.shape[0]
+    
+    def __array__(self, dtype=None, copy=None):
+        """读取所有列，返回完整的数组（各列分别存放，总是需要复制，copy为False时抛出ValueError）"""
+        if copy is False:
+            raise ValueError("RecordingView转换为数组时需要复制数据")
+        data = np.column_stack([self.column(col) for col in range(self.shape[1])])
+        return data.astype(dtype, copy=False) if dtype is not None else data
+    
+    def __getitem__(self, key):
+        """支持data[rows, col]、data[rows, a:b]、data[rows, [列号]]等索引，只读取需要的列；行索引不是全部行时只读取这些行"""
+        if not isinstance(key, tuple):
+            key = (key, slice(None))
+        row_key, col_key = key
+        
+        if isinstance(col_key, (int, np.integer)):
+            return self.column_rows(int(col_key), row_key)
+        if isinstance(col_key, slice):
+            columns = range(*col_key.indices(self.shape[1]))
+        else:
+            columns = [int(col) for col in np.asarray(col_key).ravel()]
+        
+        parts = [self.column_rows(col, row_key) for col in columns]
+        if not parts:
+            return np.empty((self.shape[0], 0), dtype=self.dtype)[row_key]
+        return np.stack(parts, axis=-1)
+    
+    def column(self, col):
+        """返回一列数据（只读）：优先从缓存读取，被逐出过的列通过内存映射读取（优先使用通道存储），否则从文件读取后放入缓存"""
+        if col < 0:
+            col += self.shape[1]
+        name, channel = self.columns[col]
+        key = (self.path, name, channel)
+        
+        array = self.cache.get(key)
+        if array is not None:
+            return array
+        
+        # 文件被重写后原来的内存映射不再有效，改为重新读取
+        if self.cache.was_evicted(key) and self.is_current():
+            store = self._get_channel_store()
+            if store is not None and name in store.header['variables']:
+                self.cache.count_mapped_read()
+                return store.channel(name, channel)
+            mapped = self._memmap(name)
+            if mapped is not None:
+                self.cache.count_mapped_read()
+                return mapped[channel]
+        return self._load(name, channel)
+    
+    def column_rows(self, col, row_key):
+        """返回一列中row_key选择的行：列已缓存或选择全部行时使用column()，否则只从通道存储、内存映射或文件中读取覆盖这些行的区间（不放入缓存）"""
+        if col < 0:
+            col += self.shape[1]
+        name, channel = self.columns[col]
+        
+        bounds = _row_bounds(row_key, self.shape[0])
+        if bounds is None or bounds[:2] == (0, self.shape[0]) or self.cache.contains((self.path, name, channel)):
+            return self.column(col)[row_key]
+        
+        start, stop, local_key = bounds
+        array = self._read_rows(name, channel, start, stop)
+        if array is None:
+            return self.column(col)[row_key]
+        return array[local_key]
+    
+    def _read_rows(self, name, channel, start, stop):
+        """读取通道的[start, stop)行，v5格式文件等无法部分读取时返回None"""
+        if not self.is_current():
+            return None
+        
+        store = self._get_channel_store()
+        if store is not None and name in store.header['variables']:
+            self.cache.count_mapped_read()
+            return store.channel(name, channel)[start:stop]
+        if not self._is_mat73:
+            return None
+        
+        mapped = self._memmap(name)
+        if mapped is not None:
+            self.cache.count_mapped_read()
+            return mapped[channel][start:stop]
+        if not H5PY_AVAILABLE:
+            raise ImportError("读取v7.3格式.mat文件需要安装h5py")
+        with h5py.File(self.path, 'r') as f:
+            dataset = f[name]
+            array = dataset[channel, start:stop] if dataset.ndim > 1 else dataset[start:stop]
+        return array.astype(bool) if name in self._logical else array
+    
+    def _load(self, name, channel):
+        """从文件读取通道并放入缓存；v5格式文件需要整体读取变量，同时缓存该变量的所有通道"""
+        if self._is_mat73:
+            if not H5PY_AVAILABLE:
+                raise ImportError("读取v7.3格式.mat文件需要安装h5py")
+            with h5py.File(self.path, 'r') as f:
+                # HDF5中每个通道在文件中连续存放（通道数 × 采样点数）
+                dataset = f[name]
+                array = dataset[channel, :] if dataset.ndim > 1 else dataset[:]
+            if name in self._logical:
+                array = array.astype(bool)
+            return self.cache.put((self.path, name, channel), np.ascontiguousarray(array))
+        
+        value = mat_io.read_mat(self.path, [name])[name]
+        value = value.reshape(value.shape[0], -1)
+        requested = None
+        for i in range(value.shape[1]):
+            array = self.cache.put((self.path, name, i), np.ascontiguousarray(value[:, i]))
+            if i == channel:
+                requested = array
+        return requested
+    
+    def _get_channel_store(self):
+        """文件旁与之一致的通道存储，不存在时返回None"""
+        if self._channel_store is False:
+            self._channel_store = open_channel_store(self.path)
+        return self._channel_store
+    
+    def _memmap(self, name):
+        """变量的内存映射（形状为通道数 × 采样点数），无法映射时返回None"""
+        if name not in self._memmaps:
+            try:
+                self._memmaps[name] = mat_io.memmap_variable(self.path, name)
+            except Exception as e:
+                print(f"内存映射变量 {name} 失败: {e}")
+                self._memmaps[name] = None
+        return self._memmaps[name]
+
+def _row_bounds(row_key, n_rows):
+    """把行索引转换为(起始行, 结束行, 在[起始行, 结束行)区间内的索引)，不能按区间读取的索引（如布尔掩码、负步长）返回None"""
+    if isinstance(row_key, slice):
+        start, stop, step = row_key.indices(n_rows)
+        if step < 0:
+            return None
+        stop = max(start, stop)
+        return start, stop, slice(0, stop - start, step)
+    if isinstance(row_key, (int, np.integer)):
+        row = int(row_key) + n_rows if row_key < 0 else int(row_key)
+        if not 0 <= row < n_rows:
+            return None
+        return row, row + 1, 0
+    
+    rows = np.asarray(row_key)
+    if rows.dtype.kind not in 'iu' or rows.size == 0:
+        return None
+    rows = np.where(rows < 0, rows + n_rows, rows)
+    start, stop = int(rows.min()), int(rows.max()) + 1
+    if start < 0 or stop > n_rows:
+        return None
+    return start, stop, rows - start
@@ -0,0 +1,201 @@
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import CancelledError, Future, InvalidStateError
+
+try:
+    import matlab.engine
+    # 后台调用超时和被取消时可能抛出的异常类型
+    CALL_TIMEOUT_ERRORS = (TimeoutError, matlab.engine.TimeoutError)
+    CALL_CANCELLED_ERRORS = (CancelledError, matlab.engine.CancelledError)
+except ImportError:
+    CALL_TIMEOUT_ERRORS = (TimeoutError,)
+    CALL_CANCELLED_ERRORS = (CancelledError,)
+
+# 请求优先级（数值越小越先执行）：交互式绘图、一般调用、批量保存等后台任务
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BATCH = 2
+
+# 统计排队和执行耗时时保留的最近请求数
+METRICS_WINDOW = 200
+
+# 通知执行线程退出的请求优先级，排在所有请求之前
+_STOP_PRIORITY = -1
+
+class EngineCallFuture(Future):
+    """执行线程返回的Future：排队中的请求可以直接取消；开始执行后只有引擎的后台调用可以取消（结果为CancelledError异常），普通调用的cancel()返回False"""
+    
+    def __init__(self):
+        super().__init__()
+        self._engine_future = None
+    
+    def cancel(self):
+        """取消排队中的请求或正在执行的后台调用，返回是否取消成功"""
+        if super().cancel():
+            return True
+        engine_future = self._engine_future
+        return engine_future is not None and not self.done() and bool(engine_future.cancel())
+
+class EngineExecutor:
+    """Matlab引擎的所有者线程：所有引擎调用都经过优先级队列在同一个线程中依次执行，合并键相同的排队请求只执行最新的一个"""
+    
+    def __init__(self, name='matlab-engine'):
+        self.name = name
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        # 取消Future时在持有锁的线程中同步执行回调，因此使用可重入锁
+        self._lock = threading.RLock()
+        self._thread = None
+        
+        # 排队中的请求：Future -> 优先级；合并键 -> 该键最新的排队请求
+        self._queued = {}
+        self._latest = {}
+        self._running = None
+        
+        # 统计信息
+        self._counts = {'submitted': 0, 'completed': 0, 'failed': 0, 'cancelled': 0, 'coalesced': 0}
+        self._wait_times = deque(maxlen=METRICS_WINDOW)
+        self._run_times = deque(maxlen=METRICS_WINDOW)
+    
+    def submit(self, func, *args, priority=PRIORITY_NORMAL, key=None, timeout=None, **kwargs):
+        """提交请求，返回Future；key相同且尚未开始执行的旧请求被取消，只执行最新的请求；func返回引擎的后台调用时等待其完成，超时（timeout秒）或调用cancel()时取消该调用"""
+        future = EngineCallFuture()
+        with self._lock:
+            if key is not None:
+                previous = self._latest.get(key)
+                if previous is not None and previous in self._queued and previous.cancel():
+                    self._counts['coalesced'] += 1
+                self._latest[key] = future
+            
+            self._queued[future] = priority
+            self._counts['submitted'] += 1
+            future.add_done_callback(self._on_done)
+            self._queue.put((priority, next(self._sequence), time.monotonic(), future, func, args, kwargs, key, timeout))
+            self._ensure_thread()
+        return future
+    
+    def call(self, func, *args, priority=PRIORITY_NORMAL, timeout=None, **kwargs):
+        """同步执行请求并返回结果；已经在执行线程中时直接调用，避免等待自己"""
+        if self.in_executor_thread():
+            return self._execute(func, args, kwargs, timeout)
+        return self.submit(func, *args, priority=priority, timeout=timeout, **kwargs).result()
+    
+    def in_executor_thread(self):
+        """当前线程是否是执行线程"""
+        return self._thread is not None and threading.current_thread() is self._thread
+    
+    def cancel_pending(self):
+        """取消所有尚未开始执行的请求"""
+        with self._lock:
+            queued = list(self._queued)
+        for future in queued:
+            future.cancel()
+    
+    def _on_done(self, future):
+        """排队中的请求被取消时立即从队列统计中移除（队列中的条目在出队时跳过）"""
+        if future.cancelled():
+            with self._lock:
+                if self._queued.pop(future, None) is not None:
+                    self._counts['cancelled'] += 1
+    
+    def shutdown(self, wait=True):
+        """取消排队中的请求并结束执行线程，之后提交的请求会启动新的执行线程"""
+        self.cancel_pending()
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._queue.put((_STOP_PRIORITY, next(self._sequence), time.monotonic(), None, None, (), {}, None, None))
+        if wait and thread is not threading.current_thread():
+            thread.join()
+    
+    def stats(self):
+        """返回队列深度和延迟统计：各优先级排队数、是否有请求正在执行、各类请求数（coalesced为被新请求取代的数量，也计入cancelled）、最近请求的平均/最大排队和执行耗时（毫秒）"""
+        with self._lock:
+            depth_by_priority = {}
+            for priority in self._queued.values():
+                depth_by_priority[priority] = depth_by_priority.get(priority, 0) + 1
+            wait_times = list(self._wait_times)
+            run_times = list(self._run_times)
+            stats = dict(self._counts)
+            stats.update({
+                'depth': len(self._queued),
+                'depth_by_priority': depth_by_priority,
+                'running': self._running is not None
+            })
+        
+        stats['wait_ms_avg'] = sum(wait_times) / len(wait_times) * 1000 if wait_times else 0.0
+        stats['wait_ms_max'] = max(wait_times) * 1000 if wait_times else 0.0
+        stats['run_ms_avg'] = sum(run_times) / len(run_times) * 1000 if run_times else 0.0
+        stats['run_ms_max'] = max(run_times) * 1000 if run_times else 0.0
+        return stats
+    
+    def _ensure_thread(self):
+        """按需启动执行线程（调用时已持有锁）"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name=self.name, daemon=True)
+            self._thread.start()
+    
+    def _worker(self):
+        """执行线程：按优先级和提交顺序依次执行请求"""
+        while True:
+            _, _, queued_at, future, func, args, kwargs, key, timeout = self._queue.get()
+            if future is None:
+                return
+            
+            with self._lock:
+                self._queued.pop(future, None)
+                if key is not None and self._latest.get(key) is future:
+                    del self._latest[key]
+                # 标记为执行中，之后普通调用不能再取消；已被取消的请求跳过
+                if not future.set_running_or_notify_cancel():
+                    continue
+                self._running = future
+                self._wait_times.append(time.monotonic() - queued_at)
+            
+            started = time.monotonic()
+            try:
+                result = self._execute(func, args, kwargs, timeout, future)
+                _resolve_future(future, result=result)
+            except Exception as e:
+                _resolve_future(future, exception=e)
+            
+            with self._lock:
+                self._running = None
+                self._run_times.append(time.monotonic() - started)
+                if isinstance(future.exception(), CancelledError):
+                    self._counts['cancelled'] += 1
+                elif future.exception() is not None:
+                    self._counts['failed'] += 1
+                else:
+                    self._counts['completed'] += 1
+    
+    def _execute(self, func, args, kwargs, timeout=None, future=None):
+        """执行请求；返回引擎的后台调用时等待其完成，超时或取消时取消该调用"""
+        outcome = func(*args, **kwargs)
+        if not (hasattr(outcome, 'result') and hasattr(outcome, 'cancel')):
+            return outcome
+        
+        engine_future = outcome
+        if isinstance(future, EngineCallFuture):
+            future._engine_future = engine_future
+        try:
+            return engine_future.result(timeout=timeout)
+        except CALL_TIMEOUT_ERRORS:
+            engine_future.cancel()
+            raise TimeoutError(f"Matlab调用超过{timeout}秒未完成，已取消")
+        except CALL_CANCELLED_ERRORS:
+            raise CancelledError("Matlab调用已取消")
+
+def _resolve_future(future, result=None, exception=None):
+    """设置Future的结果或异常，已被取消的Future保持不变"""
+    try:
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
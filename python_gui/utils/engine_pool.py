@@ -0,0 +1,187 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from utils.engine_executor import EngineExecutor
+
+try:
+    import matlab.engine
+    MATLAB_ENGINE_AVAILABLE = True
+except ImportError:
+    MATLAB_ENGINE_AVAILABLE = False
+
+def start_matlab_engine(functions_path=None):
+    """启动一个新的Matlab引擎并设置函数路径"""
+    if not MATLAB_ENGINE_AVAILABLE:
+        raise RuntimeError("未安装MATLAB Engine for Python")
+    
+    eng = matlab.engine.start_matlab()
+    if functions_path:
+        eng.addpath(eng.genpath(functions_path), nargout=0)
+    return eng
+
+class PooledEngine:
+    """引擎池中的一个引擎：引擎在自己的执行线程中创建，所有调用都经过该线程"""
+    
+    def __init__(self, index):
+        self.index = index
+        self.executor = EngineExecutor(name=f'matlab-pool-{index}')
+        self.eng = None
+        self.last_used = time.monotonic()
+    
+    def start(self, engine_factory):
+        """在执行线程中启动引擎（引擎对象不作为调用结果返回，避免被当作后台调用等待）"""
+        def start():
+            self.eng = engine_factory()
+        self.executor.call(start)
+        self.last_used = time.monotonic()
+    
+    def call(self, func_name, *args, timeout=None, **kwargs):
+        """在执行线程中调用Matlab函数；指定timeout时使用后台调用，超时后取消"""
+        if timeout is None:
+            return self.executor.call(lambda: getattr(self.eng, func_name)(*args, **kwargs))
+        return self.executor.call(lambda: getattr(self.eng, func_name)(*args, background=True, **kwargs),
+                                  timeout=timeout)
+    
+    def is_alive(self):
+        """检查引擎是否仍可响应"""
+        try:
+            self.executor.call(lambda: self.eng.eval('1;', nargout=0))
+            return True
+        except Exception:
+            return False
+    
+    def quit(self):
+        """在执行线程中关闭引擎并结束该线程，忽略已经退出的引擎产生的错误"""
+        try:
+            if self.eng is not None:
+                self.executor.call(self.eng.quit)
+        except Exception:
+            pass
+        finally:
+            self.eng = None
+            self.executor.shutdown(wait=False)
+
+class MatlabEnginePool:
+    """Matlab引擎池：按需启动最多size个引擎，提供借出/归还、调用超时和健康检查；每个引擎都有自己的执行线程，与MatlabInterface的引擎一样只在该线程中调用"""
+    
+    def __init__(self, size=2, engine_factory=None, functions_path=None, health_check_interval=30.0):
+        self.size = size
+        self.functions_path = functions_path
+        self.engine_factory = engine_factory or (lambda: start_matlab_engine(self.functions_path))
+        # 引擎空闲超过该时间（秒）后，借出前先检查是否仍然可用
+        self.health_check_interval = health_check_interval
+        
+        self._idle = []
+        self._created = 0
+        self._counter = 0
+        self._closed = False
+        self._condition = threading.Condition()
+    
+    def checkout(self, timeout=None):
+        """借出一个引擎（PooledEngine）；所有引擎都在使用且达到上限时等待，超时抛出TimeoutError"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("引擎池已关闭")
+                if self._idle:
+                    engine = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    # 预留名额后在锁外启动新引擎
+                    self._created += 1
+                    self._counter += 1
+                    engine = PooledEngine(self._counter)
+                    break
+                
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("等待可用的Matlab引擎超时")
+                self._condition.wait(remaining)
+        
+        if engine.eng is None:
+            return self._start_engine(engine)
+        
+        # 长时间空闲的引擎可能已经退出，借出前检查并在必要时重启
+        if time.monotonic() - engine.last_used > self.health_check_interval and not engine.is_alive():
+            print("检测到Matlab引擎已失效，正在重启")
+            engine.quit()
+            return self._start_engine(PooledEngine(engine.index))
+        return engine
+    
+    def checkin(self, engine, broken=False):
+        """归还引擎；broken为True时丢弃该引擎，之后按需重新启动"""
+        if broken:
+            engine.quit()
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            return
+        
+        engine.last_used = time.monotonic()
+        with self._condition:
+            if not self._closed:
+                self._idle.append(engine)
+                self._condition.notify()
+                return
+        engine.quit()
+    
+    @contextmanager
+    def engine(self, timeout=None):
+        """以上下文管理器的方式借用引擎，调用过程中出错且不再响应的引擎会被丢弃"""
+        engine = self.checkout(timeout)
+        broken = False
+        try:
+            yield engine
+        except Exception:
+            broken = not engine.is_alive()
+            raise
+        finally:
+            self.checkin(engine, broken)
+    
+    def call(self, func_name, *args, timeout=None, **kwargs):
+        """在池中的某个引擎上调用Matlab函数；timeout同时限制等待引擎和函数执行的时间"""
+        start = time.monotonic()
+        with self.engine(timeout) as engine:
+            remaining = None if timeout is None else max(0.0, timeout - (time.monotonic() - start))
+            return engine.call(func_name, *args, timeout=remaining, **kwargs)
+    
+    def map(self, func_name, args_list, timeout=None, **kwargs):
+        """并行执行多次相互独立的调用，按输入顺序返回结果"""
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            futures = [executor.submit(self.call, func_name, *args, timeout=timeout, **kwargs)
+                       for args in args_list]
+            return [future.result() for future in futures]
+    
+    def shutdown(self):
+        """关闭引擎池和所有空闲引擎，使用中的引擎在归还时关闭"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for engine in idle:
+            engine.quit()
+    
+    def stats(self):
+        """返回引擎池状态"""
+        with self._condition:
+            return {
+                'size': self.size,
+                'started': self._created,
+                'idle': len(self._idle),
+                'in_use': self._created - len(self._idle)
+            }
+    
+    def _start_engine(self, engine):
+        """在引擎自己的执行线程中启动引擎，失败时释放预留的名额"""
+        try:
+            engine.start(self.engine_factory)
+        except Exception:
+            engine.executor.shutdown(wait=False)
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+        return engine
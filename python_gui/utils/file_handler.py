@@ -1,67 +1,227 @@
 import pandas as pd
 import numpy as np
 import os
-import matlab
-from utils.matlab_interface import MatlabInterface
+import threading
+from utils.matlab_interface import MatlabInterface, MATLAB_ARRAY_TYPES
+from utils import mat_io
+from utils import overview_store
+from utils import channel_store
+from utils import arrow_io
+from utils.file_probe import probe_file, read_preview, ProbeCache
+
+try:
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import openpyxl
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+# 流式导入CSV时，解析一行数据所需内存相对于其数值大小的估计倍数
+CSV_PARSE_OVERHEAD = 4
+
+# 转换过程中读取和写入阶段在总进度中的占比
+READ_PROGRESS_SHARE = 0.7
+
+class ConversionCancelled(Exception):
+    """文件读取或转换被用户取消"""
+
+def make_progress_reporter(progress_callback=None, cancel_event=None, start=0.0, end=1.0):
+    """创建进度报告函数：将阶段内进度(0~1)映射到[start, end]区间，并在取消时抛出ConversionCancelled"""
+    if progress_callback is None and cancel_event is None:
+        return None
+    
+    def report(fraction):
+        if cancel_event is not None and cancel_event.is_set():
+            raise ConversionCancelled()
+        if progress_callback is not None:
+            progress_callback(start + (end - start) * min(max(fraction, 0.0), 1.0))
+    return report
+
+def get_partial_path(output_file):
+    """转换时使用的临时输出文件路径（与目标文件同目录、同扩展名，按进程和线程区分）"""
+    root, ext = os.path.splitext(output_file)
+    return f"{root}.{os.getpid()}-{threading.get_ident()}.partial{ext}"
+
+def remap_to_columns(data_mapping):
+    """返回映射中用到的列号（升序）和按这些列重新编号后的映射，用于只读取映射的列"""
+    columns = sorted({col for cols in (data_mapping or {}).values() for col in cols})
+    position = {col: i for i, col in enumerate(columns)}
+    return columns, {key: [position[col] for col in cols] for key, cols in (data_mapping or {}).items()}
 
 class FileHandler:
-    def __init__(self, matlab_interface=None):
+    def __init__(self, matlab_interface=None, mat_version='7.3', chunk_rows=None, compression=None,
+                 compression_level=None):
         self.matlab_interface = matlab_interface
+        # 写入.mat文件时使用的格式版本（'7.3'或'5'）
+        self.mat_version = mat_version
+        # v7.3文件的HDF5布局：每个通道按时间方向分块的采样点数和压缩方式（都为None时连续存放）
+        self.chunk_rows = chunk_rows
+        self.compression = compression
+        self.compression_level = compression_level
+        # 文件探测结果缓存（首次使用时创建）
+        self.probe_cache = None
     
     def set_matlab_interface(self, matlab_interface):
         """设置Matlab接口"""
         self.matlab_interface = matlab_interface
     
-    def read_file(self, file_path):
-        """读取不同格式的文件"""
+    def read_file(self, file_path, dtype=None, csv_engine=None,
+                  progress_callback=None, cancel_event=None):
+        """读取不同格式的文件（progress_callback接收0~1的进度，cancel_event置位时取消读取）"""
         file_ext = os.path.splitext(file_path)[1].lower()
+        progress = make_progress_reporter(progress_callback, cancel_event)
         
         try:
             if file_ext in ['.xlsx', '.xls']:
-                return self._read_excel(file_path)
+                data = self._read_excel(file_path, progress)
             elif file_ext == '.csv':
-                return self._read_csv(file_path)
+                data = self._read_csv(file_path, dtype, csv_engine, progress)
             elif file_ext == '.mat':
-                return self._read_mat(file_path)
+                data = self._read_mat(file_path)
+            elif file_ext in arrow_io.ARROW_EXTENSIONS:
+                data = arrow_io.read_arrow(file_path, progress=progress)
             else:
                 raise ValueError(f"不支持的文件格式: {file_ext}")
+            
+            if data is not None and progress:
+                progress(1.0)
+            return data
+        except ConversionCancelled:
+            raise
         except Exception as e:
             print(f"读取文件 {file_path} 失败: {e}")
             return None
     
-    def _read_excel(self, file_path):
+    def _read_excel(self, file_path, progress=None):
         """读取Excel文件"""
         try:
-            # 读取所有工作表
-            excel_data = pd.read_excel(file_path, sheet_name=None)
-            
-            # 合并所有工作表的数据
-            all_data = []
-            for sheet_name, df in excel_data.items():
-                # 转换为NumPy数组
-                data = df.values
-                all_data.append(data)
+            if os.path.splitext(file_path)[1].lower() == '.xlsx' and OPENPYXL_AVAILABLE:
+                # 逐行读取xlsx文件，可以报告进度并响应取消
+                all_data = self._read_xlsx_rows(file_path, progress)
+            else:
+                # 读取所有工作表
+                excel_data = pd.read_excel(file_path, sheet_name=None)
+                
+                # 合并所有工作表的数据
+                all_data = []
+                for sheet_name, df in excel_data.items():
+                    # 转换为NumPy数组
+                    data = df.values
+                    all_data.append(data)
             
             # 如果只有一个工作表，直接返回该工作表的数据
             if len(all_data) == 1:
                 return all_data[0]
             # 否则返回所有工作表的数据列表
             return all_data
+        except ConversionCancelled:
+            raise
         except Exception as e:
             print(f"读取Excel文件失败: {e}")
             return None
     
-    def _read_csv(self, file_path):
+    def _read_xlsx_rows(self, file_path, progress=None):
+        """以只读模式逐行读取xlsx文件的所有工作表，首行作为表头"""
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            # 以各工作表的总行数作为进度基准
+            total_rows = max(1, sum(sheet.max_row or 0 for sheet in workbook.worksheets))
+            rows_done = 0
+            
+            all_data = []
+            for sheet in workbook.worksheets:
+                rows = []
+                for row in sheet.iter_rows(values_only=True):
+                    rows.append(row)
+                    rows_done += 1
+                    if progress and rows_done % 1000 == 0:
+                        progress(rows_done / total_rows)
+                
+                # 去掉末尾的空行
+                while rows and all(value is None for value in rows[-1]):
+                    rows.pop()
+                
+                if rows:
+                    df = pd.DataFrame(rows[1:], columns=rows[0])
+                else:
+                    df = pd.DataFrame()
+                all_data.append(df.values)
+            return all_data
+        finally:
+            workbook.close()
+    
+    def _read_csv(self, file_path, dtype=None, engine=None, progress=None):
         """读取CSV文件"""
         try:
-            df = pd.read_csv(file_path)
-            return df.values
+            if progress is None:
+                df = pd.read_csv(file_path, dtype=dtype, engine=engine)
+                return df.to_numpy(dtype=dtype)
+            
+            # 需要报告进度时分块读取后再拼接
+            chunks = list(self._iter_csv_chunks(file_path, 100000, dtype, engine, progress))
+            if not chunks:
+                return None
+            return np.concatenate(chunks)
+        except ConversionCancelled:
+            raise
         except Exception as e:
             print(f"读取CSV文件失败: {e}")
             return None
     
+    def _iter_csv_chunks(self, file_path, chunk_rows, dtype, engine=None, progress=None):
+        """分块读取CSV文件，每次产生一个(行数 × 列数)的NumPy数组，按已读取的字节数报告进度"""
+        file_size = max(1, os.path.getsize(file_path))
+        
+        with open(file_path, 'rb') as f:
+            if engine == 'pyarrow' and PYARROW_AVAILABLE:
+                # pyarrow按字节块流式解析，块大小按行数估算
+                row_bytes = self._estimate_csv_row_bytes(file_path)
+                read_options = pa_csv.ReadOptions(block_size=max(1 << 16, chunk_rows * row_bytes))
+                for batch in pa_csv.open_csv(f, read_options=read_options):
+                    chunk = np.empty((batch.num_rows, batch.num_columns), dtype=dtype)
+                    for col, column in enumerate(batch.columns):
+                        chunk[:, col] = column.to_numpy(zero_copy_only=False)
+                    if progress:
+                        progress(f.tell() / file_size)
+                    yield chunk
+            else:
+                reader = pd.read_csv(f, chunksize=chunk_rows, dtype=dtype,
+                                     engine=engine if engine != 'pyarrow' else None)
+                with reader:
+                    for df in reader:
+                        if progress:
+                            progress(f.tell() / file_size)
+                        yield df.to_numpy(dtype=dtype)
+    
+    def _estimate_csv_row_bytes(self, file_path, sample_size=1 << 16):
+        """根据文件开头的内容估算CSV文件每行的平均字节数"""
+        with open(file_path, 'rb') as f:
+            sample = f.read(sample_size)
+        return max(1, len(sample) // max(1, sample.count(b'\n')))
+    
     def _read_mat(self, file_path):
-        """读取Matlab文件"""
+        """读取Matlab文件（优先使用纯Python后端，失败时回退到Matlab引擎）"""
+        try:
+            numeric_data = list(mat_io.read_mat(file_path).values())
+        except Exception as e:
+            print(f"纯Python读取Matlab文件失败，尝试使用Matlab引擎: {e}")
+            numeric_data = self._read_mat_with_engine(file_path)
+            if numeric_data is None:
+                return None
+        
+        # 如果只有一个数值数组，直接返回该数组
+        if len(numeric_data) == 1:
+            return numeric_data[0]
+        # 否则返回所有数值数组的列表
+        return numeric_data
+    
+    def _read_mat_with_engine(self, file_path):
+        """通过Matlab引擎读取Matlab文件中的数值数组"""
         if not self.matlab_interface:
             print("Matlab接口未设置")
             return None
@@ -74,22 +234,28 @@ class FileHandler:
             numeric_data = []
             for key, value in mat_data.items():
                 # 检查是否为数值数组
-                if isinstance(value, (matlab.double, matlab.single)):
+                if isinstance(value, tuple(MATLAB_ARRAY_TYPES.values())):
                     # 转换为NumPy数组
                     np_array = self.matlab_interface.matlab_to_numpy(value)
                     numeric_data.append(np_array)
-            
-            # 如果只有一个数值数组，直接返回该数组
-            if len(numeric_data) == 1:
-                return numeric_data[0]
-            # 否则返回所有数值数组的列表
             return numeric_data
         except Exception as e:
             print(f"读取Matlab文件失败: {e}")
             return None
     
-    def write_mat_file(self, file_path, data_dict):
-        """将数据写入Matlab文件"""
+    def write_mat_file(self, file_path, data_dict, progress_callback=None, cancel_event=None):
+        """将数据写入Matlab文件（优先使用纯Python后端，失败时回退到Matlab引擎）"""
+        try:
+            progress = make_progress_reporter(progress_callback, cancel_event)
+            mat_io.write_mat(file_path, data_dict, version=self.mat_version, progress=progress,
+                             chunk_rows=self.chunk_rows, compression=self.compression,
+                             compression_level=self.compression_level)
+            return True
+        except ConversionCancelled:
+            raise
+        except Exception as e:
+            print(f"纯Python写入Matlab文件失败，尝试使用Matlab引擎: {e}")
+        
         if not self.matlab_interface:
             print("Matlab接口未设置")
             return False
@@ -101,12 +267,99 @@ class FileHandler:
             print(f"写入Matlab文件失败: {e}")
             return False
     
-    def convert_to_mat(self, input_file, output_file, data_mapping=None):
-        """将其他格式的文件转换为Matlab格式"""
-        # 读取输入文件
-        data = self.read_file(input_file)
-        if data is None:
+    def convert_to_mat(self, input_file, output_file, data_mapping=None,
+                       streaming=False, dtype=None, memory_budget_mb=256, csv_engine=None,
+                       progress_callback=None, cancel_event=None, data=None, build_overview=False,
+                       build_channel_store=False, sample_rate=None):
+        """将其他格式的文件转换为Matlab格式（data为已解析的数据时不再重复读取源文件，build_overview为True时同时生成概览文件，build_channel_store为True时同时生成按通道内存映射的通道存储）；output_file为.parquet/.feather文件时转换为相应格式"""
+        # CSV和Parquet/Feather文件转换为.mat文件时可以分块流式转换，内存占用不随文件大小增长；
+        # 分块写入只支持v7.3格式，其他版本完整读取后写入
+        streaming = (streaming and data is None and not arrow_io.is_arrow_file(output_file)
+                     and self.mat_version == '7.3')
+        # 先写入临时文件，成功后再替换目标文件，失败或取消时不影响已有的输出文件
+        partial_file = get_partial_path(output_file)
+        try:
+            if streaming and os.path.splitext(input_file)[1].lower() == '.csv':
+                success = self.convert_csv_streaming(
+                    input_file, partial_file, data_mapping,
+                    dtype=dtype, memory_budget_mb=memory_budget_mb, engine=csv_engine,
+                    progress_callback=progress_callback, cancel_event=cancel_event
+                )
+            elif streaming and arrow_io.is_arrow_file(input_file):
+                success = self.convert_arrow_streaming(
+                    input_file, partial_file, data_mapping, dtype=dtype,
+                    progress_callback=progress_callback, cancel_event=cancel_event
+                )
+            else:
+                success = self._convert_in_memory(
+                    input_file, partial_file, data_mapping, dtype, csv_engine,
+                    progress_callback, cancel_event, data
+                )
+        except ConversionCancelled:
+            print(f"已取消转换: {input_file}")
+            success = False
+        
+        if not success:
+            # 取消或失败时只删除本次写入的临时文件
+            self._remove_partial_output(partial_file)
+            return False
+        if not self._replace_output(partial_file, output_file):
+            return False
+        
+        if not arrow_io.is_arrow_file(output_file):
+            # 概览和通道存储生成失败不影响转换结果
+            if build_overview:
+                self.build_overview(output_file)
+            if build_channel_store:
+                self.build_channel_store(output_file, sample_rate)
+        return True
+    
+    def build_overview(self, mat_file, progress_callback=None, cancel_event=None):
+        """为转换后的.mat文件生成多级最小/最大/平均值概览文件；取消时删除未完成的概览文件并返回False"""
+        try:
+            overview_store.build_overview(mat_file, progress=make_progress_reporter(progress_callback, cancel_event))
+            return True
+        except ConversionCancelled:
+            print(f"已取消生成概览文件: {mat_file}")
+            return False
+        except Exception as e:
+            print(f"生成概览文件失败: {e}")
+            return False
+    
+    def build_channel_store(self, mat_file, sample_rate=None, progress_callback=None, cancel_event=None):
+        """为转换后的.mat文件生成通道存储（*.channels目录，每个通道一个连续的二进制文件），可按通道和时间段内存映射读取；取消时删除未完成的通道存储并返回False"""
+        try:
+            channel_store.build_channel_store(mat_file, sample_rate=sample_rate,
+                                              progress=make_progress_reporter(progress_callback, cancel_event))
+            return True
+        except ConversionCancelled:
+            print(f"已取消生成通道存储: {mat_file}")
+            return False
+        except Exception as e:
+            print(f"生成通道存储失败: {e}")
             return False
+    
+    def _convert_in_memory(self, input_file, output_file, data_mapping, dtype, csv_engine,
+                           progress_callback=None, cancel_event=None, data=None):
+        """完整读取文件（或使用已解析的数据）后应用映射并写入Matlab文件"""
+        write_start = 0.0
+        if data is None:
+            # 读取输入文件（Parquet/Feather文件只读取映射的列）
+            read_progress = make_progress_reporter(progress_callback, None, 0.0, READ_PROGRESS_SHARE)
+            if arrow_io.is_arrow_file(input_file):
+                data, data_mapping = self._read_arrow_mapped(input_file, data_mapping, read_progress, cancel_event)
+                if data is not None and dtype is not None:
+                    data = data.astype(dtype, copy=False)
+            else:
+                data = self.read_file(
+                    input_file, dtype=dtype, csv_engine=csv_engine,
+                    progress_callback=read_progress, cancel_event=cancel_event
+                )
+            if data is None:
+                return False
+            write_start = READ_PROGRESS_SHARE
+        elif dtype is not None:
+            data = np.asarray(data, dtype=dtype)
         
         # 如果数据是列表（多个工作表或多个变量），只取第一个
         if isinstance(data, list):
@@ -119,8 +372,128 @@ class FileHandler:
             # 默认映射：所有列作为未分类数据
             mapped_data = {'raw_data': data}
         
-        # 写入Matlab文件
-        return self.write_mat_file(output_file, mapped_data)
+        # 写入Matlab文件（或Parquet/Feather文件）
+        write = self.write_arrow_file if arrow_io.is_arrow_file(output_file) else self.write_mat_file
+        return write(
+            output_file, mapped_data,
+            progress_callback=make_progress_reporter(progress_callback, None, write_start, 1.0),
+            cancel_event=cancel_event
+        )
+    
+    def convert_csv_streaming(self, input_file, output_file, data_mapping=None,
+                              dtype=None, memory_budget_mb=256, engine=None,
+                              progress_callback=None, cancel_event=None):
+        """分块读取CSV文件，逐块应用数据映射并直接写入v7.3格式的.mat文件"""
+        dtype = np.dtype(dtype or np.float64)
+        progress = make_progress_reporter(progress_callback, cancel_event)
+        
+        try:
+            # 根据内存预算和列数确定每块的行数
+            n_cols = len(pd.read_csv(input_file, nrows=1).columns)
+            row_bytes = n_cols * max(dtype.itemsize, 8) * CSV_PARSE_OVERHEAD
+            chunk_rows = max(1, int(memory_budget_mb * 1024 * 1024) // row_bytes)
+            
+            with mat_io.Mat73Writer(output_file, chunk_rows=self.chunk_rows, compression=self.compression,
+                                    compression_level=self.compression_level) as writer:
+                for chunk in self._iter_csv_chunks(input_file, chunk_rows, dtype, engine, progress):
+                    self._append_mapped_chunk(writer, chunk, data_mapping)
+            if progress:
+                progress(1.0)
+            return True
+        except ConversionCancelled:
+            raise
+        except Exception as e:
+            print(f"流式转换CSV文件失败: {e}")
+            return False
+    
+    def convert_arrow_streaming(self, input_file, output_file, data_mapping=None, dtype=None,
+                                progress_callback=None, cancel_event=None):
+        """逐个行组/记录批次读取Parquet或Feather文件中映射的列（未指定映射时使用文件中保存的映射），逐块应用数据映射并直接写入v7.3格式的.mat文件"""
+        progress = make_progress_reporter(progress_callback, cancel_event)
+        
+        try:
+            if data_mapping is None:
+                data_mapping = arrow_io.read_mapping(input_file)
+            columns, data_mapping = remap_to_columns(data_mapping)
+            total_rows = arrow_io.list_columns(input_file)[2]
+            done_rows = 0
+            
+            with mat_io.Mat73Writer(output_file, chunk_rows=self.chunk_rows, compression=self.compression,
+                                    compression_level=self.compression_level) as writer:
+                for chunk in arrow_io.iter_blocks(input_file, columns or None):
+                    if dtype is not None:
+                        chunk = chunk.astype(dtype, copy=False)
+                    self._append_mapped_chunk(writer, chunk, data_mapping)
+                    done_rows += len(chunk)
+                    if progress:
+                        progress(done_rows / max(1, total_rows))
+            if progress:
+                progress(1.0)
+            return True
+        except ConversionCancelled:
+            raise
+        except Exception as e:
+            print(f"流式转换文件失败: {e}")
+            return False
+    
+    def _append_mapped_chunk(self, writer, chunk, data_mapping):
+        """对一块数据应用映射后追加到Mat73Writer"""
+        if data_mapping:
+            mapped_chunk = self._apply_data_mapping(chunk, data_mapping)
+        else:
+            mapped_chunk = {'raw_data': chunk}
+        
+        for key, value in mapped_chunk.items():
+            writer.append(key, value)
+    
+    def _read_arrow_mapped(self, file_path, data_mapping=None, progress_callback=None, cancel_event=None):
+        """只读取Parquet/Feather文件中映射的列（未指定映射时使用文件中保存的映射，都没有时读取所有列），返回(数据, 按读取的列重新编号的映射)"""
+        try:
+            if data_mapping is None:
+                data_mapping = arrow_io.read_mapping(file_path)
+            columns, projected_mapping = remap_to_columns(data_mapping)
+            data = arrow_io.read_arrow(file_path, columns=columns or None,
+                                       progress=make_progress_reporter(progress_callback, cancel_event))
+        except ConversionCancelled:
+            raise
+        except Exception as e:
+            print(f"读取文件 {file_path} 失败: {e}")
+            return None, data_mapping
+        return data, (projected_mapping if columns else data_mapping)
+    
+    def write_arrow_file(self, file_path, data_dict, progress_callback=None, cancel_event=None):
+        """将数据写入Parquet或Feather文件（按扩展名），数据列映射保存在表结构元数据中"""
+        progress = make_progress_reporter(progress_callback, cancel_event)
+        try:
+            if progress:
+                progress(0.0)
+            arrow_io.write_arrow(file_path, data_dict)
+            if progress:
+                progress(1.0)
+            return True
+        except ConversionCancelled:
+            raise
+        except Exception as e:
+            print(f"写入{os.path.splitext(file_path)[1]}文件失败: {e}")
+            return False
+    
+    def _replace_output(self, partial_file, output_file):
+        """用转换完成的临时文件替换目标文件"""
+        try:
+            os.replace(partial_file, output_file)
+            return True
+        except OSError as e:
+            print(f"保存输出文件失败: {e}")
+            self._remove_partial_output(partial_file)
+            return False
+    
+    def _remove_partial_output(self, partial_file):
+        """删除转换失败或被取消时留下的临时输出文件"""
+        if os.path.exists(partial_file):
+            try:
+                os.remove(partial_file)
+            except OSError as e:
+                print(f"删除不完整的输出文件失败: {e}")
     
     def _apply_data_mapping(self, data, data_mapping):
         """应用数据映射"""
@@ -155,26 +528,58 @@ class FileHandler:
         
         return mapped_data
     
+    def probe_file(self, file_path):
+        """获取文件的元数据（行列数、列名、数据类型、工作表名），不读取全部数据"""
+        if self.probe_cache is None:
+            self.probe_cache = ProbeCache()
+        
+        info = self.probe_cache.get(file_path)
+        if info is None:
+            info = probe_file(file_path)
+            self.probe_cache.put(file_path, info)
+        return info
+    
+    def read_preview(self, file_path, head_rows=None, sample_rows=None):
+        """快速预览文件：只读取开头若干行和均匀抽样的行，并计算各列统计，不解析整个文件"""
+        kwargs = {}
+        if head_rows is not None:
+            kwargs['head_rows'] = head_rows
+        if sample_rows is not None:
+            kwargs['sample_rows'] = sample_rows
+        
+        try:
+            return read_preview(file_path, **kwargs)
+        except Exception as e:
+            print(f"预览文件 {file_path} 失败: {e}")
+            return None
+    
     def get_file_info(self, file_path):
         """获取文件信息"""
         file_ext = os.path.splitext(file_path)[1].lower()
         file_size = os.path.getsize(file_path) / (1024 * 1024)  # MB
         
-        # 读取文件获取数据维度
-        data = self.read_file(file_path)
-        if data is None:
+        # 只探测文件头部获取数据维度
+        try:
+            info = self.probe_file(file_path)
+        except Exception as e:
+            print(f"探测文件 {file_path} 失败: {e}")
             return None
         
-        if isinstance(data, list):
-            # 多个工作表或变量
-            data_shape = [d.shape for d in data]
-        else:
+        datasets = info['datasets']
+        if len(datasets) == 1:
             # 单个数据集
-            data_shape = data.shape
+            data_shape = (datasets[0]['rows'], datasets[0]['cols'])
+        else:
+            # 多个工作表或变量
+            data_shape = [(d['rows'], d['cols']) for d in datasets]
         
         return {
             'file_path': file_path,
             'file_ext': file_ext,
             'file_size': file_size,
-            'data_shape': data_shape
+            'data_shape': data_shape,
+            'rows_estimated': [d.get('rows_estimated', False) for d in datasets],
+            'column_names': [d['column_names'] for d in datasets],
+            'dtypes': [d['dtypes'] for d in datasets],
+            'sheet_names': [d['name'] for d in datasets]
         }
@@ -0,0 +1,417 @@
+import atexit
+import csv
+import io
+import json
+import os
+import threading
+import time
+import weakref
+import numpy as np
+import pandas as pd
+from utils import mat_io
+from utils import arrow_io
+from utils.app_paths import get_app_data_dir
+
+try:
+    import openpyxl
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+try:
+    import xlrd
+    XLRD_AVAILABLE = True
+except ImportError:
+    XLRD_AVAILABLE = False
+
+# 推断列数据类型时读取的行数
+DTYPE_SAMPLE_ROWS = 100
+
+# 快速预览读取的开头行数和在其余部分均匀抽样的行数
+PREVIEW_HEAD_ROWS = 200
+PREVIEW_SAMPLE_ROWS = 200
+
+# Parquet/Feather文件预览时最多读取的行组/记录批次数（抽样行只从这些行组中选取）
+PREVIEW_SAMPLE_CHUNKS = 8
+
+def probe_file(file_path):
+    """只读取文件头部信息，返回各数据集（工作表/变量）的行列数、列名和数据类型"""
+    file_ext = os.path.splitext(file_path)[1].lower()
+    
+    if file_ext == '.csv':
+        datasets = [_probe_csv(file_path)]
+    elif file_ext == '.xlsx':
+        datasets = _probe_xlsx(file_path)
+    elif file_ext == '.xls':
+        datasets = _probe_xls(file_path)
+    elif file_ext == '.mat':
+        datasets = _probe_mat(file_path)
+    elif file_ext in arrow_io.ARROW_EXTENSIONS:
+        datasets = [_probe_arrow(file_path)]
+    else:
+        raise ValueError(f"不支持的文件格式: {file_ext}")
+    
+    return {
+        'file_ext': file_ext,
+        'datasets': datasets
+    }
+
+def count_lines(file_path, block_size=1 << 20):
+    """按块统计文件行数，不解析内容"""
+    count = 0
+    last_byte = b'\n'
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            count += block.count(b'\n')
+            last_byte = block[-1:]
+    # 最后一行没有换行符时也计入
+    if last_byte != b'\n':
+        count += 1
+    return count
+
+def _probe_csv(file_path):
+    """探测CSV文件：统计行数并嗅探表头"""
+    with open(file_path, 'r', newline='', errors='replace') as f:
+        sample = f.read(1 << 16)
+    
+    try:
+        has_header = csv.Sniffer().has_header(sample)
+    except csv.Error:
+        has_header = True
+    
+    # 与read_file保持一致：第一行总是作为表头
+    head = pd.read_csv(file_path, nrows=DTYPE_SAMPLE_ROWS)
+    column_names = [str(name) for name in head.columns] if has_header else _default_column_names(head.shape[1])
+    
+    return {
+        'name': os.path.basename(file_path),
+        'rows': max(0, count_lines(file_path) - 1),
+        'cols': head.shape[1],
+        'column_names': column_names,
+        'dtypes': [str(dtype) for dtype in head.dtypes],
+        'has_header': has_header
+    }
+
+def _probe_xlsx(file_path):
+    """探测xlsx文件：以只读模式读取各工作表的维度和首行"""
+    if not OPENPYXL_AVAILABLE:
+        raise ImportError("探测xlsx文件需要安装openpyxl")
+    
+    datasets = []
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            rows = list(sheet.iter_rows(min_row=1, max_row=DTYPE_SAMPLE_ROWS + 1, values_only=True))
+            header = rows[0] if rows else ()
+            
+            # 维度信息来自工作表的dimension记录，无需遍历所有单元格；
+            # 没有该记录时只知道读取的行数，读满时总行数是下限
+            max_row = sheet.max_row or len(rows)
+            max_col = sheet.max_column or len(header)
+            rows_estimated = sheet.max_row is None and len(rows) > DTYPE_SAMPLE_ROWS
+            
+            datasets.append({
+                'name': sheet.title,
+                'rows': max(0, max_row - 1),
+                'rows_estimated': rows_estimated,
+                'cols': max_col,
+                'column_names': [str(v) if v is not None else f"列 {i+1}" for i, v in enumerate(header)],
+                'dtypes': _infer_dtypes(rows[1:], max_col)
+            })
+    finally:
+        workbook.close()
+    return datasets
+
+def _probe_xls(file_path):
+    """探测xls文件：按需加载工作表，只读取首行"""
+    if not XLRD_AVAILABLE:
+        raise ImportError("探测xls文件需要安装xlrd")
+    
+    datasets = []
+    workbook = xlrd.open_workbook(file_path, on_demand=True)
+    try:
+        for sheet_name in workbook.sheet_names():
+            sheet = workbook.sheet_by_name(sheet_name)
+            header = sheet.row_values(0) if sheet.nrows else []
+            sample = [sheet.row_values(i) for i in range(1, min(sheet.nrows, DTYPE_SAMPLE_ROWS + 1))]
+            
+            datasets.append({
+                'name': sheet_name,
+                'rows': max(0, sheet.nrows - 1),
+                'cols': sheet.ncols,
+                'column_names': [str(v) for v in header],
+                'dtypes': _infer_dtypes(sample, sheet.ncols)
+            })
+            workbook.unload_sheet(sheet_name)
+    finally:
+        workbook.release_resources()
+    return datasets
+
+def _probe_mat(file_path):
+    """探测.mat文件：只读取变量名、维度和类型"""
+    datasets = []
+    for name, shape, matlab_class in mat_io.list_variables(file_path):
+        rows, cols = (shape + (1, 1))[:2]
+        datasets.append({
+            'name': name,
+            'rows': rows,
+            'cols': cols,
+            'column_names': _default_column_names(cols),
+            'dtypes': [matlab_class] * cols
+        })
+    return datasets
+
+def _probe_arrow(file_path):
+    """探测Parquet/Feather文件：只读取表结构和行数（文件元数据）"""
+    names, dtypes, rows = arrow_io.list_columns(file_path)
+    return {
+        'name': os.path.basename(file_path),
+        'rows': rows,
+        'cols': len(names),
+        'column_names': names,
+        'dtypes': dtypes
+    }
+
+def read_preview(file_path, head_rows=PREVIEW_HEAD_ROWS, sample_rows=PREVIEW_SAMPLE_ROWS):
+    """快速预览第一个数据集：读取开头head_rows行并在其余部分均匀抽样sample_rows行，返回预览数据、各行的行号（从1开始，CSV抽样行为估计值）、开头的行数、列名、总行数和各列统计"""
+    file_ext = os.path.splitext(file_path)[1].lower()
+    
+    if file_ext == '.csv':
+        preview = _preview_csv(file_path, head_rows, sample_rows)
+    elif file_ext in ('.xlsx', '.xls'):
+        preview = _preview_excel(file_path, head_rows)
+    elif file_ext == '.mat':
+        preview = _preview_mat(file_path, head_rows, sample_rows)
+    elif file_ext in arrow_io.ARROW_EXTENSIONS:
+        preview = _preview_arrow(file_path, head_rows, sample_rows)
+    else:
+        raise ValueError(f"不支持的文件格式: {file_ext}")
+    
+    preview['file_ext'] = file_ext
+    preview['stats'] = column_stats(preview['data'])
+    return preview
+
+def _preview_csv(file_path, head_rows, sample_rows):
+    """CSV文件：读取开头若干行，再跳转到均匀分布的字节位置各读取一整行"""
+    head = pd.read_csv(file_path, nrows=head_rows)
+    file_size = os.path.getsize(file_path)
+    
+    with open(file_path, 'rb') as f:
+        header_line = f.readline()
+        for _ in range(len(head)):
+            f.readline()
+        head_end = f.tell()
+        
+        sample_lines = []
+        for i in range(sample_rows if head_end < file_size else 0):
+            offset = head_end + (file_size - head_end) * i // sample_rows
+            f.seek(offset)
+            # 从行中间开始时跳到下一行的开头
+            if offset > head_end:
+                f.readline()
+            start = f.tell()
+            line = f.readline()
+            if not line.strip() or (sample_lines and start <= sample_lines[-1][0]):
+                continue
+            sample_lines.append((start, line if line.endswith(b'\n') else line + b'\n'))
+    
+    # 根据抽样行（没有抽样行时根据开头各行）的平均字节数估计抽样行的行号和总行数
+    if sample_lines:
+        row_bytes = sum(len(line) for _, line in sample_lines) / len(sample_lines)
+    else:
+        row_bytes = max(1.0, (head_end - len(header_line)) / max(1, len(head)))
+    row_numbers = list(range(1, len(head) + 1))
+    row_numbers += [len(head) + 1 + int((start - head_end) / row_bytes) for start, _ in sample_lines]
+    
+    data = head.to_numpy()
+    if sample_lines:
+        sample = pd.read_csv(io.BytesIO(header_line + b''.join(line for _, line in sample_lines)))
+        data = np.concatenate([data, sample.to_numpy()])
+    
+    rows_estimated = head_end < file_size
+    return {
+        'data': data,
+        'row_numbers': row_numbers,
+        'head_rows': len(head),
+        'column_names': [str(name) for name in head.columns],
+        'rows': len(head) + int(round((file_size - head_end) / row_bytes)) if rows_estimated else len(head),
+        'rows_estimated': rows_estimated
+    }
+
+def _preview_excel(file_path, head_rows):
+    """Excel文件：只读取第一个工作表的开头若干行（xlsx只能顺序读取，抽样需要遍历整个工作表，因此不抽样）"""
+    head = pd.read_excel(file_path, sheet_name=0, nrows=head_rows)
+    rows_estimated = False
+    if len(head) < head_rows:
+        rows = len(head)
+    else:
+        dataset = probe_file(file_path)['datasets'][0]
+        rows = max(dataset['rows'], len(head))
+        rows_estimated = dataset.get('rows_estimated', False)
+    return {
+        'data': head.to_numpy(),
+        'row_numbers': list(range(1, len(head) + 1)),
+        'head_rows': len(head),
+        'column_names': [str(name) for name in head.columns],
+        'rows': rows,
+        'rows_estimated': rows_estimated
+    }
+
+def _preview_mat(file_path, head_rows, sample_rows):
+    """.mat文件：读取第一个数值变量的开头若干行和均匀抽样的行（v7.3格式只读取这些行）"""
+    variables = mat_io.list_variables(file_path)
+    if not variables:
+        raise ValueError("文件中没有数值变量")
+    name, shape, _ = variables[0]
+    rows = shape[0] if len(shape) > 0 else 1
+    
+    # 开头若干行，加上其余部分均匀分布的抽样行
+    indices = list(range(min(head_rows, rows)))
+    if rows > head_rows and sample_rows:
+        indices += sorted(set(np.linspace(head_rows, rows - 1, sample_rows).astype(int).tolist()))
+    
+    data = mat_io.read_variable_rows(file_path, name, indices)
+    
+    return {
+        'data': data,
+        'row_numbers': [i + 1 for i in indices],
+        'head_rows': min(head_rows, rows),
+        'column_names': _default_column_names(data.shape[1]),
+        'rows': rows,
+        'rows_estimated': False
+    }
+
+def _preview_arrow(file_path, head_rows, sample_rows):
+    """Parquet/Feather文件：读取开头若干行，抽样行只从均匀分布的少数几个行组/记录批次中选取；同时返回文件中保存的数据列映射"""
+    names, _, rows = arrow_io.list_columns(file_path)
+    chunks = arrow_io.row_chunks(file_path)
+    indices = list(range(min(head_rows, rows)))
+    
+    if rows > head_rows and sample_rows:
+        later = [i for i, (start, size) in enumerate(chunks) if start + size > head_rows]
+        picks = np.linspace(0, len(later) - 1, min(PREVIEW_SAMPLE_CHUNKS, len(later))).astype(int)
+        chosen = [later[i] for i in np.unique(picks)]
+        per_chunk = max(1, sample_rows // len(chosen))
+        for i in chosen:
+            start, size = chunks[i]
+            first = max(start, head_rows)
+            indices += sorted(set(np.linspace(first, start + size - 1, per_chunk).astype(int).tolist()))
+    
+    return {
+        'data': arrow_io.read_arrow_rows(file_path, indices),
+        'row_numbers': [i + 1 for i in indices],
+        'head_rows': min(head_rows, rows),
+        'column_names': names,
+        'rows': rows,
+        'rows_estimated': False,
+        'data_mapping': arrow_io.read_mapping(file_path)
+    }
+
+def column_stats(data):
+    """计算各列的最小值、最大值、均值、标准差和缺失值个数，非数值列的数值统计为None"""
+    stats = []
+    for col in range(data.shape[1] if data.ndim > 1 else 0):
+        values = pd.to_numeric(pd.Series(data[:, col]), errors='coerce').to_numpy(dtype=np.float64)
+        valid = values[~np.isnan(values)]
+        if len(valid):
+            stats.append({
+                'min': float(valid.min()),
+                'max': float(valid.max()),
+                'mean': float(valid.mean()),
+                'std': float(valid.std()),
+                'missing': int(len(values) - len(valid))
+            })
+        else:
+            stats.append({'min': None, 'max': None, 'mean': None, 'std': None, 'missing': int(len(values))})
+    return stats
+
+def _default_column_names(cols):
+    """生成默认列名"""
+    return [f"列 {i+1}" for i in range(cols)]
+
+def _infer_dtypes(rows, cols):
+    """根据若干行样本推断各列的数据类型"""
+    if not rows:
+        return ['unknown'] * cols
+    frame = pd.DataFrame([list(row) + [None] * (cols - len(row)) for row in rows])
+    return [str(frame[col].infer_objects().dtype) for col in frame.columns][:cols]
+
+# 所有探测缓存的弱引用（不延长缓存的生命周期），程序退出时统一写回尚未写回的结果
+_open_caches = weakref.WeakSet()
+
+def _flush_probe_caches():
+    """程序退出时写回所有探测缓存中尚未写回的结果"""
+    for cache in list(_open_caches):
+        cache.flush()
+
+atexit.register(_flush_probe_caches)
+
+class ProbeCache:
+    """文件探测结果的磁盘缓存，以路径+修改时间+大小作为键；新结果合并写回磁盘（距上次写入不足SAVE_INTERVAL秒时推迟到之后的写入、flush()或程序退出时）"""
+    
+    # 缓存中最多保留的条目数
+    MAX_ENTRIES = 2000
+    
+    # 两次写回缓存文件的最短间隔（秒）
+    SAVE_INTERVAL = 5.0
+    
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path or os.path.join(get_app_data_dir(), 'probe_cache.json')
+        self._entries = None
+        self._dirty = False
+        self._last_save = None
+        self._lock = threading.Lock()
+        _open_caches.add(self)
+    
+    def get(self, file_path):
+        """获取缓存的探测结果，文件变化后返回None"""
+        with self._lock:
+            self._load()
+            return self._entries.get(self._make_key(file_path))
+    
+    def put(self, file_path, info):
+        """保存探测结果，距上次写回磁盘超过SAVE_INTERVAL秒时立即写回"""
+        with self._lock:
+            self._load()
+            self._entries[self._make_key(file_path)] = info
+            
+            # 超出容量时丢弃最早加入的条目
+            while len(self._entries) > self.MAX_ENTRIES:
+                self._entries.pop(next(iter(self._entries)))
+            
+            self._dirty = True
+            if self._last_save is None or time.monotonic() - self._last_save >= self.SAVE_INTERVAL:
+                self._save()
+    
+    def flush(self):
+        """把尚未写回的探测结果写回磁盘"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+    
+    def _make_key(self, file_path):
+        """由绝对路径、修改时间和文件大小组成缓存键"""
+        stat = os.stat(file_path)
+        return f"{os.path.abspath(file_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+    
+    def _load(self):
+        """从磁盘加载缓存"""
+        if self._entries is not None:
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+    
+    def _save(self):
+        """原子地写回缓存文件"""
+        tmp_path = self.cache_path + '.tmp'
+        self._last_save = time.monotonic()
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+            self._dirty = False
+        except OSError as e:
+            print(f"保存文件探测缓存失败: {e}")
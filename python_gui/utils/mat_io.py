@@ -0,0 +1,456 @@
+import sys
+import time
+import numpy as np
+
+try:
+    import scipy.io
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+try:
+    import h5py
+    H5PY_AVAILABLE = True
+except ImportError:
+    H5PY_AVAILABLE = False
+
+# v7.3文件在HDF5前预留的用户块大小（存放Matlab文件头）
+MAT73_USERBLOCK_SIZE = 512
+
+# 分块存储时每个通道按时间方向分块，每块包含的默认采样点数
+DEFAULT_CHUNK_ROWS = 16384
+
+# 支持的压缩过滤器（Matlab可以读取gzip压缩的v7.3文件）及默认压缩级别
+MAT73_COMPRESSIONS = ('gzip',)
+DEFAULT_COMPRESSION_LEVEL = 4
+
+# NumPy数据类型与Matlab类名的对应关系
+MATLAB_CLASS_NAMES = {
+    np.dtype(np.float64): 'double',
+    np.dtype(np.float32): 'single',
+    np.dtype(np.int8): 'int8',
+    np.dtype(np.int16): 'int16',
+    np.dtype(np.int32): 'int32',
+    np.dtype(np.int64): 'int64',
+    np.dtype(np.uint8): 'uint8',
+    np.dtype(np.uint16): 'uint16',
+    np.dtype(np.uint32): 'uint32',
+    np.dtype(np.uint64): 'uint64',
+}
+
+# 可以作为数值数组读取的Matlab类
+NUMERIC_MATLAB_CLASSES = set(MATLAB_CLASS_NAMES.values()) | {'logical'}
+
+def is_mat73_file(file_path):
+    """判断是否为v7.3（HDF5）格式的.mat文件"""
+    with open(file_path, 'rb') as f:
+        header = f.read(128)
+    return header.startswith(b'MATLAB 7.3')
+
+def read_mat(file_path, variable_names=None):
+    """读取.mat文件中的数值变量，返回{变量名: NumPy数组}，不依赖Matlab引擎"""
+    if is_mat73_file(file_path):
+        return _read_mat73(file_path, variable_names)
+    return _read_mat5(file_path, variable_names)
+
+def list_variables(file_path):
+    """列出.mat文件中的数值变量，返回[(变量名, Matlab维度, Matlab类名)]，不读取数据"""
+    if is_mat73_file(file_path):
+        if not H5PY_AVAILABLE:
+            raise ImportError("读取v7.3格式.mat文件需要安装h5py")
+        
+        variables = []
+        with h5py.File(file_path, 'r') as f:
+            for key, obj in f.items():
+                if not isinstance(obj, h5py.Dataset):
+                    continue
+                matlab_class = _decode_attr(obj.attrs.get('MATLAB_class'))
+                if matlab_class in NUMERIC_MATLAB_CLASSES and not obj.attrs.get('MATLAB_empty'):
+                    variables.append((key, tuple(reversed(obj.shape)), matlab_class))
+        return variables
+    
+    if not SCIPY_AVAILABLE:
+        raise ImportError("读取v5格式.mat文件需要安装scipy")
+    return [(name, tuple(shape), matlab_class)
+            for name, shape, matlab_class in scipy.io.whosmat(file_path)
+            if matlab_class in NUMERIC_MATLAB_CLASSES]
+
+def read_variable_rows(file_path, name, rows):
+    """只读取变量中指定的行（行号按升序排列），v7.3格式直接从HDF5中读取这些行，返回(行数 × 列数)的NumPy数组"""
+    if not is_mat73_file(file_path):
+        value = _read_mat5(file_path, [name])[name]
+        return value.reshape(value.shape[0], -1)[rows]
+    
+    if not H5PY_AVAILABLE:
+        raise ImportError("读取v7.3格式.mat文件需要安装h5py")
+    with h5py.File(file_path, 'r') as f:
+        # HDF5中的维度顺序与Matlab相反（列数 × 行数）
+        dataset = f[name]
+        value = dataset[..., rows].T if dataset.ndim > 1 else dataset[rows]
+        if _decode_attr(dataset.attrs.get('MATLAB_class')) == 'logical':
+            value = value.astype(bool)
+    return value.reshape(len(rows), -1)
+
+def memmap_variable(file_path, name):
+    """将v7.3文件中连续存放（未分块、未压缩）的数值变量映射为只读的np.memmap（形状为HDF5中的通道数 × 采样点数），无法映射时返回None"""
+    if not H5PY_AVAILABLE or not is_mat73_file(file_path):
+        return None
+    
+    with h5py.File(file_path, 'r') as f:
+        dataset = f.get(name)
+        if not isinstance(dataset, h5py.Dataset) or dataset.chunks is not None or dataset.compression is not None:
+            return None
+        if _decode_attr(dataset.attrs.get('MATLAB_class')) not in MATLAB_CLASS_NAMES.values():
+            return None
+        offset = dataset.id.get_offset()
+        shape, dtype = dataset.shape, dataset.dtype
+    
+    if offset is None:
+        return None
+    return np.memmap(file_path, dtype=dtype, mode='r', offset=offset, shape=shape)
+
+def write_mat(file_path, data_dict, version='7.3', progress=None,
+              chunk_rows=None, compression=None, compression_level=None):
+    """将数据字典写入.mat文件，version为'7.3'（HDF5）或'5'，progress接收0~1的写入进度；chunk_rows和compression只对v7.3有效，都为None时连续存放（可内存映射）"""
+    if version == '7.3':
+        _write_mat73(file_path, data_dict, progress, chunk_rows, compression, compression_level)
+    elif version == '5':
+        _write_mat5(file_path, data_dict)
+        if progress:
+            progress(1.0)
+    else:
+        raise ValueError(f"不支持的.mat文件版本: {version}")
+
+def _read_mat5(file_path, variable_names=None):
+    """使用scipy读取v5格式的.mat文件"""
+    if not SCIPY_AVAILABLE:
+        raise ImportError("读取v5格式.mat文件需要安装scipy")
+    
+    mat_data = scipy.io.loadmat(file_path, variable_names=variable_names)
+    
+    # 只保留数值数组，跳过__header__等元信息
+    variables = {}
+    for key, value in mat_data.items():
+        if key.startswith('__'):
+            continue
+        if isinstance(value, np.ndarray) and value.dtype.kind in 'biuf':
+            variables[key] = value
+    return variables
+
+def _read_mat73(file_path, variable_names=None):
+    """使用h5py读取v7.3格式的.mat文件"""
+    if not H5PY_AVAILABLE:
+        raise ImportError("读取v7.3格式.mat文件需要安装h5py")
+    
+    variables = {}
+    with h5py.File(file_path, 'r') as f:
+        for key, obj in f.items():
+            if variable_names is not None and key not in variable_names:
+                continue
+            if not isinstance(obj, h5py.Dataset):
+                continue
+            
+            matlab_class = _decode_attr(obj.attrs.get('MATLAB_class'))
+            if matlab_class not in NUMERIC_MATLAB_CLASSES or obj.attrs.get('MATLAB_empty'):
+                continue
+            
+            # Matlab按列优先存储，HDF5中的维度顺序与Matlab相反
+            value = obj[()].T
+            if matlab_class == 'logical':
+                value = value.astype(bool)
+            variables[key] = value
+    return variables
+
+def _write_mat5(file_path, data_dict):
+    """使用scipy写入v5格式的.mat文件"""
+    if not SCIPY_AVAILABLE:
+        raise ImportError("写入v5格式.mat文件需要安装scipy")
+    
+    scipy.io.savemat(file_path, data_dict, oned_as='column')
+
+def _write_mat73(file_path, data_dict, progress=None, chunk_rows=None, compression=None, compression_level=None):
+    """使用h5py写入v7.3格式的.mat文件，文件可直接用Matlab的load打开"""
+    if not H5PY_AVAILABLE:
+        raise ImportError("写入v7.3格式.mat文件需要安装h5py")
+    layout = {'chunk_rows': chunk_rows, 'compression': compression, 'compression_level': compression_level}
+    
+    # 按数据量报告进度
+    total_bytes = max(1, sum(np.asarray(v).nbytes for v in data_dict.values() if not isinstance(v, str)))
+    written_bytes = 0
+    
+    with h5py.File(file_path, 'w', userblock_size=MAT73_USERBLOCK_SIZE) as f:
+        for key, value in data_dict.items():
+            _write_mat73_variable(f, key, value, **layout)
+            if progress and not isinstance(value, str):
+                written_bytes += np.asarray(value).nbytes
+                progress(written_bytes / total_bytes)
+    
+    # HDF5写完后再填充Matlab文件头
+    write_mat73_header(file_path)
+
+def _write_mat73_variable(h5_file, name, value, chunk_rows=None, compression=None, compression_level=None):
+    """将单个变量按Matlab约定写入HDF5文件"""
+    if isinstance(value, str):
+        # 字符串按1×N的char数组保存（UTF-16编码）
+        chars = np.frombuffer(value.encode('utf-16-le'), dtype=np.uint16).reshape(-1, 1)
+        dataset = h5_file.create_dataset(name, data=chars)
+        dataset.attrs['MATLAB_class'] = np.bytes_('char')
+        dataset.attrs['MATLAB_int_decode'] = np.int32(2)
+        return
+    
+    value = np.asarray(value)
+    if value.dtype == np.bool_:
+        matlab_class = 'logical'
+        value = value.astype(np.uint8)
+    else:
+        matlab_class = MATLAB_CLASS_NAMES.get(value.dtype)
+        if matlab_class is None:
+            value = value.astype(np.float64)
+            matlab_class = 'double'
+    
+    # 标量和一维数组分别按1×1矩阵和列向量保存
+    if value.ndim == 0:
+        value = value.reshape(1, 1)
+    elif value.ndim == 1:
+        value = value.reshape(-1, 1)
+    elif value.ndim > 2:
+        raise ValueError(f"变量 {name} 的维度超过2，暂不支持")
+    
+    # HDF5中保存转置后的形状（通道数 × 采样点数），每个通道在文件中连续存放（或按时间方向分块）
+    rows, cols = value.shape
+    dataset = h5_file.create_dataset(name, shape=(cols, rows), dtype=value.dtype,
+                                     **_dataset_layout(rows, chunk_rows, compression, compression_level))
+    for col in range(cols):
+        # 逐通道写入，避免整体转置产生的临时副本
+        dataset[col, :] = value[:, col]
+    
+    dataset.attrs['MATLAB_class'] = np.bytes_(matlab_class)
+    if matlab_class == 'logical':
+        dataset.attrs['MATLAB_int_decode'] = np.int32(1)
+
+def _dataset_layout(n_samples, chunk_rows=None, compression=None, compression_level=None):
+    """返回create_dataset的分块和压缩参数：每块为单个通道的chunk_rows个采样点，读取一个通道的一段时间时只解压覆盖该时间段的块"""
+    if compression is not None and compression not in MAT73_COMPRESSIONS:
+        raise ValueError(f"不支持的压缩方式: {compression}")
+    if chunk_rows is None and compression is None:
+        return {}
+    
+    layout = {'chunks': (1, max(1, min(chunk_rows or DEFAULT_CHUNK_ROWS, n_samples)))}
+    if compression is not None:
+        # 字节重排后浮点数据的压缩率明显更高，Matlab同样支持该过滤器
+        level = DEFAULT_COMPRESSION_LEVEL if compression_level is None else compression_level
+        layout.update(compression=compression, compression_opts=level, shuffle=True)
+    return layout
+
+def write_mat73_header(file_path):
+    """写入v7.3格式的Matlab文件头（位于HDF5用户块中）"""
+    created = time.strftime('%a %b %d %H:%M:%S %Y')
+    text = f"MATLAB 7.3 MAT-file, Platform: {sys.platform}, Created on: {created} HDF5 schema 1.00 ."
+    
+    # 116字节文本 + 8字节子系统偏移 + 2字节版本号 + 2字节字节序标识
+    header = text.encode('ascii').ljust(116, b' ')
+    header += b'\x00' * 8 + b'\x00\x02' + b'IM'
+    
+    with open(file_path, 'r+b') as f:
+        f.write(header)
+
+def _decode_attr(value):
+    """将HDF5属性值解码为字符串"""
+    if isinstance(value, bytes):
+        return value.decode('ascii')
+    return value
+
+class Mat73Writer:
+    """逐块追加写入v7.3格式的.mat文件，适用于无法一次性放入内存的数据"""
+    
+    # 每个通道按时间方向分块存储，每块包含的采样点数
+    DEFAULT_CHUNK_ROWS = DEFAULT_CHUNK_ROWS
+    
+    def __init__(self, file_path, chunk_rows=DEFAULT_CHUNK_ROWS, compression=None, compression_level=None):
+        if not H5PY_AVAILABLE:
+            raise ImportError("写入v7.3格式.mat文件需要安装h5py")
+        
+        self.file_path = file_path
+        self.chunk_rows = chunk_rows or DEFAULT_CHUNK_ROWS
+        self.compression = compression
+        self.compression_level = compression_level
+        self._file = h5py.File(file_path, 'w', userblock_size=MAT73_USERBLOCK_SIZE)
+    
+    def append(self, name, block):
+        """将一块数据（行为采样点，列为通道）追加到变量name的末尾"""
+        block = np.asarray(block)
+        if block.ndim == 1:
+            block = block.reshape(-1, 1)
+        
+        rows, cols = block.shape
+        if name not in self._file:
+            matlab_class = MATLAB_CLASS_NAMES.get(block.dtype)
+            if matlab_class is None:
+                raise ValueError(f"变量 {name} 的数据类型 {block.dtype} 不受支持")
+            
+            # 总采样点数未知，块大小不按变量长度缩小
+            dataset = self._file.create_dataset(
+                name, shape=(cols, 0), maxshape=(cols, None), dtype=block.dtype,
+                **_dataset_layout(self.chunk_rows, self.chunk_rows, self.compression, self.compression_level)
+            )
+            dataset.attrs['MATLAB_class'] = np.bytes_(matlab_class)
+        
+        dataset = self._file[name]
+        if dataset.shape[0] != cols:
+            raise ValueError(f"变量 {name} 的列数不一致: {dataset.shape[0]} != {cols}")
+        
+        start = dataset.shape[1]
+        dataset.resize(start + rows, axis=1)
+        for col in range(cols):
+            dataset[col, start:start + rows] = block[:, col]
+    
+    def close(self):
+        """关闭文件并写入Matlab文件头"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            write_mat73_header(self.file_path)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+class MatFile:
+    """类似Matlab的matfile：MatFile(path)['acceleration'][rows, cols]只读取需要的行列，v7.3文件直接从HDF5中读取（分块存储时只读取覆盖的块），v5文件读取整个变量后切片"""
+    
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._is_mat73 = is_mat73_file(file_path)
+        self._file = None
+        self._variables = {}
+        if self._is_mat73:
+            if not H5PY_AVAILABLE:
+                raise ImportError("读取v7.3格式.mat文件需要安装h5py")
+            self._file = h5py.File(file_path, 'r')
+    
+    def keys(self):
+        """文件中数值变量的名称"""
+        return [name for name, _, _ in list_variables(self.file_path)]
+    
+    def __contains__(self, name):
+        return name in self.keys()
+    
+    def __getitem__(self, name):
+        """返回变量的部分读取对象（MatVariable），不读取数据"""
+        variable = self._variables.get(name)
+        if variable is not None:
+            return variable
+        
+        if self._is_mat73:
+            dataset = self._file.get(name)
+            if not isinstance(dataset, h5py.Dataset):
+                raise KeyError(name)
+            matlab_class = _decode_attr(dataset.attrs.get('MATLAB_class'))
+            if matlab_class not in NUMERIC_MATLAB_CLASSES or dataset.attrs.get('MATLAB_empty'):
+                raise KeyError(name)
+            variable = MatVariable(dataset=dataset, logical=(matlab_class == 'logical'))
+        else:
+            value = _read_mat5(self.file_path, [name]).get(name)
+            if value is None:
+                raise KeyError(name)
+            variable = MatVariable(array=value.reshape(value.shape[0], -1))
+        
+        self._variables[name] = variable
+        return variable
+    
+    def close(self):
+        """关闭文件"""
+        self._variables.clear()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+class MatVariable:
+    """.mat文件中的一个二维变量（行为采样点，列为通道），按NumPy的方式索引时只读取选中的行列"""
+    
+    ndim = 2
+    
+    def __init__(self, dataset=None, array=None, logical=False):
+        self._dataset = dataset
+        self._array = array
+        self._logical = logical
+        if dataset is not None:
+            # HDF5中的维度顺序与Matlab相反（通道数 × 采样点数）
+            self.shape = tuple(reversed(dataset.shape))
+            self.dtype = np.dtype(bool) if logical else dataset.dtype
+        else:
+            self.shape = array.shape
+            self.dtype = array.dtype
+    
+    def __len__(self):
+        return self.shape[0]
+    
+    def __getitem__(self, key):
+        """支持整数、切片、整数列表和布尔数组索引，例如var[1000:2000, 0]、var[:, [0, 2]]；行列都是列表时分别选择行和列（与Matlab一致）"""
+        if not isinstance(key, tuple):
+            key = (key, slice(None))
+        if len(key) != 2:
+            raise IndexError("只支持二维索引")
+        rows, row_order, row_scalar = _h5_selection(key[0], self.shape[0])
+        cols, col_order, col_scalar = _h5_selection(key[1], self.shape[1])
+        
+        if self._array is not None:
+            block = self._array[rows][:, cols]
+        elif isinstance(rows, np.ndarray) and isinstance(cols, np.ndarray):
+            # h5py每次只允许一个维度使用列表索引，行列都是列表时逐通道读取
+            block = np.stack([self._dataset[col, rows] for col in cols], axis=-1) if len(cols) \
+                else np.empty((len(rows), 0), dtype=self._dataset.dtype)
+        else:
+            block = self._dataset[cols, rows].T
+        
+        if row_order is not None:
+            block = block[row_order]
+        if col_order is not None:
+            block = block[:, col_order]
+        if self._logical:
+            block = block.astype(bool)
+        
+        if row_scalar and col_scalar:
+            return block[0, 0]
+        if row_scalar:
+            return block[0]
+        if col_scalar:
+            return block[:, 0]
+        return block
+
+def _h5_selection(key, length):
+    """将一个维度的索引转换为h5py支持的选择（正步长切片或递增的整数数组），返回(选择, 恢复原顺序的索引, 是否为标量索引)"""
+    if isinstance(key, (int, np.integer)):
+        index = int(key) + (length if key < 0 else 0)
+        if not 0 <= index < length:
+            raise IndexError(f"索引 {key} 超出范围（长度 {length}）")
+        return slice(index, index + 1), None, True
+    
+    if isinstance(key, slice):
+        start, stop, step = key.indices(length)
+        if step > 0:
+            return slice(start, stop, step), None, False
+        indices = np.arange(start, stop, step)
+    else:
+        indices = np.asarray(key)
+        if indices.dtype == np.bool_:
+            indices = np.flatnonzero(indices)
+        indices = indices.astype(np.int64).ravel()
+        indices = np.where(indices < 0, indices + length, indices)
+        if indices.size and (indices.min() < 0 or indices.max() >= length):
+            raise IndexError(f"索引超出范围（长度 {length}）")
+    
+    if indices.size == 0:
+        return slice(0, 0), None, False
+    unique, inverse = np.unique(indices, return_inverse=True)
+    return unique, inverse, False
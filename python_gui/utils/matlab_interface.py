@@ -1,27 +1,229 @@
-import matlab.engine
+import hashlib
+import itertools
 import numpy as np
 import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from utils.engine_executor import EngineExecutor, PRIORITY_INTERACTIVE, PRIORITY_NORMAL, PRIORITY_BATCH
+
+try:
+    import matlab
+    import matlab.engine
+    MATLAB_ENGINE_AVAILABLE = True
+except ImportError:
+    MATLAB_ENGINE_AVAILABLE = False
+
+# NumPy数据类型与Matlab数组类型的对应关系
+MATLAB_ARRAY_TYPES = {
+    np.dtype(np.float64): matlab.double,
+    np.dtype(np.float32): matlab.single,
+    np.dtype(np.int8): matlab.int8,
+    np.dtype(np.int16): matlab.int16,
+    np.dtype(np.int32): matlab.int32,
+    np.dtype(np.int64): matlab.int64,
+    np.dtype(np.uint8): matlab.uint8,
+    np.dtype(np.uint16): matlab.uint16,
+    np.dtype(np.uint32): matlab.uint32,
+    np.dtype(np.uint64): matlab.uint64,
+    np.dtype(np.bool_): matlab.logical,
+} if MATLAB_ENGINE_AVAILABLE else {}
+
+# 本系统使用的共享Matlab会话名称
+SHARED_SESSION_NAME = 'dms_shared'
+
+# 等待新启动的共享会话可连接的最长时间（秒）
+SHARED_SESSION_START_TIMEOUT = 120
+
+# 注册到Matlab工作区的数据集占用内存的上限（字节），超出时释放最久未使用的数据集
+DATASET_BUDGET_BYTES = 2 * 1024 ** 3
+
+# 不小于该大小（字节）的数组写入临时二进制文件，由Matlab直接读取，而不经过引擎的数组转换
+# （交接点可用benchmarks/bench_matlab_handoff.py测量）
+FILE_HANDOFF_THRESHOLD_BYTES = 64 * 1024 ** 2
+
+# 可以通过二进制文件交给Matlab的数据类型及其Matlab类名
+HANDOFF_CLASS_NAMES = {
+    np.dtype(np.float64): 'double',
+    np.dtype(np.float32): 'single',
+    np.dtype(np.int8): 'int8',
+    np.dtype(np.int16): 'int16',
+    np.dtype(np.int32): 'int32',
+    np.dtype(np.int64): 'int64',
+    np.dtype(np.uint8): 'uint8',
+    np.dtype(np.uint16): 'uint16',
+    np.dtype(np.uint32): 'uint32',
+    np.dtype(np.uint64): 'uint64',
+}
+
+class MatlabDataset:
+    """已注册到Matlab工作区的数据集的句柄，绘图和处理函数可以用它代替NumPy数组"""
+    
+    def __init__(self, name, shape, nbytes):
+        self.name = name
+        self.shape = shape
+        self.nbytes = nbytes
+    
+    def __repr__(self):
+        return f"MatlabDataset({self.name!r}, shape={self.shape})"
 
 class MatlabInterface:
-    def __init__(self):
+    def __init__(self, shared_session_name=SHARED_SESSION_NAME, keep_shared_session=False):
         self.eng = None
         self.matlab_functions_path = None
+        self.engine_pool = None
+        # 共享会话名称；keep_shared_session为True时在独立进程中启动共享会话，界面关闭后保持运行
+        self.shared_session_name = shared_session_name
+        self.keep_shared_session = keep_shared_session
+        self.connected_to_shared = False
+        
+        # 已注册的数据集：变量名 -> MatlabDataset，按最近使用的先后排列
+        self.datasets = OrderedDict()
+        self.dataset_budget_bytes = DATASET_BUDGET_BYTES
+        # 变量名包含进程号，多个界面连接同一个共享会话时不会冲突
+        self._dataset_counter = itertools.count(1)
+        # 后台线程也会更新数据集登记
+        self._dataset_lock = threading.RLock()
+        
+        # 引擎只在执行线程中使用：同步和异步调用都经过它的优先级队列
+        self.executor = EngineExecutor()
+        
+        # 大数组通过临时文件交给Matlab；Matlab读取后删除文件，调用失败留下的文件在关闭引擎时删除
+        self.handoff_threshold_bytes = FILE_HANDOFF_THRESHOLD_BYTES
+        self.handoff_dir = None
+        self._handoff_files = set()
     
     def start_engine(self):
-        """启动Matlab引擎"""
+        """启动Matlab引擎（优先连接已运行的共享会话，没有时才启动新引擎）"""
+        return self.executor.call(self._start_engine)
+    
+    def start_engine_async(self, functions_path=None):
+        """在执行线程中启动引擎并设置函数路径，返回结果为是否启动成功的Future"""
+        def start():
+            success = self._start_engine()
+            if success and functions_path:
+                self.set_functions_path(functions_path)
+            return success
+        return self.executor.submit(start)
+    
+    def _start_engine(self):
+        """启动引擎（在执行线程中运行，引擎由该线程创建和使用）"""
+        if not MATLAB_ENGINE_AVAILABLE:
+            print("未安装MATLAB Engine for Python")
+            return False
+        
+        # 连接已经运行的共享会话，几乎不需要等待
+        self.eng = self._connect_shared_session()
+        if self.eng is None and self.keep_shared_session:
+            # 启动一个独立于本进程的共享会话，下次启动时可以直接连接
+            self.eng = self._launch_shared_session()
+        
+        if self.eng is not None:
+            self.connected_to_shared = True
+            return True
+        
         try:
             self.eng = matlab.engine.start_matlab()
+            self.connected_to_shared = False
             return True
         except Exception as e:
             print(f"启动Matlab引擎失败: {e}")
             return False
     
+    def _connect_shared_session(self):
+        """查找并连接本系统的共享Matlab会话（名称为shared_session_name），不连接用户自己共享的其他会话；没有时返回None"""
+        try:
+            names = matlab.engine.find_matlab()
+        except Exception as e:
+            print(f"查找共享Matlab会话失败: {e}")
+            return None
+        
+        # 其他共享会话属于用户自己的Matlab，不能在其中注册数据集、关闭图形窗口
+        name = self.shared_session_name
+        if name not in names:
+            return None
+        
+        try:
+            eng = matlab.engine.connect_matlab(name)
+            print(f"已连接到共享Matlab会话: {name}")
+            return eng
+        except Exception as e:
+            print(f"连接共享Matlab会话 {name} 失败: {e}")
+            return None
+    
+    def _launch_shared_session(self):
+        """在独立进程中启动共享Matlab会话并连接"""
+        share_cmd = f"matlab.engine.shareEngine('{self.shared_session_name}')"
+        if sys.platform.startswith('win'):
+            command = ['matlab', '-automation', '-r', share_cmd]
+            options = {'creationflags': subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP}
+        else:
+            # 没有终端时Matlab读到输入结束会退出，因此让会话停在pause中等待引擎请求
+            command = ['matlab', '-nodesktop', '-nosplash', '-r', f"{share_cmd}; while true, pause(3600); end"]
+            options = {'start_new_session': True}
+        
+        try:
+            subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                             stderr=subprocess.DEVNULL, **options)
+        except OSError as e:
+            print(f"启动共享Matlab会话失败: {e}")
+            return None
+        
+        # 等待会话完成共享
+        deadline = time.monotonic() + SHARED_SESSION_START_TIMEOUT
+        while time.monotonic() < deadline:
+            try:
+                if self.shared_session_name in matlab.engine.find_matlab():
+                    return matlab.engine.connect_matlab(self.shared_session_name)
+            except Exception as e:
+                print(f"连接新启动的共享Matlab会话失败: {e}")
+                return None
+            time.sleep(1.0)
+        
+        print("等待共享Matlab会话启动超时")
+        return None
+    
+    def create_engine_pool(self, size=2):
+        """创建引擎池，用于在多个引擎上并行执行相互独立的调用（引擎在首次使用时启动，每个引擎在自己的执行线程中调用）"""
+        from utils.engine_pool import MatlabEnginePool
+        
+        if self.engine_pool is None:
+            self.engine_pool = MatlabEnginePool(size, functions_path=self.matlab_functions_path)
+        return self.engine_pool
+    
     def stop_engine(self):
-        """关闭Matlab引擎"""
+        """关闭Matlab引擎（取消排队中的请求，在执行线程中关闭引擎后结束该线程）"""
+        self.executor.cancel_pending()
+        try:
+            return self.executor.call(self._stop_engine)
+        finally:
+            self.executor.shutdown(wait=False)
+    
+    def _stop_engine(self):
+        """关闭引擎池和引擎"""
+        self._remove_handoff_files()
+        
+        if self.engine_pool is not None:
+            self.engine_pool.shutdown()
+            self.engine_pool = None
+        
+        if self.eng and self.connected_to_shared:
+            # 共享会话保持运行，只断开连接（释放本进程注册的数据集）
+            self.release_all_datasets()
+            self.eng = None
+            self.connected_to_shared = False
+            return True
+        
         if self.eng:
             try:
                 self.eng.quit()
                 self.eng = None
+                with self._dataset_lock:
+                    self.datasets.clear()
                 return True
             except Exception as e:
                 print(f"关闭Matlab引擎失败: {e}")
@@ -29,18 +231,39 @@ class MatlabInterface:
         return True
     
     def set_functions_path(self, path):
-        """设置Matlab函数路径"""
+        """设置Matlab函数路径（函数目录未变化时跳过genpath）"""
         self.matlab_functions_path = path
         if self.eng:
             try:
-                # 添加主目录和子目录到Matlab路径
-                self.eng.addpath(self.eng.genpath(path))
-                return True
+                signature = self._get_functions_signature(path)
+                return self.executor.call(self._add_functions_path, path, signature)
             except Exception as e:
                 print(f"设置Matlab函数路径失败: {e}")
                 return False
         return False
     
+    def _add_functions_path(self, path, signature):
+        """添加函数路径，共享会话中可能已经设置过相同的路径"""
+        if self.eng.getappdata(0, 'dms_functions_signature') == signature:
+            return True
+        
+        # 添加主目录和子目录到Matlab路径
+        self.eng.addpath(self.eng.genpath(path))
+        self.eng.setappdata(0, 'dms_functions_signature', signature, nargout=0)
+        return True
+    
+    def _get_functions_signature(self, path):
+        """根据函数目录的路径、文件和修改时间生成签名，目录内容变化时签名随之变化"""
+        path = os.path.abspath(path)
+        entries = []
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(dirs + files):
+                entries.append(f"{os.path.relpath(os.path.join(root, name), path)}:"
+                               f"{os.stat(os.path.join(root, name)).st_mtime_ns}")
+        digest = hashlib.md5('\n'.join(entries).encode('utf-8')).hexdigest()
+        return f"{path}|{digest}"
+    
     def call_function(self, func_name, *args, **kwargs):
         """调用Matlab函数"""
         if not self.eng:
@@ -48,34 +271,265 @@ class MatlabInterface:
             return None
         
         try:
-            # 调用Matlab函数
-            result = getattr(self.eng, func_name)(*args, **kwargs)
+            # 在执行线程中调用Matlab函数
+            result = self.executor.call(lambda: getattr(self.eng, func_name)(*args, **kwargs))
             return result
         except Exception as e:
             print(f"调用Matlab函数 {func_name} 失败: {e}")
             return None
     
-    def numpy_to_matlab(self, np_array):
-        """将NumPy数组转换为Matlab数组"""
-        # 确保数组是浮点类型
-        np_array = np_array.astype(float)
-        
-        # 转换为Matlab数组
-        if len(np_array.shape) == 1:
-            # 一维数组
-            return matlab.double(np_array.tolist())
-        elif len(np_array.shape) == 2:
-            # 二维数组，Matlab是列优先，需要转置
-            return matlab.double(np_array.T.tolist())
+    def call_function_async(self, func_name, *args, timeout=None, priority=PRIORITY_NORMAL, key=None, **kwargs):
+        """异步调用Matlab函数，立即返回concurrent.futures.Future（可用asyncio.wrap_future等待）；timeout为引擎执行超时（秒），cancel()可取消排队中或执行中的调用；key相同的排队请求只执行最新的一个"""
+        return self._submit(lambda: getattr(self.eng, func_name)(*args, background=True, **kwargs),
+                            timeout, priority, key)
+    
+    def _submit(self, start_call, timeout=None, priority=PRIORITY_NORMAL, key=None):
+        """把请求提交到执行线程，返回Future"""
+        if not self.eng:
+            future = Future()
+            future.set_exception(RuntimeError("Matlab引擎未启动"))
+            return future
+        return self.executor.submit(start_call, priority=priority, key=key, timeout=timeout)
+    
+    def queue_stats(self):
+        """引擎请求队列的深度和延迟统计"""
+        return self.executor.stats()
+    
+    def register_dataset(self, np_array):
+        """将数组传输一次并保存在Matlab工作区中，返回MatlabDataset句柄；超过内存上限或失败时返回None"""
+        if not self.eng:
+            print("Matlab引擎未启动")
+            return None
+        
+        np_array = np.asarray(np_array)
+        dataset, evicted = self._reserve_dataset(np_array.shape, np_array.nbytes)
+        if dataset is None:
+            return None
+        
+        try:
+            self.executor.call(self._transfer_dataset, dataset, np_array, evicted)
+        except Exception as e:
+            print(f"注册数据集失败: {e}")
+            return None
+        return dataset
+    
+    def register_dataset_async(self, np_array, priority=PRIORITY_INTERACTIVE, shape=None, dtype=None):
+        """立即返回MatlabDataset句柄，数据在执行线程中传输；之后以相同或更低优先级提交的调用在传输完成后才执行，因此可以直接使用该句柄。np_array也可以是返回数组的函数（同时给出shape和dtype），在执行线程中调用，读取数据不阻塞调用线程"""
+        if not self.eng:
+            print("Matlab引擎未启动")
+            return None
+        
+        if callable(np_array):
+            nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
         else:
+            np_array = np.asarray(np_array)
+            shape, nbytes = np_array.shape, np_array.nbytes
+        dataset, evicted = self._reserve_dataset(tuple(shape), nbytes)
+        if dataset is not None:
+            self._submit(lambda: self._transfer_dataset(dataset, np_array, evicted), priority=priority)
+        return dataset
+    
+    def _reserve_dataset(self, shape, nbytes):
+        """登记新数据集，并选出为腾出空间需要释放的最久未使用的数据集，返回(句柄, 需要释放的变量名)"""
+        if nbytes > self.dataset_budget_bytes:
+            print(f"数据集大小 {nbytes} 字节超过工作区上限 {self.dataset_budget_bytes} 字节")
+            return None, []
+        
+        with self._dataset_lock:
+            evicted = []
+            used = sum(dataset.nbytes for dataset in self.datasets.values())
+            while self.datasets and used + nbytes > self.dataset_budget_bytes:
+                name, dataset = self.datasets.popitem(last=False)
+                used -= dataset.nbytes
+                evicted.append(name)
+            
+            name = f"dms_ds_{os.getpid()}_{next(self._dataset_counter)}"
+            dataset = MatlabDataset(name, shape, nbytes)
+            self.datasets[name] = dataset
+        return dataset, evicted
+    
+    def _transfer_dataset(self, dataset, np_array, evicted=()):
+        """释放被淘汰的数据集并把数组（或读取数组的函数的结果）传输到工作区，失败时注销新数据集"""
+        try:
+            if evicted:
+                self.eng.eval(f"clear {' '.join(evicted)}", nargout=0)
+            self._put_array(dataset.name, np_array() if callable(np_array) else np_array)
+        except Exception:
+            with self._dataset_lock:
+                self.datasets.pop(dataset.name, None)
+            raise
+    
+    def has_dataset(self, dataset):
+        """数据集是否仍在工作区中（可能已被释放）"""
+        with self._dataset_lock:
+            return dataset is not None and self.eng is not None and dataset.name in self.datasets
+    
+    def release_dataset(self, dataset):
+        """从Matlab工作区中删除数据集（参数可以是句柄或变量名）"""
+        name = self._forget_dataset(dataset)
+        if name is None or not self.eng:
+            return False
+        
+        try:
+            self.executor.call(lambda: self.eng.eval(f"clear {name}", nargout=0))
+            return True
+        except Exception as e:
+            print(f"释放数据集 {name} 失败: {e}")
+            return False
+    
+    def release_dataset_async(self, dataset):
+        """在后台线程中删除数据集，返回Future；数据集未注册时返回None"""
+        name = self._forget_dataset(dataset)
+        if name is None or not self.eng:
+            return None
+        return self.call_function_async('eval', f"clear {name}", nargout=0, priority=PRIORITY_BATCH)
+    
+    def _forget_dataset(self, dataset):
+        """注销数据集，返回其变量名；未注册时返回None"""
+        name = dataset.name if isinstance(dataset, MatlabDataset) else dataset
+        with self._dataset_lock:
+            return name if self.datasets.pop(name, None) is not None else None
+    
+    def release_all_datasets(self):
+        """删除本进程注册的所有数据集"""
+        with self._dataset_lock:
+            names = list(self.datasets)
+        for name in names:
+            self.release_dataset(name)
+    
+    def call_with_dataset(self, func_name, dataset, *args, rows=None, columns=None, nargout=0):
+        """以已注册数据集的部分行列为第一个参数调用Matlab函数（rows为行区间(起始, 结束)，columns为列号，均从0开始）"""
+        if not self.eng:
+            print("Matlab引擎未启动")
+            return None
+        
+        try:
+            return self.executor.call(lambda: self._call_with_dataset(func_name, dataset, args, rows, columns,
+                                                                      nargout=nargout))
+        except Exception as e:
+            print(f"调用Matlab函数 {func_name} 失败: {e}")
+            return None
+    
+    def call_with_dataset_async(self, func_name, dataset, *args, rows=None, columns=None, nargout=0, timeout=None,
+                                priority=PRIORITY_NORMAL, key=None):
+        """异步版本的call_with_dataset，返回Future"""
+        return self._submit(lambda: self._call_with_dataset(func_name, dataset, args, rows, columns,
+                                                            nargout=nargout, background=True),
+                            timeout, priority, key)
+    
+    def _call_with_dataset(self, func_name, dataset, args, rows=None, columns=None, **kwargs):
+        """在Matlab中截取数据集后调用函数，只传输行列号和其余参数"""
+        with self._dataset_lock:
+            if not self.has_dataset(dataset):
+                raise ValueError(f"数据集 {dataset} 未注册或已被释放")
+            self.datasets.move_to_end(dataset.name)
+        
+        # Matlab的行列号从1开始，行区间包含结束行
+        mat_rows = self.numpy_to_matlab(np.array([[rows[0] + 1, rows[1]]], dtype=np.float64)) if rows is not None else []
+        mat_columns = (self.numpy_to_matlab(np.asarray(columns, dtype=np.float64).reshape(1, -1) + 1)
+                       if columns is not None else [])
+        return self.eng.call_with_dataset(func_name, dataset.name, mat_rows, mat_columns, *args, **kwargs)
+    
+    def _call_plot(self, func_name, data, args, rows=None, columns=None, **kwargs):
+        """调用绘图函数：data为已注册的数据集时只传输行列号，大数组通过临时文件传递，否则传输数组；data为函数时在执行线程中调用它读取数据"""
+        if isinstance(data, MatlabDataset):
+            return self._call_with_dataset(func_name, data, args, rows, columns, nargout=0, **kwargs)
+        
+        data = np.asarray(data() if callable(data) else data)
+        if self._use_file_handoff(data):
+            path, n_rows, n_cols, class_name = self._write_handoff_file(data)
+            return self.eng.call_with_binary_matrix(func_name, path, n_rows, n_cols, class_name, *args,
+                                                    nargout=0, **kwargs)
+        return getattr(self.eng, func_name)(self.numpy_to_matlab(data), *args, nargout=0, **kwargs)
+    
+    def _put_array(self, name, np_array):
+        """把数组放入Matlab工作区变量name（在执行线程中调用）"""
+        np_array = np.asarray(np_array)
+        if not self._use_file_handoff(np_array):
+            self.eng.workspace[name] = self.numpy_to_matlab(np_array)
+            return
+        
+        path, n_rows, n_cols, class_name = self._write_handoff_file(np_array)
+        try:
+            self.eng.eval(f"{name} = load_binary_matrix('{_matlab_string(path)}', {n_rows}, {n_cols}, "
+                          f"'{class_name}', true);", nargout=0)
+        finally:
+            self._remove_handoff_files(path)
+    
+    def _use_file_handoff(self, np_array):
+        """数组是否通过临时文件交给Matlab"""
+        return (self.handoff_threshold_bytes is not None
+                and np_array.nbytes >= self.handoff_threshold_bytes
+                and np_array.ndim in (1, 2)
+                and np_array.dtype.newbyteorder('=') in HANDOFF_CLASS_NAMES)
+    
+    def _write_handoff_file(self, np_array):
+        """按Matlab的列优先顺序把数组写入临时二进制文件，返回(路径, 行数, 列数, Matlab类名)"""
+        if not np_array.dtype.isnative:
+            np_array = np_array.astype(np_array.dtype.newbyteorder('='))
+        n_rows, n_cols = (len(np_array), 1) if np_array.ndim == 1 else np_array.shape
+        
+        # 之前的调用已经完成（执行线程依次执行），Matlab删除了的文件不再记录
+        self._handoff_files = {path for path in self._handoff_files if os.path.exists(path)}
+        fd, path = tempfile.mkstemp(prefix=f"dms_handoff_{os.getpid()}_", suffix='.bin', dir=self.handoff_dir)
+        self._handoff_files.add(path)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if np_array.ndim == 1 or np_array.flags.f_contiguous:
+                    np_array.T.tofile(f)
+                else:
+                    # 按行存放的数组逐列写入，临时内存只需一列
+                    for j in range(n_cols):
+                        np.ascontiguousarray(np_array[:, j]).tofile(f)
+        except Exception:
+            self._remove_handoff_files(path)
+            raise
+        return path, n_rows, n_cols, HANDOFF_CLASS_NAMES[np_array.dtype]
+    
+    def _remove_handoff_files(self, *paths):
+        """删除临时交接文件（不指定路径时删除所有残留的文件），Matlab已经删除的文件直接忽略"""
+        for path in paths or list(self._handoff_files):
+            self._handoff_files.discard(path)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    def numpy_to_matlab(self, np_array):
+        """将NumPy数组转换为Matlab数组（基于缓冲区协议，不经过Python列表）"""
+        np_array = np.asarray(np_array)
+        
+        if np_array.ndim not in (1, 2):
             print("不支持的数组维度")
             return None
+        
+        # 保留原始数值类型，无法对应的类型统一转换为双精度
+        mat_type = MATLAB_ARRAY_TYPES.get(np_array.dtype)
+        if mat_type is None:
+            np_array = np_array.astype(np.float64)
+            mat_type = matlab.double
+        
+        # 一维数组按列向量传递（每列代表一个通道）
+        if np_array.ndim == 1:
+            np_array = np_array.reshape(-1, 1)
+        
+        try:
+            # R2022a及以上版本的引擎可直接从缓冲区构造，形状保持不变
+            return mat_type(np_array)
+        except TypeError:
+            # 旧版本引擎只支持嵌套列表初始化
+            return mat_type(np_array.tolist())
     
     def matlab_to_numpy(self, mat_array):
-        """将Matlab数组转换为NumPy数组"""
-        if isinstance(mat_array, (matlab.double, matlab.single)):
-            # 转换为NumPy数组，注意Matlab是列优先，需要转置
-            return np.array(mat_array._data).reshape(mat_array.size, order='F')
+        """将Matlab数组转换为NumPy数组（尽量零拷贝）"""
+        if isinstance(mat_array, tuple(MATLAB_ARRAY_TYPES.values())):
+            try:
+                # 新版引擎的Matlab数组实现了缓冲区协议
+                return np.asarray(memoryview(mat_array))
+            except TypeError:
+                # 旧版引擎以列优先的array.array保存数据，直接共享其内存
+                flat = np.frombuffer(mat_array._data, dtype=mat_array._data.typecode)
+                return flat.reshape(mat_array.size, order='F')
         elif isinstance(mat_array, list):
             # 如果是列表，直接转换
             return np.array(mat_array)
@@ -91,7 +545,7 @@ class MatlabInterface:
         
         try:
             # 使用Matlab的load函数加载文件
-            data = self.eng.load(file_path, nargout=1)
+            data = self.executor.call(lambda: self.eng.load(file_path, nargout=1))
             return data
         except Exception as e:
             print(f"加载Matlab文件失败: {e}")
@@ -104,53 +558,116 @@ class MatlabInterface:
             return False
         
         try:
-            # 将数据字典中的所有变量传递给Matlab工作区
-            for key, value in data_dict.items():
-                if isinstance(value, np.ndarray):
-                    # 转换NumPy数组为Matlab数组
-                    mat_value = self.numpy_to_matlab(value)
-                    self.eng.workspace[key] = mat_value
-                else:
-                    # 直接传递其他类型
-                    self.eng.workspace[key] = value
-            
-            # 保存工作区变量到文件
-            self.eng.save(file_path, '-v7.3', nargout=0)
+            # 批量保存的优先级低于交互式绘图
+            self.executor.call(self._save_workspace, file_path, data_dict, priority=PRIORITY_BATCH)
             return True
         except Exception as e:
             print(f"保存Matlab文件失败: {e}")
             return False
     
-    def plot_time_domain(self, data, sample_rate=1000, title="时域图"):
-        """绘制时域图"""
+    def _save_workspace(self, file_path, data_dict):
+        """把变量传递给Matlab工作区后保存到文件"""
+        # 将数据字典中的所有变量传递给Matlab工作区
+        for key, value in data_dict.items():
+            if isinstance(value, np.ndarray):
+                # 转换NumPy数组为Matlab数组（大数组通过临时文件）
+                self._put_array(key, value)
+            else:
+                # 直接传递其他类型
+                self.eng.workspace[key] = value
+        
+        # 保存工作区变量到文件
+        self.eng.save(file_path, '-v7.3', nargout=0)
+    
+    def plot_time_domain(self, data, sample_rate=1000, title="时域图", times=None, channel_names=None,
+                         rows=None, columns=None, timeout=None):
+        """绘制时域图（times为每行数据对应的时间，用于只传输部分时间段或抽样后的数据；多列数据一次调用绘制为多个子图；data为已注册的数据集时用rows和columns选择行区间和列）；等待plot_time_domain_async完成，timeout为引擎执行超时（秒）"""
         if not self.eng:
             print("Matlab引擎未启动")
             return False
         
         try:
-            # 转换数据为Matlab格式
-            mat_data = self.numpy_to_matlab(data)
-            
-            # 调用Matlab绘图函数
-            self.eng.plot_time_domain(mat_data, sample_rate, title, nargout=0)
+            self.plot_time_domain_async(data, sample_rate, title, times, channel_names, rows, columns,
+                                        timeout=timeout).result()
             return True
         except Exception as e:
             print(f"绘制时域图失败: {e}")
             return False
     
-    def plot_freq_domain(self, data, sample_rate=1000, title="频域图"):
-        """绘制频域图"""
+    def plot_freq_domain(self, data, sample_rate=1000, title="频域图", freq_range=None, channel_names=None,
+                         rows=None, columns=None, timeout=None):
+        """绘制频域图（freq_range为显示的频率范围(起始, 结束)；多列数据一次调用绘制为多个子图；data为已注册的数据集时用rows和columns选择行区间和列）；等待plot_freq_domain_async完成，timeout为引擎执行超时（秒）"""
+        if not self.eng:
+            print("Matlab引擎未启动")
+            return False
+        
+        try:
+            self.plot_freq_domain_async(data, sample_rate, title, freq_range, channel_names, rows, columns,
+                                        timeout=timeout).result()
+            return True
+        except Exception as e:
+            print(f"绘制频域图失败: {e}")
+            return False
+    
+    def plot_time_domain_async(self, data, sample_rate=1000, title="时域图", times=None, channel_names=None,
+                               rows=None, columns=None, timeout=None, key=None):
+        """异步绘制时域图，参数与plot_time_domain相同，以交互优先级执行，返回Future"""
+        args = self._time_domain_args(sample_rate, title, times, channel_names)
+        return self._submit(lambda: self._call_plot('plot_time_domain', data, args, rows, columns, background=True),
+                            timeout, PRIORITY_INTERACTIVE, key)
+    
+    def plot_freq_domain_async(self, data, sample_rate=1000, title="频域图", freq_range=None, channel_names=None,
+                               rows=None, columns=None, timeout=None, key=None):
+        """异步绘制频域图，参数与plot_freq_domain相同，以交互优先级执行，返回Future"""
+        args = self._freq_domain_args(sample_rate, title, freq_range, channel_names)
+        return self._submit(lambda: self._call_plot('plot_freq_domain', data, args, rows, columns, background=True),
+                            timeout, PRIORITY_INTERACTIVE, key)
+    
+    def _time_domain_args(self, sample_rate, title, times=None, channel_names=None):
+        """plot_time_domain.m数据之后的参数（可选参数缺省时传空数组）"""
+        args = [sample_rate, title]
+        if times is not None or channel_names:
+            args.append(self.numpy_to_matlab(np.asarray(times, dtype=np.float64)) if times is not None else [])
+        if channel_names:
+            args.append(list(channel_names))
+        return args
+    
+    def _freq_domain_args(self, sample_rate, title, freq_range=None, channel_names=None):
+        """plot_freq_domain.m数据之后的参数（可选参数缺省时传空数组）"""
+        args = [sample_rate, title]
+        if freq_range is not None or channel_names:
+            args.append(self.numpy_to_matlab(np.asarray(freq_range, dtype=np.float64).reshape(1, 2))
+                        if freq_range is not None else [])
+        if channel_names:
+            args.append(list(channel_names))
+        return args
+    
+    def plot_spectrum(self, freqs, psd, title="频域图", channel_names=None):
+        """绘制已在Python端计算好的功率谱（只传输频谱数据）"""
         if not self.eng:
             print("Matlab引擎未启动")
             return False
         
         try:
             # 转换数据为Matlab格式
-            mat_data = self.numpy_to_matlab(data)
+            mat_freqs = self.numpy_to_matlab(freqs)
+            mat_psd = self.numpy_to_matlab(psd)
             
             # 调用Matlab绘图函数
-            self.eng.plot_freq_domain(mat_data, sample_rate, title, nargout=0)
+            self.executor.call(lambda: self.eng.plot_spectrum(mat_freqs, mat_psd, title, list(channel_names or []),
+                                                              nargout=0),
+                               priority=PRIORITY_INTERACTIVE)
             return True
         except Exception as e:
-            print(f"绘制频域图失败: {e}")
+            print(f"绘制功率谱失败: {e}")
             return False
+    
+    def plot_spectrum_async(self, freqs, psd, title="频域图", channel_names=None, timeout=None, key=None):
+        """异步绘制已计算好的功率谱，以交互优先级执行，返回Future"""
+        return self._submit(lambda: self.eng.plot_spectrum(self.numpy_to_matlab(freqs), self.numpy_to_matlab(psd), title,
+                                                           list(channel_names or []), nargout=0, background=True),
+                            timeout, PRIORITY_INTERACTIVE, key)
+
+def _matlab_string(text):
+    """转义Matlab单引号字符串中的单引号"""
+    return text.replace("'", "''")
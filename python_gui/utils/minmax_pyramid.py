@@ -0,0 +1,93 @@
+import numpy as np
+
+class MinMaxPyramid:
+    """单通道信号的多分辨率最小/最大值金字塔，用于按屏幕分辨率抽样显示且保留峰值"""
+    
+    # 相邻两级之间的抽取倍数
+    DEFAULT_FACTOR = 4
+    
+    def __init__(self, data, factor=DEFAULT_FACTOR):
+        self.data = np.asarray(data).reshape(-1)
+        self.factor = factor
+        
+        # 每一级为(每个桶包含的采样点数, 最小值数组, 最大值数组)，第0级为原始数据
+        self.levels = [(1, self.data, self.data)]
+        self._build()
+    
+    def __len__(self):
+        return len(self.data)
+    
+    def _build(self):
+        """逐级合并相邻的桶，直到只剩一个桶"""
+        bucket_size, mins, maxs = self.levels[0]
+        while len(mins) > 1:
+            mins = reduce_buckets(mins, self.factor, np.minimum)
+            maxs = reduce_buckets(maxs, self.factor, np.maximum)
+            bucket_size *= self.factor
+            self.levels.append((bucket_size, mins, maxs))
+    
+    def select_level(self, start, stop, n_points):
+        """选择在[start, stop)范围内桶数不少于n_points的最粗一级"""
+        count = max(1, stop - start)
+        for level in reversed(self.levels):
+            if count / level[0] >= n_points:
+                return level
+        return self.levels[0]
+    
+    def query(self, start, stop, n_points):
+        """返回采样点区间[start, stop)内最多n_points个点的(起始采样点位置, 最小值, 最大值)，返回原始采样点时最小值和最大值为同一数组"""
+        start = int(min(max(start, 0), len(self.data)))
+        stop = int(min(max(stop, start), len(self.data)))
+        if stop == start or n_points < 1:
+            empty = self.data[:0]
+            return np.zeros(0, dtype=np.int64), empty, empty
+        
+        bucket_size, mins, maxs = self.select_level(start, stop, n_points)
+        first = start // bucket_size
+        last = -(-stop // bucket_size)
+        mins = mins[first:last]
+        maxs = maxs[first:last]
+        
+        # 桶数不超过点数时直接返回，否则再合并到n_points个区间
+        if len(mins) <= n_points:
+            positions = np.arange(first, last, dtype=np.int64) * bucket_size
+            if bucket_size == 1:
+                return positions, mins, mins
+            return positions, mins, maxs
+        
+        edges = np.unique(np.linspace(0, len(mins), n_points + 1).astype(np.int64)[:-1])
+        positions = (first + edges) * bucket_size
+        return positions, np.minimum.reduceat(mins, edges), np.maximum.reduceat(maxs, edges)
+
+def reduce_buckets(values, factor, ufunc):
+    """每factor个相邻元素合并为一个，末尾不足factor个的部分单独合并"""
+    full = len(values) // factor * factor
+    
+    # 按列逐次比较，比沿长度为factor的短轴做reduce快得多
+    blocks = values[:full].reshape(-1, factor)
+    reduced = blocks[:, 0].copy()
+    for k in range(1, factor):
+        ufunc(reduced, blocks[:, k], out=reduced)
+    if full < len(values):
+        reduced = np.append(reduced, ufunc.reduce(values[full:]))
+    return reduced
+
+def decimate_minmax(data, n_points):
+    """将数据（行为采样点，可以有多列）抽样为不超过n_points行，每个区间保留最小值和最大值，返回(原始行号, 抽样后的数据)"""
+    data = np.asarray(data)
+    if len(data) <= n_points:
+        return np.arange(len(data), dtype=np.int64), data
+    
+    # 每个区间输出两行：区间起点处为最小值，区间中点处为最大值
+    n_buckets = max(1, n_points // 2)
+    edges = np.linspace(0, len(data), n_buckets + 1).astype(np.int64)
+    starts = edges[:-1]
+    
+    rows = np.empty(2 * n_buckets, dtype=np.int64)
+    rows[0::2] = starts
+    rows[1::2] = (starts + edges[1:]) // 2
+    
+    values = np.empty((2 * n_buckets,) + data.shape[1:], dtype=data.dtype)
+    values[0::2] = np.minimum.reduceat(data, starts, axis=0)
+    values[1::2] = np.maximum.reduceat(data, starts, axis=0)
+    return rows, values
@@ -0,0 +1,234 @@
+import math
+import os
+import numpy as np
+from utils import mat_io
+from utils.minmax_pyramid import reduce_buckets
+
+try:
+    import h5py
+    H5PY_AVAILABLE = True
+except ImportError:
+    H5PY_AVAILABLE = False
+
+# 概览文件的后缀，与转换后的.mat文件放在同一目录
+OVERVIEW_SUFFIX = '.overview.h5'
+
+# 最细一级每个桶包含的采样点数，以及相邻两级之间的倍数
+OVERVIEW_BASE_BUCKET = 64
+OVERVIEW_FACTOR = 4
+
+# 构建概览时每次从.mat文件读取的采样点数（必须是OVERVIEW_BASE_BUCKET的整数倍）
+OVERVIEW_BLOCK_SAMPLES = OVERVIEW_BASE_BUCKET * 16384
+
+def get_overview_path(mat_path):
+    """转换后文件对应的概览文件路径"""
+    return os.path.splitext(mat_path)[0] + OVERVIEW_SUFFIX
+
+def build_overview(mat_path, overview_path=None, progress=None):
+    """为.mat文件中的每个通道构建多级最小/最大/平均值概览并保存为HDF5文件，progress接收0~1的进度"""
+    if not H5PY_AVAILABLE:
+        raise ImportError("生成概览文件需要安装h5py")
+    
+    overview_path = overview_path or get_overview_path(mat_path)
+    tmp_path = overview_path + '.tmp'
+    variables = [(name, shape) for name, shape, _ in mat_io.list_variables(mat_path) if shape and shape[0] > 0]
+    total = max(1, sum(int(np.prod(shape)) for _, shape in variables))
+    done = 0
+    
+    read_block, source = _open_channel_source(mat_path)
+    try:
+        with h5py.File(tmp_path, 'w') as out:
+            stat = os.stat(mat_path)
+            out.attrs['source_mtime_ns'] = stat.st_mtime_ns
+            out.attrs['source_size'] = stat.st_size
+            out.attrs['factor'] = OVERVIEW_FACTOR
+            
+            for name, shape in variables:
+                n_samples = shape[0]
+                n_channels = int(np.prod(shape[1:])) if len(shape) > 1 else 1
+                group = out.create_group(name)
+                group.attrs['n_samples'] = n_samples
+                group.attrs['n_channels'] = n_channels
+                
+                for channel in range(n_channels):
+                    levels = _channel_levels(lambda start, stop: read_block(name, channel, start, stop), n_samples)
+                    if channel == 0:
+                        group.attrs['buckets'] = np.array([bucket for bucket, _, _, _ in levels], dtype=np.int64)
+                    
+                    for bucket, mins, maxs, sums in levels:
+                        key = f'level_{bucket}'
+                        if key not in group:
+                            group.create_dataset(key, shape=(n_channels, 3, len(mins)), dtype=np.float32,
+                                                 chunks=(1, 3, min(len(mins), 4096)))
+                        counts = _bucket_counts(0, len(mins), bucket, n_samples)
+                        group[key][channel] = np.stack([mins, maxs, sums / counts])
+                    
+                    done += n_samples
+                    if progress:
+                        progress(done / total)
+        os.replace(tmp_path, overview_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        if source is not None:
+            source.close()
+    return overview_path
+
+def _open_channel_source(mat_path):
+    """返回按(变量名, 通道, 起始, 结束)读取单通道数据块的函数；v7.3文件直接从HDF5中按需读取"""
+    if mat_io.is_mat73_file(mat_path):
+        source = h5py.File(mat_path, 'r')
+        # HDF5中每个通道在文件中连续存放（通道数 × 采样点数）
+        return (lambda name, channel, start, stop: source[name][channel, start:stop]), source
+    
+    arrays = {name: value.reshape(value.shape[0], -1) for name, value in mat_io.read_mat(mat_path).items()}
+    return (lambda name, channel, start, stop: arrays[name][start:stop, channel]), None
+
+def _channel_levels(read_block, n_samples):
+    """逐块读取一个通道并计算所有级别，返回[(桶大小, 最小值, 最大值, 和)]"""
+    mins, maxs, sums = [], [], []
+    for start in range(0, n_samples, OVERVIEW_BLOCK_SAMPLES):
+        block = np.asarray(read_block(start, min(start + OVERVIEW_BLOCK_SAMPLES, n_samples)), dtype=np.float64)
+        mins.append(reduce_buckets(block, OVERVIEW_BASE_BUCKET, np.minimum))
+        maxs.append(reduce_buckets(block, OVERVIEW_BASE_BUCKET, np.maximum))
+        sums.append(reduce_buckets(block, OVERVIEW_BASE_BUCKET, np.add))
+    
+    mins, maxs, sums = np.concatenate(mins), np.concatenate(maxs), np.concatenate(sums)
+    levels = []
+    bucket = OVERVIEW_BASE_BUCKET
+    while True:
+        levels.append((bucket, mins, maxs, sums))
+        if len(mins) <= 1:
+            return levels
+        mins = reduce_buckets(mins, OVERVIEW_FACTOR, np.minimum)
+        maxs = reduce_buckets(maxs, OVERVIEW_FACTOR, np.maximum)
+        sums = reduce_buckets(sums, OVERVIEW_FACTOR, np.add)
+        bucket *= OVERVIEW_FACTOR
+
+def _bucket_counts(first, last, bucket, n_samples):
+    """第first到last-1个桶各自包含的采样点数（最后一个桶可能不满）"""
+    counts = np.full(last - first, bucket, dtype=np.float64)
+    if len(counts) and last * bucket > n_samples:
+        counts[-1] = n_samples - (last - 1) * bucket
+    return counts
+
+def _reduce_to_points(positions, mins, maxs, means, counts, n_points):
+    """将相邻的桶合并为n_points个区间"""
+    edges = np.unique(np.linspace(0, len(mins), n_points + 1).astype(np.int64)[:-1])
+    total_counts = np.add.reduceat(counts, edges)
+    return (positions[edges],
+            np.minimum.reduceat(mins, edges),
+            np.maximum.reduceat(maxs, edges),
+            np.add.reduceat(means * counts, edges) / total_counts)
+
+class RecordingOverview:
+    """读取转换后文件的概览，按时间范围和点数查询某个通道，不需要读取原始数据"""
+    
+    def __init__(self, mat_path, overview_path=None):
+        if not H5PY_AVAILABLE:
+            raise ImportError("读取概览文件需要安装h5py")
+        
+        self.mat_path = mat_path
+        self._file = h5py.File(overview_path or get_overview_path(mat_path), 'r')
+        # 需要比最细一级更多的细节时从v7.3格式的原始文件中读取，首次使用时打开
+        self._raw_file = None
+    
+    def variables(self):
+        """返回{变量名: (采样点数, 通道数)}"""
+        return {name: (int(group.attrs['n_samples']), int(group.attrs['n_channels']))
+                for name, group in self._file.items()}
+    
+    def is_current(self):
+        """概览是否与当前的.mat文件一致（文件被重新转换后需要重建）"""
+        try:
+            stat = os.stat(self.mat_path)
+        except OSError:
+            return False
+        return (self._file.attrs.get('source_mtime_ns') == stat.st_mtime_ns
+                and self._file.attrs.get('source_size') == stat.st_size)
+    
+    def query(self, variable, channel, start_time, end_time, n_points, sample_rate):
+        """返回通道在[start_time, end_time)秒内最多n_points个点的(时间, 最小值, 最大值, 平均值)"""
+        start = int(math.floor(start_time * sample_rate))
+        stop = int(math.ceil(end_time * sample_rate))
+        positions, mins, maxs, means = self.query_samples(variable, channel, start, stop, n_points)
+        return positions / sample_rate, mins, maxs, means
+    
+    def query_samples(self, variable, channel, start, stop, n_points):
+        """按采样点区间[start, stop)查询，返回(起始采样点位置, 最小值, 最大值, 平均值)；返回原始采样点时三者为同一数组"""
+        group = self._file[variable]
+        n_samples = int(group.attrs['n_samples'])
+        start = min(max(int(start), 0), n_samples)
+        stop = min(max(int(stop), start), n_samples)
+        if stop == start or n_points < 1:
+            empty = np.zeros(0, dtype=np.float32)
+            return np.zeros(0, dtype=np.int64), empty, empty, empty
+        
+        # 选择区间内桶数不少于n_points的最粗一级
+        count = stop - start
+        buckets = [int(b) for b in group.attrs['buckets']]
+        candidates = [b for b in buckets if count / b >= n_points]
+        if not candidates:
+            raw = self._read_raw(variable, channel, start, stop)
+            if raw is not None:
+                positions = np.arange(start, stop, dtype=np.int64)
+                if len(raw) <= n_points:
+                    return positions, raw, raw, raw
+                return _reduce_to_points(positions, raw, raw, raw.astype(np.float64),
+                                         np.ones(len(raw)), n_points)
+            candidates = [buckets[0]]
+        
+        bucket = max(candidates)
+        first = start // bucket
+        last = -(-stop // bucket)
+        stats = group[f'level_{bucket}'][channel, :, first:last]
+        positions = np.arange(first, last, dtype=np.int64) * bucket
+        if len(positions) <= n_points:
+            return positions, stats[0], stats[1], stats[2]
+        return _reduce_to_points(positions, stats[0], stats[1], stats[2].astype(np.float64),
+                                 _bucket_counts(first, last, bucket, n_samples), n_points)
+    
+    def _read_raw(self, variable, channel, start, stop):
+        """从v7.3格式的原始文件中读取一段原始采样点，无法读取时返回None"""
+        try:
+            if self._raw_file is None:
+                if not mat_io.is_mat73_file(self.mat_path):
+                    return None
+                self._raw_file = h5py.File(self.mat_path, 'r')
+            return self._raw_file[variable][channel, start:stop]
+        except (OSError, KeyError):
+            return None
+    
+    def close(self):
+        """关闭概览文件和原始文件"""
+        for f in (self._file, self._raw_file):
+            if f is not None:
+                f.close()
+        self._file = None
+        self._raw_file = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+class OverviewChannel:
+    """将概览中的一个通道包装为SignalPlotWidget的数据源"""
+    
+    def __init__(self, overview, variable, channel=0):
+        self.overview = overview
+        self.variable = variable
+        self.channel = channel
+        self.n_samples = overview.variables()[variable][0]
+    
+    def __len__(self):
+        return self.n_samples
+    
+    def query(self, start, stop, n_points):
+        """返回(起始采样点位置, 最小值, 最大值)"""
+        positions, mins, maxs, _ = self.overview.query_samples(self.variable, self.channel, start, stop, n_points)
+        return positions, mins, maxs
@@ -0,0 +1,238 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+from utils import mat_io
+from utils.app_paths import get_app_data_dir
+
+# 数据库结构版本，结构变化时递增
+SCHEMA_VERSION = 1
+
+# 统计通道时每次处理的行数
+STATS_CHUNK_ROWS = 1 << 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    original_file TEXT,
+    mapping TEXT,
+    sample_rate REAL,
+    rows INTEGER,
+    cols INTEGER,
+    file_size INTEGER,
+    file_mtime REAL,
+    imported_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS channel_stats (
+    recording_id INTEGER NOT NULL REFERENCES recordings(id) ON DELETE CASCADE,
+    variable TEXT NOT NULL,
+    channel INTEGER NOT NULL,
+    min REAL,
+    max REAL,
+    mean REAL,
+    std REAL,
+    rms REAL,
+    PRIMARY KEY (recording_id, variable, channel)
+);
+CREATE INDEX IF NOT EXISTS idx_recordings_imported_at ON recordings(imported_at);
+CREATE INDEX IF NOT EXISTS idx_channel_stats_rms ON channel_stats(variable, rms);
+CREATE INDEX IF NOT EXISTS idx_channel_stats_max ON channel_stats(variable, max);
+"""
+
+class RecordingCatalog:
+    """已转换记录的本地目录（SQLite）：保存路径、映射、采样率、维度、导入时间和各通道统计，按条件筛选时使用索引查询"""
+    
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(get_app_data_dir(), 'recordings.db')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA foreign_keys = ON")
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    
+    def add_recording(self, path, data_dict, data_mapping=None, sample_rate=None,
+                      original_file=None, imported_at=None):
+        """记录转换后的文件及其各变量（{变量名: 数组}）的通道统计，同一路径再次加入时覆盖旧记录；返回记录id，失败时返回None"""
+        try:
+            path = os.path.abspath(path)
+            stat = os.stat(path) if os.path.exists(path) else None
+            rows = max((np.shape(value)[0] for value in data_dict.values() if np.ndim(value)), default=0)
+            cols = sum(_channel_count(value) for value in data_dict.values())
+            channel_stats = [(name, channel, *stats)
+                             for name, value in data_dict.items()
+                             for channel, stats in enumerate(compute_channel_stats(value))]
+            
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM recordings WHERE path = ?", (path,))
+                cursor = self._conn.execute(
+                    "INSERT INTO recordings (path, name, original_file, mapping, sample_rate, rows, cols,"
+                    " file_size, file_mtime, imported_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (path, os.path.basename(path), original_file,
+                     json.dumps(data_mapping) if data_mapping is not None else None,
+                     sample_rate, rows, cols,
+                     stat.st_size if stat else None, stat.st_mtime if stat else None,
+                     imported_at if imported_at is not None else time.time())
+                )
+                recording_id = cursor.lastrowid
+                self._conn.executemany(
+                    "INSERT INTO channel_stats (recording_id, variable, channel, min, max, mean, std, rms)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(recording_id, *stats) for stats in channel_stats]
+                )
+            return recording_id
+        except (sqlite3.Error, OSError, ValueError) as e:
+            print(f"添加记录到目录失败: {e}")
+            return None
+    
+    def add_mat_file(self, path, sample_rate=None, data_mapping=None, original_file=None):
+        """读取.mat文件中的数值变量并加入目录（v7.3文件按块读取统计，不把整个变量读入内存；文件大小和修改时间与目录中一致时不再重复读取）；返回记录id，失败时返回None"""
+        existing = self.get_recording(path)
+        if existing is not None and self._is_current(existing):
+            return existing['id']
+        
+        try:
+            with mat_io.MatFile(path) as mat_file:
+                data_dict = {name: mat_file[name] for name, shape, _ in mat_io.list_variables(path)
+                             if 0 < len(shape) <= 2}
+                return self.add_recording(path, data_dict, data_mapping, sample_rate, original_file)
+        except Exception as e:
+            print(f"读取记录 {path} 失败: {e}")
+            return None
+    
+    def get_recording(self, path):
+        """按路径获取记录（字典），不存在时返回None"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM recordings WHERE path = ?",
+                                     (os.path.abspath(path),)).fetchone()
+        return _recording_from_row(row) if row is not None else None
+    
+    def get_channel_stats(self, recording_id):
+        """获取记录各通道的统计，返回[{variable, channel, min, max, mean, std, rms}]"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT variable, channel, min, max, mean, std, rms FROM channel_stats"
+                " WHERE recording_id = ? ORDER BY variable, channel", (recording_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def query(self, name=None, variable=None, min_rms=None, min_peak=None, since=None, until=None, limit=None):
+        """按条件筛选记录，按导入时间从新到旧返回：name为文件名包含的文本，variable为通道所属变量（如'gyroscope'），min_rms/min_peak为该变量任一通道的RMS/最大值下限，since/until为导入时间范围（Unix时间戳）"""
+        conditions = []
+        params = []
+        if name:
+            conditions.append("r.name LIKE ? ESCAPE '\\'")
+            params.append('%' + name.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+        if since is not None:
+            conditions.append("r.imported_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("r.imported_at < ?")
+            params.append(until)
+        
+        # 通道条件：有满足条件的通道的记录（子查询只执行一次，使用(variable, rms)和(variable, max)索引）
+        channel_conditions = []
+        channel_params = []
+        if variable is not None:
+            channel_conditions.append("c.variable = ?")
+            channel_params.append(variable)
+        if min_rms is not None:
+            channel_conditions.append("c.rms > ?")
+            channel_params.append(min_rms)
+        if min_peak is not None:
+            channel_conditions.append("c.max > ?")
+            channel_params.append(min_peak)
+        if channel_conditions:
+            conditions.append("r.id IN (SELECT c.recording_id FROM channel_stats c WHERE "
+                              + " AND ".join(channel_conditions) + ")")
+            params.extend(channel_params)
+        
+        sql = "SELECT r.* FROM recordings r"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY r.imported_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+            return [_recording_from_row(row) for row in rows]
+        except sqlite3.Error as e:
+            print(f"查询记录目录失败: {e}")
+            return []
+    
+    def remove_recording(self, path):
+        """从目录中删除记录（不删除文件）"""
+        try:
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM recordings WHERE path = ?", (os.path.abspath(path),))
+            return True
+        except sqlite3.Error as e:
+            print(f"从目录中删除记录失败: {e}")
+            return False
+    
+    def count(self):
+        """目录中的记录数"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM recordings").fetchone()[0]
+    
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+    
+    def _is_current(self, recording):
+        """文件大小和修改时间是否与目录中记录的一致"""
+        try:
+            stat = os.stat(recording['path'])
+        except OSError:
+            return False
+        return recording['file_size'] == stat.st_size and recording['file_mtime'] == stat.st_mtime
+
+def compute_channel_stats(value):
+    """逐通道计算最小值、最大值、均值、标准差和RMS（分块累加，不复制整个数组；value为mat_io.MatVariable时逐块从文件读取），返回[(min, max, mean, std, rms)]"""
+    if isinstance(value, mat_io.MatVariable):
+        if 0 in value.shape or value.dtype.kind not in 'biuf':
+            return []
+    else:
+        value = np.asarray(value)
+        if value.size == 0 or value.dtype.kind not in 'biuf':
+            return []
+        value = value.reshape(value.shape[0], -1)
+    
+    n = value.shape[0]
+    mins = np.full(value.shape[1], np.inf)
+    maxs = np.full(value.shape[1], -np.inf)
+    sums = np.zeros(value.shape[1])
+    sums_sq = np.zeros(value.shape[1])
+    for start in range(0, n, STATS_CHUNK_ROWS):
+        block = np.asarray(value[start:start + STATS_CHUNK_ROWS], dtype=np.float64)
+        mins = np.minimum(mins, block.min(axis=0))
+        maxs = np.maximum(maxs, block.max(axis=0))
+        sums += block.sum(axis=0)
+        sums_sq += np.square(block).sum(axis=0)
+    
+    means = sums / n
+    mean_sq = sums_sq / n
+    stds = np.sqrt(np.maximum(mean_sq - np.square(means), 0.0))
+    rms = np.sqrt(mean_sq)
+    return [tuple(float(v) for v in stats) for stats in zip(mins, maxs, means, stds, rms)]
+
+def _channel_count(value):
+    """数组的通道数（一维数组为1）"""
+    shape = np.shape(value)
+    return int(np.prod(shape[1:])) if len(shape) > 1 else (1 if len(shape) == 1 else 0)
+
+def _recording_from_row(row):
+    """将数据库行转换为字典，映射解析为字典"""
+    recording = dict(row)
+    recording['mapping'] = json.loads(recording['mapping']) if recording['mapping'] else None
+    return recording
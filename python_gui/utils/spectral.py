@@ -0,0 +1,77 @@
+import numpy as np
+
+try:
+    import scipy.fft
+    SCIPY_FFT_AVAILABLE = True
+except ImportError:
+    SCIPY_FFT_AVAILABLE = False
+
+# 分段计算时每批分段占用的内存上限（字节）
+SEGMENT_BLOCK_BYTES = 64 * 1024 * 1024
+
+def hamming_window(length):
+    """对称Hamming窗，与Matlab的hamming(L)一致"""
+    if length == 1:
+        return np.ones(1)
+    n = np.arange(length)
+    return 0.54 - 0.46 * np.cos(2 * np.pi * n / (length - 1))
+
+def pwelch_defaults(n_samples):
+    """Matlab pwelch的默认参数：分为8段、50%重叠的Hamming窗，nfft取max(256, 2^nextpow2(L))"""
+    segment_length = max(1, int(n_samples / 4.5))
+    noverlap = int(segment_length * 0.5)
+    nfft = max(256, 1 << int(np.ceil(np.log2(segment_length))))
+    return segment_length, noverlap, nfft
+
+def welch_psd(data, sample_rate, window=None, noverlap=None, nfft=None):
+    """一次计算所有通道的Welch功率谱密度（默认参数与Matlab的pwelch一致），返回(频率, 功率谱密度(频率点数 × 通道数))"""
+    # window可以是窗长或窗函数数组，一维数据按单通道处理
+    x = np.asarray(data, dtype=np.float64)
+    if x.ndim == 1:
+        x = x.reshape(-1, 1)
+    n_samples, n_channels = x.shape
+    
+    default_length, default_noverlap, default_nfft = pwelch_defaults(n_samples)
+    if window is None:
+        window = hamming_window(default_length)
+    elif np.isscalar(window):
+        window = hamming_window(int(window))
+    else:
+        window = np.asarray(window, dtype=np.float64)
+    
+    segment_length = len(window)
+    if segment_length > n_samples:
+        raise ValueError("窗长不能超过信号长度")
+    if noverlap is None:
+        noverlap = default_noverlap if segment_length == default_length else int(segment_length * 0.5)
+    if nfft is None:
+        nfft = max(256, 1 << int(np.ceil(np.log2(segment_length))))
+    
+    step = segment_length - noverlap
+    n_segments = (n_samples - noverlap) // step
+    
+    # 所有通道的分段视图，形状为(分段数 × 通道数 × 窗长)，不复制数据
+    segments = np.lib.stride_tricks.sliding_window_view(x, segment_length, axis=0)[::step][:n_segments]
+    
+    # 分批做加窗和FFT，限制临时数组的大小
+    block = max(1, SEGMENT_BLOCK_BYTES // (n_channels * nfft * 16))
+    power = np.zeros((n_channels, nfft // 2 + 1))
+    for start in range(0, n_segments, block):
+        spectrum = _rfft(segments[start:start + block] * window, nfft)
+        power += np.sum(spectrum.real ** 2 + spectrum.imag ** 2, axis=0)
+    
+    # 单边功率谱密度：除直流和奈奎斯特频率外乘以2
+    psd = power / (n_segments * sample_rate * np.sum(window ** 2))
+    if nfft % 2 == 0:
+        psd[:, 1:-1] *= 2
+    else:
+        psd[:, 1:] *= 2
+    
+    freqs = np.arange(nfft // 2 + 1) * sample_rate / nfft
+    return freqs, psd.T
+
+def _rfft(x, nfft):
+    """沿最后一维做实数FFT，有scipy时使用多线程"""
+    if SCIPY_FFT_AVAILABLE:
+        return scipy.fft.rfft(x, n=nfft, axis=-1, workers=-1)
+    return np.fft.rfft(x, n=nfft, axis=-1)
@@ -1,20 +1,61 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, 
                             QGroupBox, QComboBox, QSpinBox, QDoubleSpinBox, QGridLayout,
                             QMessageBox, QTabWidget)
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, pyqtSignal
 import numpy as np
+import os
+from concurrent.futures import CancelledError
 from utils.matlab_interface import MatlabInterface
+from utils.spectral import welch_psd
+from utils.minmax_pyramid import decimate_minmax
+from utils.overview_store import RecordingOverview, OverviewChannel, get_overview_path
+from signal_plot_widget import SignalPlotWidget, SpectrumPlotWidget
+
+# 数据类型名称与映射键的对应关系
+DATA_TYPE_KEYS = [("加速度", 'acceleration'), ("陀螺仪", 'gyroscope'), ("噪声", 'noise')]
+
+# 绘制的通道范围
+CHANNEL_MODE_SINGLE = "单通道"
+CHANNEL_MODE_GROUP = "本组全部通道"
+CHANNEL_MODE_ALL = "全部已映射通道"
+
+# 时域图的显示方式
+TIME_DISPLAY_EMBEDDED = "内嵌视图（抽样显示）"
+TIME_DISPLAY_MATLAB = "Matlab图窗"
+
+# 频域图的计算后端
+PSD_BACKEND_MATLAB = "Matlab (pwelch)"
+PSD_BACKEND_PYTHON = "Python (NumPy)"
+
+# 等待Matlab完成一次绘图的最长时间（秒），超时后取消该调用
+MATLAB_CALL_TIMEOUT = 120
+
+# 请求合并键：连续点击"绘制图表"时，同一种图尚未开始执行的旧请求被新请求取代
+TIME_DOMAIN_PLOT_KEY = 'visualization_time_domain'
+FREQ_DOMAIN_PLOT_KEY = 'visualization_freq_domain'
 
 class VisualizationPanel(QWidget):
     """数据可视化面板"""
     
+    # Matlab异步调用完成（在后台线程中发出，在界面线程中处理）
+    call_finished = pyqtSignal(object)
+    
     def __init__(self, matlab_interface, parent=None):
         super().__init__(parent)
         self.matlab_interface = matlab_interface
         self.current_data = None
         self.data_mapping = None
+        # 当前显示的概览文件
+        self.overview = None
+        # 当前数据中已映射的通道在Matlab工作区中的数据集，首次用Matlab绘制频域图时注册
+        self.dataset = None
+        # 数据集各列对应的当前数据的列号
+        self.dataset_columns = []
+        # 未完成的Matlab调用：Future -> (操作名称, 成功后的回调)
+        self.pending_calls = {}
         
         self.init_ui()
+        self.call_finished.connect(self._on_call_finished)
     
     def init_ui(self):
         """初始化界面"""
@@ -52,6 +93,15 @@ class VisualizationPanel(QWidget):
         data_layout.addWidget(QLabel("通道:"), 0, 2)
         data_layout.addWidget(self.channel_spin, 0, 3)
         
+        # 多个通道作为一个矩阵一次传给Matlab，在同一个图形窗口中分子图绘制
+        self.channel_mode_combo = QComboBox()
+        self.channel_mode_combo.addItems([CHANNEL_MODE_SINGLE, CHANNEL_MODE_GROUP, CHANNEL_MODE_ALL])
+        self.channel_mode_combo.currentTextChanged.connect(
+            lambda mode: self.channel_spin.setEnabled(mode == CHANNEL_MODE_SINGLE)
+        )
+        data_layout.addWidget(QLabel("绘制通道:"), 1, 0)
+        data_layout.addWidget(self.channel_mode_combo, 1, 1, 1, 3)
+        
         data_group.setLayout(data_layout)
         main_layout.addWidget(data_group)
         
@@ -81,8 +131,17 @@ class VisualizationPanel(QWidget):
         self.clear_btn = QPushButton("清除图表")
         self.clear_btn.clicked.connect(self._clear_plots)
         
+        # Matlab绘图在后台执行，执行期间界面保持响应，可以取消
+        self.cancel_btn = QPushButton("取消绘图")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_pending_calls)
+        
+        self.status_label = QLabel()
+        
         btn_layout.addWidget(self.plot_btn)
         btn_layout.addWidget(self.clear_btn)
+        btn_layout.addWidget(self.cancel_btn)
+        btn_layout.addWidget(self.status_label)
         btn_layout.addStretch()
         
         main_layout.addLayout(btn_layout)
@@ -99,13 +158,13 @@ class VisualizationPanel(QWidget):
         
         self.time_range_start = QDoubleSpinBox()
         self.time_range_start.setMinimum(0.0)
-        self.time_range_start.setMaximum(1000.0)
+        self.time_range_start.setMaximum(1000000.0)
         self.time_range_start.setValue(0.0)
         self.time_range_start.setSuffix(" s")
         
         self.time_range_end = QDoubleSpinBox()
         self.time_range_end.setMinimum(0.1)
-        self.time_range_end.setMaximum(1000.0)
+        self.time_range_end.setMaximum(1000000.0)
         self.time_range_end.setValue(10.0)
         self.time_range_end.setSuffix(" s")
         
@@ -114,14 +173,32 @@ class VisualizationPanel(QWidget):
         time_settings_layout.addWidget(QLabel("到"), 0, 2)
         time_settings_layout.addWidget(self.time_range_end, 0, 3)
         
+        # 时域图显示方式
+        self.time_display_combo = QComboBox()
+        self.time_display_combo.addItems([TIME_DISPLAY_EMBEDDED, TIME_DISPLAY_MATLAB])
+        time_settings_layout.addWidget(QLabel("显示方式:"), 1, 0)
+        time_settings_layout.addWidget(self.time_display_combo, 1, 1, 1, 3)
+        
+        # 传给Matlab的点数上限（超过时按最小/最大值抽样）
+        self.point_budget_spin = QSpinBox()
+        self.point_budget_spin.setRange(100, 10000000)
+        self.point_budget_spin.setSingleStep(1000)
+        self.point_budget_spin.setValue(20000)
+        time_settings_layout.addWidget(QLabel("传输点数上限:"), 2, 0)
+        time_settings_layout.addWidget(self.point_budget_spin, 2, 1)
+        
         time_settings_group.setLayout(time_settings_layout)
         layout.addWidget(time_settings_group)
         
         # 说明文本
-        info_label = QLabel("时域图显示原始数据的波形，可用于观察信号的时域特征。")
+        info_label = QLabel("时域图显示原始数据的波形，可用于观察信号的时域特征。内嵌视图中滚轮缩放、拖动平移、双击显示全部。")
         info_label.setWordWrap(True)
         layout.addWidget(info_label)
         
+        # 内嵌的时域波形
+        self.signal_plot = SignalPlotWidget()
+        layout.addWidget(self.signal_plot, 1)
+        
         self.time_domain_tab.setLayout(layout)
     
     def _init_freq_domain_tab(self):
@@ -149,20 +226,31 @@ class VisualizationPanel(QWidget):
         freq_settings_layout.addWidget(QLabel("到"), 0, 2)
         freq_settings_layout.addWidget(self.freq_range_end, 0, 3)
         
+        # 功率谱计算后端
+        self.psd_backend_combo = QComboBox()
+        self.psd_backend_combo.addItems([PSD_BACKEND_MATLAB, PSD_BACKEND_PYTHON])
+        freq_settings_layout.addWidget(QLabel("计算后端:"), 1, 0)
+        freq_settings_layout.addWidget(self.psd_backend_combo, 1, 1, 1, 3)
+        
         freq_settings_group.setLayout(freq_settings_layout)
         layout.addWidget(freq_settings_group)
         
         # 说明文本
-        info_label = QLabel("频域图使用pwelch函数计算功率谱密度，可用于观察信号的频域特征。")
+        info_label = QLabel("频域图使用pwelch函数计算功率谱密度，可用于观察信号的频域特征。只计算时域图设置中时间范围内的数据。Python后端的结果显示在下方，已连接Matlab时同时在Matlab中绘制。")
         info_label.setWordWrap(True)
         layout.addWidget(info_label)
         
+        # 内嵌的功率谱（Python后端）
+        self.spectrum_plot = SpectrumPlotWidget()
+        layout.addWidget(self.spectrum_plot, 1)
+        
         self.freq_domain_tab.setLayout(layout)
     
     def set_data(self, data, mapping):
         """设置数据和映射关系"""
         self.current_data = data
         self.data_mapping = mapping
+        self.release_dataset()
         
         # 更新通道选择范围
         self._update_channel_range()
@@ -186,6 +274,17 @@ class VisualizationPanel(QWidget):
     
     def _get_selected_data(self):
         """获取选中的数据"""
+        data_col = self._get_selected_column()
+        if data_col is None:
+            return None
+        
+        # 提取数据
+        selected_data = self.current_data[:, data_col]
+        
+        return selected_data
+    
+    def _get_selected_column(self):
+        """获取选中通道的列号"""
         if self.current_data is None or self.data_mapping is None:
             QMessageBox.warning(self, "警告", "没有可用的数据")
             return None
@@ -216,16 +315,56 @@ class VisualizationPanel(QWidget):
             QMessageBox.warning(self, "警告", "无效的数据类型")
             return None
         
-        # 提取数据
-        selected_data = self.current_data[:, data_col]
+        return data_col
+    
+    def _get_plot_data(self):
+        """按绘制通道设置获取要绘制的数据（多个通道时每列一个通道）及通道名称"""
+        columns, names = self._get_plot_columns()
+        if columns is None:
+            return None, []
+        return self._get_columns(columns), names
+    
+    def _get_plot_columns(self):
+        """按绘制通道设置获取要绘制的列号及通道名称"""
+        mode = self.channel_mode_combo.currentText()
+        if mode == CHANNEL_MODE_SINGLE:
+            data_col = self._get_selected_column()
+            if data_col is None:
+                return None, []
+            return [data_col], [f"{self.data_type_combo.currentText()} {self.channel_spin.value()}"]
         
-        return selected_data
+        if self.current_data is None or self.data_mapping is None:
+            QMessageBox.warning(self, "警告", "没有可用的数据")
+            return None, []
+        
+        data_type = self.data_type_combo.currentText() if mode == CHANNEL_MODE_GROUP else None
+        columns, names = self._get_mapped_columns(data_type)
+        if not columns:
+            QMessageBox.warning(self, "警告", "没有已映射的通道")
+            return None, []
+        return columns, names
+    
+    def _get_mapped_columns(self, data_type=None):
+        """获取已映射通道的列号及通道名称（data_type为None时包含所有数据类型）"""
+        columns = []
+        names = []
+        for type_name, key in DATA_TYPE_KEYS:
+            if data_type is not None and type_name != data_type:
+                continue
+            for i, col in enumerate(self.data_mapping.get(key, [])):
+                columns.append(col)
+                names.append(f"{type_name} {i+1}")
+        return columns, names
+    
+    def _get_columns(self, columns):
+        """获取指定的数据列，单列或相邻的多列时返回视图而不复制数据"""
+        return _select_columns(self.current_data, columns)
     
     def _plot_current_tab(self):
         """绘制当前选项卡的图表"""
-        # 获取选中的数据
-        selected_data = self._get_selected_data()
-        if selected_data is None:
+        # 获取选中的通道（单通道，或多个通道组成的矩阵）
+        columns, channel_names = self._get_plot_columns()
+        if columns is None:
             return
         
         # 获取采样率
@@ -235,61 +374,282 @@ class VisualizationPanel(QWidget):
         current_tab = self.tab_widget.currentIndex()
         
         if current_tab == 0:  # 时域图
-            self._plot_time_domain(selected_data, sample_rate)
+            if self.time_display_combo.currentText() == TIME_DISPLAY_EMBEDDED:
+                self._plot_time_domain_embedded(self._get_columns(columns), sample_rate, channel_names)
+            else:
+                self._plot_time_domain(self._get_columns(columns), sample_rate, channel_names)
         elif current_tab == 1:  # 频域图
-            self._plot_freq_domain(selected_data, sample_rate)
+            if self.psd_backend_combo.currentText() == PSD_BACKEND_PYTHON:
+                self._plot_freq_domain_python(self._get_columns(columns), sample_rate, channel_names)
+            else:
+                # 数据在引擎执行线程中读取，界面线程不读取整个通道
+                self._plot_freq_domain(columns, sample_rate, channel_names)
+    
+    def _get_time_window(self, n_samples, sample_rate):
+        """根据时间范围设置计算采样点区间(start, stop)，范围内没有数据时返回None"""
+        start = max(0, int(self.time_range_start.value() * sample_rate))
+        stop = min(n_samples, int(np.ceil(self.time_range_end.value() * sample_rate)))
+        if stop - start < 2:
+            QMessageBox.warning(self, "警告", "所选时间范围内没有数据")
+            return None
+        return start, stop
     
-    def _plot_time_domain(self, data, sample_rate):
-        """绘制时域图"""
+    def _get_freq_range(self):
+        """频率范围设置(起始, 结束)，设置无效时返回None"""
+        freq_range = (self.freq_range_start.value(), self.freq_range_end.value())
+        if freq_range[1] <= freq_range[0]:
+            QMessageBox.warning(self, "警告", "频率范围设置无效")
+            return None
+        return freq_range
+    
+    def _plot_time_domain(self, data, sample_rate, channel_names=None):
+        """绘制时域图（多个通道时一次调用绘制在同一个图形窗口中）"""
         if not self.matlab_interface:
             QMessageBox.critical(self, "错误", "Matlab接口未初始化")
             return
         
+        window = self._get_time_window(len(data), sample_rate)
+        if window is None:
+            return
+        start, stop = window
+        
         try:
-            # 调用Matlab函数绘制时域图
-            success = self.matlab_interface.plot_time_domain(
-                data, sample_rate, title="时域波形图"
+            # 只传输时间范围内的数据，并按最小/最大值抽样到点数上限以内
+            rows, values = decimate_minmax(data[start:stop], self.point_budget_spin.value())
+            future = self.matlab_interface.plot_time_domain_async(
+                np.ascontiguousarray(values), sample_rate, title="时域波形图",
+                times=(start + rows) / sample_rate, channel_names=channel_names, timeout=MATLAB_CALL_TIMEOUT,
+                key=TIME_DOMAIN_PLOT_KEY
             )
+            self._watch_call(future, "绘制时域图")
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"绘制时域图时发生错误: {e}")
+    
+    def _plot_time_domain_embedded(self, data, sample_rate, channel_names=None):
+        """在内嵌视图中绘制时域图，不需要Matlab"""
+        try:
+            if data.ndim == 1:
+                title = f"{self.data_type_combo.currentText()} 通道{self.channel_spin.value()}"
+            else:
+                title = self.channel_mode_combo.currentText()
+            self.signal_plot.set_signal(data, sample_rate, title=title, channel_names=channel_names)
+            self.close_overview()
             
-            if not success:
-                QMessageBox.critical(self, "错误", "绘制时域图失败")
+            # 按设置的时间范围显示，之后可自由缩放和平移
+            start_time = self.time_range_start.value()
+            end_time = self.time_range_end.value()
+            if end_time > start_time:
+                self.signal_plot.set_time_range(start_time, end_time)
         except Exception as e:
             QMessageBox.critical(self, "错误", f"绘制时域图时发生错误: {e}")
     
-    def _plot_freq_domain(self, data, sample_rate):
-        """绘制频域图"""
+    def show_overview(self, mat_path):
+        """在内嵌视图中显示转换后文件的波形概览（只读取概览文件，不加载原始数据），成功返回True"""
+        if not os.path.exists(get_overview_path(mat_path)):
+            return False
+        
+        try:
+            overview = RecordingOverview(mat_path)
+        except Exception as e:
+            print(f"打开概览文件失败: {e}")
+            return False
+        
+        variables = overview.variables()
+        if not variables or not overview.is_current():
+            overview.close()
+            return False
+        
+        # 优先显示当前选择的数据类型和通道
+        variable = dict((name, key) for name, key in DATA_TYPE_KEYS).get(self.data_type_combo.currentText())
+        if variable in variables:
+            channel = min(self.channel_spin.value(), variables[variable][1]) - 1
+        else:
+            variable, channel = next(iter(variables)), 0
+        
+        self.close_overview()
+        self.overview = overview
+        title = f"{os.path.basename(mat_path)}  {variable} 通道{channel+1}"
+        self.signal_plot.set_source(OverviewChannel(overview, variable, channel),
+                                    self.sample_rate_spin.value(), title=title)
+        self.tab_widget.setCurrentIndex(0)
+        return True
+    
+    def close_overview(self):
+        """关闭当前的概览文件，内嵌视图正在显示该概览时一并清除"""
+        if self.overview is not None:
+            if any(isinstance(source, OverviewChannel) and source.overview is self.overview
+                   for source in self.signal_plot.sources):
+                self.signal_plot.clear()
+            self.overview.close()
+            self.overview = None
+    
+    def _plot_freq_domain(self, columns, sample_rate, channel_names=None):
+        """绘制所选列的频域图（多个通道时一次调用绘制在同一个图形窗口中）：使用工作区中已映射通道的数据集，只传输行列号；无法注册数据集时只传输时间范围内的数据"""
         if not self.matlab_interface:
             QMessageBox.critical(self, "错误", "Matlab接口未初始化")
             return
         
+        window = self._get_time_window(len(self.current_data), sample_rate)
+        freq_range = self._get_freq_range()
+        if window is None or freq_range is None:
+            return
+        start, stop = window
+        
         try:
-            # 调用Matlab函数绘制频域图
-            success = self.matlab_interface.plot_freq_domain(
-                data, sample_rate, title="频域功率谱图"
+            # 功率谱在Matlab中按频率范围截取
+            dataset, dataset_columns = self._get_dataset(columns)
+            if dataset is not None:
+                future = self.matlab_interface.plot_freq_domain_async(
+                    dataset, sample_rate, title="频域功率谱图", freq_range=freq_range,
+                    channel_names=channel_names, rows=(start, stop), columns=dataset_columns,
+                    timeout=MATLAB_CALL_TIMEOUT, key=FREQ_DOMAIN_PLOT_KEY
+                )
+            else:
+                # 时间范围内的数据在引擎执行线程中读取
+                data = self.current_data
+                future = self.matlab_interface.plot_freq_domain_async(
+                    lambda: np.ascontiguousarray(_select_columns(data, columns)[start:stop]), sample_rate,
+                    title="频域功率谱图", freq_range=freq_range, channel_names=channel_names,
+                    timeout=MATLAB_CALL_TIMEOUT, key=FREQ_DOMAIN_PLOT_KEY
+                )
+            self._watch_call(future, "绘制频域图")
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"绘制频域图时发生错误: {e}")
+    
+    def _get_dataset(self, columns):
+        """返回(数据集, 所选列在数据集中的列号)：已映射的通道尚未注册或已被释放时在后台注册一次（在引擎执行线程中读取，只包含已映射的通道）；无法注册（如超过工作区上限）时返回(None, None)"""
+        if self.current_data is None or self.data_mapping is None:
+            return None, None
+        
+        if not self.matlab_interface.has_dataset(self.dataset):
+            mapped_columns, _ = self._get_mapped_columns()
+            if not mapped_columns:
+                return None, None
+            data = self.current_data
+            self.dataset = self.matlab_interface.register_dataset_async(
+                lambda: _select_columns(data, mapped_columns),
+                shape=(len(data), len(mapped_columns)), dtype=getattr(data, 'dtype', np.float64)
             )
+            self.dataset_columns = mapped_columns if self.dataset is not None else []
+        
+        if self.dataset is None or not set(columns) <= set(self.dataset_columns):
+            return None, None
+        return self.dataset, [self.dataset_columns.index(col) for col in columns]
+    
+    def release_dataset(self):
+        """从Matlab工作区中释放当前数据的数据集"""
+        if self.dataset is not None:
+            if self.matlab_interface:
+                self.matlab_interface.release_dataset_async(self.dataset)
+            self.dataset = None
+            self.dataset_columns = []
+    
+    def _plot_freq_domain_python(self, data, sample_rate, channel_names=None):
+        """使用Python后端一次计算所选通道的功率谱并显示在内嵌视图中，不需要Matlab；已连接Matlab时只将频率范围内的频谱传给Matlab绘制"""
+        window = self._get_time_window(len(data), sample_rate)
+        freq_range = self._get_freq_range()
+        if window is None or freq_range is None:
+            return
+        
+        try:
+            freqs, psd = _welch_segment(data, sample_rate, window, freq_range)
+            if len(freqs) == 0:
+                QMessageBox.warning(self, "警告", "频率范围内没有频谱数据")
+                return
+            if data.ndim == 1:
+                title = f"{self.data_type_combo.currentText()} 通道{self.channel_spin.value()}"
+            else:
+                title = self.channel_mode_combo.currentText()
+            self.spectrum_plot.set_spectrum(freqs, psd, title=title, channel_names=channel_names)
+            
+            if not self.matlab_interface or self.matlab_interface.eng is None:
+                return
             
-            if not success:
-                QMessageBox.critical(self, "错误", "绘制频域图失败")
+            future = self.matlab_interface.plot_spectrum_async(
+                freqs, psd, title="频域功率谱图", channel_names=channel_names, timeout=MATLAB_CALL_TIMEOUT,
+                key=FREQ_DOMAIN_PLOT_KEY
+            )
+            self._watch_call(future, "绘制频域图")
         except Exception as e:
             QMessageBox.critical(self, "错误", f"绘制频域图时发生错误: {e}")
     
     def _clear_plots(self):
         """清除所有图表"""
+        self.signal_plot.clear()
+        self.spectrum_plot.clear()
+        self.close_overview()
+        
         if not self.matlab_interface:
             QMessageBox.critical(self, "错误", "Matlab接口未初始化")
             return
         
         try:
             # 关闭所有Matlab图形窗口
-            self.matlab_interface.call_function('close', 'all')
-            QMessageBox.information(self, "成功", "所有图表已清除")
+            future = self.matlab_interface.call_function_async('close', 'all', nargout=0, timeout=MATLAB_CALL_TIMEOUT)
+            self._watch_call(future, "清除图表",
+                             lambda: QMessageBox.information(self, "成功", "所有图表已清除"))
         except Exception as e:
             QMessageBox.critical(self, "错误", f"清除图表时发生错误: {e}")
     
+    def _watch_call(self, future, action, on_success=None):
+        """登记一个Matlab异步调用，完成后在界面线程中处理结果"""
+        self.pending_calls[future] = (action, on_success)
+        self._update_call_status()
+        future.add_done_callback(self.call_finished.emit)
+    
+    def _on_call_finished(self, future):
+        """Matlab异步调用完成：提示错误或执行成功后的回调"""
+        action, on_success = self.pending_calls.pop(future, (None, None))
+        self._update_call_status()
+        if action is None or future.cancelled():
+            return
+        
+        # 执行中被取消的后台调用以CancelledError结束
+        error = future.exception()
+        if isinstance(error, CancelledError):
+            return
+        if error is None:
+            if on_success:
+                on_success()
+        elif isinstance(error, TimeoutError):
+            QMessageBox.warning(self, "警告", f"{action}超时: {error}")
+        else:
+            QMessageBox.critical(self, "错误", f"{action}失败: {error}")
+    
+    def cancel_pending_calls(self):
+        """取消所有未完成的Matlab调用"""
+        for future in list(self.pending_calls):
+            future.cancel()
+    
+    def _update_call_status(self):
+        """更新取消按钮和状态提示"""
+        self.cancel_btn.setEnabled(bool(self.pending_calls))
+        self.status_label.setText(f"Matlab正在处理 {len(self.pending_calls)} 个请求..." if self.pending_calls else "")
+    
     def get_matlab_interface(self):
         """获取Matlab接口"""
         return self.matlab_interface
     
     def set_matlab_interface(self, matlab_interface):
         """设置Matlab接口"""
+        self.release_dataset()
         self.matlab_interface = matlab_interface
+
+def _select_columns(data, columns):
+    """获取指定的数据列，单列或相邻的多列时返回视图而不复制数据"""
+    if len(columns) == 1:
+        return data[:, columns[0]]
+    if columns == list(range(columns[0], columns[0] + len(columns))):
+        return data[:, columns[0]:columns[-1] + 1]
+    return data[:, columns]
+
+def _welch_segment(data, sample_rate, window=None, freq_range=None):
+    """计算采样点区间window内数据的Welch功率谱，并截取到频率范围freq_range"""
+    if window is not None:
+        data = data[window[0]:window[1]]
+    
+    freqs, psd = welch_psd(data, sample_rate)
+    if freq_range is not None:
+        in_range = (freqs >= freq_range[0]) & (freqs <= freq_range[1])
+        freqs, psd = freqs[in_range], psd[in_range]
+    return freqs, psd